@@ -0,0 +1,156 @@
+"""Compare order insert throughput with one commit per order against group commit.
+
+Offers orders at a fixed rate for a few seconds, into a scratch schema (dropped
+afterwards), and reports the achieved rate and insert latency both ways. The load can be
+spread over worker processes, each with its own pool and batcher as in production:
+building an order object alone costs ~0.1 ms of CPU, so one process cannot offer 10k/s.
+
+    python scripts/bench_group_commit.py --rates 1000 2500 5000 10000 --processes 4
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+from uuid import UUID, uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.db.group_commit import GroupCommitBatcher  # noqa: E402
+from src.db.models import DBOrder, DBUser  # noqa: E402
+from src.settings import settings  # noqa: E402
+
+SCHEMA = "bench_group_commit"
+TICK_SECONDS = 0.001
+MODES = ("single commit", "group commit")
+
+
+def make_engine(pool_size: int):
+    return create_async_engine(
+        settings.DATABASE_URL,
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_timeout=120,
+        connect_args={"server_settings": {"search_path": SCHEMA}},
+    )
+
+
+async def offer(mode: str, rate: float, seconds: float, user_id: UUID, pool_size: int, window_ms: float):
+    """Start ``rate`` inserts per second for ``seconds``; return the latencies, errors and elapsed time."""
+    engine = make_engine(pool_size)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    batcher = GroupCommitBatcher(
+        "bench", window_seconds=window_ms / 1000, max_batch=settings.ORDER_GROUP_COMMIT_MAX_BATCH, session_factory=sessions
+    )
+
+    async def insert() -> None:
+        order = DBOrder(user_id=user_id, quantity=1, total_amount=10)
+        if mode == "group commit":
+            await batcher.submit(order)
+        else:
+            async with sessions() as session:
+                session.add(order)
+                await session.commit()
+
+    latencies: list[float] = []
+    errors = 0
+
+    async def timed() -> None:
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            await insert()
+        except Exception:
+            errors += 1
+        else:
+            latencies.append(time.perf_counter() - start)
+
+    # Open the pool before the clock starts
+    for connection in await asyncio.gather(*(engine.connect() for _ in range(pool_size))):
+        await connection.close()
+    tasks = []
+    started = time.perf_counter()
+    total = int(rate * seconds)
+    while len(tasks) < total:
+        due = min(total, int((time.perf_counter() - started) * rate) + 1)
+        tasks.extend(asyncio.create_task(timed()) for _ in range(due - len(tasks)))
+        await asyncio.sleep(TICK_SECONDS)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return latencies, errors, elapsed
+
+
+def run_worker(arguments: tuple) -> tuple:
+    return asyncio.run(offer(*arguments))
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else float("nan")
+
+
+async def prepare() -> UUID:
+    engine = make_engine(1)
+    async with engine.connect() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.commit()
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    user = DBUser(email=f"bench_{uuid4()}@example.com", full_name="Bench", hashed_password="-")
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        session.add(user)
+        await session.commit()
+    await engine.dispose()
+    return user.id
+
+
+async def execute(sql: str) -> None:
+    engine = make_engine(1)
+    async with engine.begin() as conn:
+        await conn.execute(text(sql))
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rates", type=int, nargs="+", default=[1000, 2500, 5000, 10000])
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--pool-size", type=int, default=20, help="Connections per process")
+    parser.add_argument("--window-ms", type=float, default=settings.ORDER_GROUP_COMMIT_WINDOW_MILLISECONDS)
+    args = parser.parse_args()
+
+    user_id = asyncio.run(prepare())
+    try:
+        print(
+            f"{args.seconds:g}s per run, {args.processes} process(es) with {args.pool_size} connections each, "
+            f"{args.window_ms:g} ms window\n"
+        )
+        print(f"{'offered/s':>10}{'mode':>15}{'achieved/s':>12}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+        with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+            for rate in args.rates:
+                for mode in MODES:
+                    worker = (mode, rate / args.processes, args.seconds, user_id, args.pool_size, args.window_ms)
+                    results = pool.map(run_worker, [worker] * args.processes)
+                    latencies = [latency for result in results for latency in result[0]]
+                    errors = sum(result[1] for result in results)
+                    achieved = len(latencies) / max(result[2] for result in results)
+                    print(
+                        f"{rate:>10,}{mode:>15}{achieved:>12,.0f}"
+                        f"{percentile(latencies, 0.5):>9.1f}{percentile(latencies, 0.99):>9.1f}{errors:>8}"
+                    )
+                    asyncio.run(execute("TRUNCATE orders CASCADE"))
+    finally:
+        asyncio.run(execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Compare read throughput through a transaction-mode pooler against direct connections.
+
+Usage (inside the api container, with the pgbouncer profile running and the database seeded):
+
+    python scripts/bench_pgbouncer.py --requests 5000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.db.operations import get_engine_options
+from src.routes.v1.books.service import BookService
+from src.settings import settings
+
+
+async def run(url: str, requests: int, concurrency: int) -> float:
+    async_engine = create_async_engine(url, **get_engine_options())
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore, AsyncSessionLocal() as session:
+            await BookService(db_session=session).list()
+
+    await one()  # Warm up
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    await async_engine.dispose()
+    return requests / elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--pgbouncer-host", default="pgbouncer")
+    parser.add_argument("--pgbouncer-port", type=int, default=6432)
+    args = parser.parse_args()
+
+    credentials = f"{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}"
+    pooler_url = f"postgresql+asyncpg://{credentials}@{args.pgbouncer_host}:{args.pgbouncer_port}/{settings.POSTGRES_DB}"
+
+    settings.DATABASE_PGBOUNCER_MODE = False
+    direct = await run(settings.DATABASE_URL, args.requests, args.concurrency)
+    print(f"direct (pooled, prepared statements cached): {direct:,.0f} queries/s")
+
+    settings.DATABASE_PGBOUNCER_MODE = True
+    via_pooler = await run(pooler_url, args.requests, args.concurrency)
+    print(f"pgbouncer (transaction mode, no statement cache): {via_pooler:,.0f} queries/s")
+    print(f"ratio: {via_pooler / direct:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+"""Compare catalog reads through the join path against the denormalized read model.
+
+Seeds a large catalog into a scratch schema (dropped afterwards), with the read model
+triggers installed, then times each read both ways:
+
+    python scripts/bench_read_model.py --authors 2000 --books-per-author 50
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import src.db.models  # noqa: E402,F401  Registers the tables and read model triggers
+from src.settings import settings  # noqa: E402
+
+SCHEMA = "bench_read_model"
+
+BOOK_JOIN = """
+    SELECT b.id, b.title, b.author_id, a.name AS author_name, b.description, b.price, b.published_date
+    FROM books b JOIN authors a ON a.id = b.author_id
+"""
+BOOK_READ_MODEL = "SELECT id, title, author_id, author_name, description, price, published_date FROM catalog_books"
+
+QUERIES = {
+    "list books": (BOOK_JOIN, BOOK_READ_MODEL),
+    "get book": (f"{BOOK_JOIN} WHERE b.id = :book_id", f"{BOOK_READ_MODEL} WHERE id = :book_id"),
+    "books by author": (f"{BOOK_JOIN} WHERE b.author_id = :author_id", f"{BOOK_READ_MODEL} WHERE author_id = :author_id"),
+    "author summary": (
+        """
+        SELECT a.id, a.name, a.bio, count(b.id), min(b.price), max(b.price)
+        FROM authors a LEFT JOIN books b ON b.author_id = a.id WHERE a.id = :author_id GROUP BY a.id
+        """,
+        "SELECT id, name, bio, book_count, min_price, max_price FROM catalog_authors WHERE id = :author_id",
+    ),
+}
+
+
+async def seed(conn, authors: int, books_per_author: int) -> tuple[list, list]:
+    author_ids = [uuid4() for _ in range(authors)]
+    book_ids = []
+    await conn.execute(
+        text("INSERT INTO authors (id, name, bio, created_at, updated_at) VALUES (:id, :name, NULL, now(), now())"),
+        [{"id": author_id, "name": f"Author {index}"} for index, author_id in enumerate(author_ids)],
+    )
+    rows = []
+    for author_id in author_ids:
+        for index in range(books_per_author):
+            book_id = uuid4()
+            book_ids.append(book_id)
+            rows.append(
+                {"id": book_id, "title": f"Book {len(book_ids)}", "author_id": author_id, "price": 5 + index % 40}
+            )
+    start = time.perf_counter()
+    await conn.execute(
+        text(
+            "INSERT INTO books (id, title, author_id, description, price, published_date, created_at, updated_at) "
+            "VALUES (:id, :title, :author_id, 'A short description.', :price, NULL, now(), now())"
+        ),
+        rows,
+    )
+    elapsed = time.perf_counter() - start
+    print(f"Seeded {len(rows):,} books in {elapsed:.1f}s ({len(rows) / elapsed:,.0f} rows/s with triggers)")
+    await conn.execute(text("ANALYZE"))
+    return author_ids, book_ids
+
+
+async def time_query(conn, sql: str, params: list, repeat: int) -> float:
+    timings = []
+    for index in range(repeat):
+        start = time.perf_counter()
+        (await conn.execute(text(sql), params[index % len(params)])).all()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+async def time_author_list(conn, read_model: bool, repeat: int) -> float:
+    """The authors list: one books query per author before, two queries in total now."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if read_model:
+            (await conn.execute(text("SELECT id, name, bio, book_count, min_price, max_price FROM catalog_authors"))).all()
+            (await conn.execute(text(BOOK_READ_MODEL))).all()
+        else:
+            authors = (await conn.execute(text("SELECT id, name, bio FROM authors"))).all()
+            for author in authors:
+                (await conn.execute(text(f"{BOOK_JOIN} WHERE b.author_id = :author_id"), {"author_id": author.id})).all()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--authors", type=int, default=2000)
+    parser.add_argument("--books-per-author", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_async_engine(settings.DATABASE_URL, connect_args={"server_settings": {"search_path": SCHEMA}})
+    async with engine.connect() as conn:
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.commit()
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        async with engine.begin() as conn:
+            author_ids, book_ids = await seed(conn, args.authors, args.books_per_author)
+        async with engine.connect() as conn:
+            sample = {
+                "list books": [{}],
+                "get book": [{"book_id": book_id} for book_id in random.sample(book_ids, 100)],
+                "books by author": [{"author_id": author_id} for author_id in random.sample(author_ids, 100)],
+                "author summary": [{"author_id": author_id} for author_id in random.sample(author_ids, 100)],
+            }
+            print(f"\n{'query':<18}{'join (ms)':>12}{'read model (ms)':>18}{'speed-up':>10}")
+            for name, (join_sql, read_model_sql) in QUERIES.items():
+                repeat = max(5, args.repeat // 20) if name == "list books" else args.repeat
+                join_ms = await time_query(conn, join_sql, sample[name], repeat)
+                read_model_ms = await time_query(conn, read_model_sql, sample[name], repeat)
+                print(f"{name:<18}{join_ms:>12.3f}{read_model_ms:>18.3f}{join_ms / read_model_ms:>9.1f}x")
+            join_ms = await time_author_list(conn, read_model=False, repeat=3)
+            read_model_ms = await time_author_list(conn, read_model=True, repeat=3)
+            print(f"{'list authors':<18}{join_ms:>12.3f}{read_model_ms:>18.3f}{join_ms / read_model_ms:>9.1f}x")
+    finally:
+        async with engine.connect() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
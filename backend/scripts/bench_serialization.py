@@ -0,0 +1,85 @@
+"""Time serialization of a large book list through each response path.
+
+Builds synthetic repository rows and serializes them the way routes used to (a
+``BookOutput`` per row, then FastAPI's response_model validation, ``jsonable_encoder`` and
+``json.dumps``), the way the response cache used to (a ``BookOutput`` per row, then a
+``TypeAdapter``), and the way they do now (the rows as is, through pydantic-core):
+
+    python scripts/bench_serialization.py --books 10000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import TypeAdapter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.routes.v1.books.schema import BookOutput  # noqa: E402
+from src.utils.serialization import dump_json  # noqa: E402
+
+
+def synthetic_rows(count: int) -> List[dict]:
+    author_ids = [uuid4() for _ in range(max(1, count // 10))]
+    published = datetime(2000, 1, 1)
+    return [
+        {
+            "id": uuid4(),
+            "title": f"Book title {index}",
+            "author_id": author_ids[index % len(author_ids)],
+            "author_name": f"Author {index % len(author_ids)}",
+            "description": "A short description of the book, about a sentence long.",
+            "price": 9.99 + index % 20,
+            "published_date": published + timedelta(days=index % 5000),
+        }
+        for index in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.books)
+    field = create_model_field(name="Response_list_books", type_=List[BookOutput], mode="serialization")
+    adapter = TypeAdapter(List[BookOutput])
+
+    async def response_model_path() -> bytes:
+        content = await serialize_response(field=field, response_content=[BookOutput(**row) for row in rows])
+        return json.dumps(jsonable_encoder(content)).encode()
+
+    paths = {
+        "response_model + json.dumps": lambda: asyncio.run(response_model_path()),
+        "BookOutput + TypeAdapter": lambda: adapter.dump_json([BookOutput(**row) for row in rows]),
+        "trusted rows + pydantic-core": lambda: dump_json(rows),
+    }
+
+    baseline = None
+    print(f"Serializing {args.books:,} books, median of {args.repeat} runs\n")
+    print(f"{'path':<32}{'ms':>10}{'speed-up':>10}")
+    for name, serialize in paths.items():
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            serialize()
+            timings.append(time.perf_counter() - start)
+        elapsed = statistics.median(timings) * 1000
+        baseline = baseline or elapsed
+        print(f"{name:<32}{elapsed:>10.1f}{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
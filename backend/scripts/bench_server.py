@@ -0,0 +1,83 @@
+"""Compare requests/second of the production entrypoint against the dev server command.
+
+Starts each server in turn on the same machine, waits for it to answer, then drives it
+with a fixed number of concurrent keep-alive clients:
+
+    python scripts/bench_server.py --path /health --requests 20000 --concurrency 100
+
+The load generator is a single Python process; for very high worker counts point a
+dedicated tool (wrk, oha) at the same two commands instead.
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import httpx
+
+DEV_COMMAND = ["uvicorn", "src.main:app", "--host", "127.0.0.1", "--port", "{port}", "--reload"]
+PROD_COMMAND = [sys.executable, "-m", "src.server"]
+
+
+async def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready")
+
+
+async def drive(url: str, requests: int, concurrency: int) -> float:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    remaining = iter(range(requests))
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        for _ in remaining:
+            await client.get(url)
+
+    async with httpx.AsyncClient(limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start)
+
+
+def benchmark(name: str, command: list[str], env: dict, port: int, args: argparse.Namespace) -> float:
+    command = [part.format(port=port) for part in command]
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}{args.path}"
+    try:
+        asyncio.run(wait_until_ready(url))
+        asyncio.run(drive(url, min(1000, args.requests), args.concurrency))  # Warm up
+        rps = asyncio.run(drive(url, args.requests, args.concurrency))
+        print(f"{name}: {rps:,.0f} requests/s")
+        return rps
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--path", default="/health")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    dev = benchmark("dev (uvicorn --reload)", DEV_COMMAND, dict(os.environ), 18080, args)
+    prod_env = dict(os.environ, WEB_CONCURRENCY=str(args.workers), SERVER_HOST="127.0.0.1", SERVER_PORT="18081")
+    prod = benchmark(f"production ({args.workers} workers)", PROD_COMMAND, prod_env, 18081, args)
+    print(f"speedup: {prod / dev:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Report the memory used by the in-memory catalog snapshot.
+
+Builds a snapshot of synthetic books (ten per author) and measures the memory it retains
+with tracemalloc, next to the list of row dicts the database path materialises per request:
+
+    python scripts/catalog_snapshot_memory.py --books 100000
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.routes.v1.books.schema import AuthorChange, BookOutput, CatalogChanges  # noqa: E402
+from src.routes.v1.books.snapshot import CatalogSnapshot  # noqa: E402
+
+
+def synthetic_changes(count: int) -> CatalogChanges:
+    authors = [AuthorChange(id=uuid4(), name=f"Author {index}", bio=None) for index in range(max(1, count // 10))]
+    published = datetime(2000, 1, 1)
+    books = [
+        BookOutput(
+            id=uuid4(),
+            title=f"Book title {index}",
+            author_id=authors[index % len(authors)].id,
+            author_name=authors[index % len(authors)].name,
+            description="A short description of the book, about a sentence long.",
+            price=9.99 + index % 20,
+            published_date=published + timedelta(days=index % 5000),
+        )
+        for index in range(count)
+    ]
+    return CatalogChanges(
+        cursor=datetime.now(), books=books, authors=authors, deleted_books=[], deleted_authors=[]
+    )
+
+
+def measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del built
+    return after - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # Each build decodes fresh rows and keeps only what it retains, so field values
+    # (UUIDs, strings, datetimes) are counted
+    def build_snapshot() -> CatalogSnapshot:
+        snapshot = CatalogSnapshot(load_changes=None)
+        snapshot.apply(synthetic_changes(args.books))
+        return snapshot
+
+    def build_rows() -> list:
+        return [book.model_dump() for book in synthetic_changes(args.books).books]
+
+    for label, build in (("Snapshot", build_snapshot), ("Row dicts", build_rows)):
+        used = measure(build)
+        print(
+            f"{label:<10} {used / 2**20:8.1f} MiB for {args.books} books, "
+            f"{used / args.books:6.0f} bytes/book, {used / args.books * 100_000 / 2**20:6.1f} MiB per 100k books"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Report where application import time goes.
+
+Runs ``python -X importtime -c "import src.main"`` in a fresh interpreter and lists the
+modules with the largest cumulative and self import times:
+
+    python scripts/import_report.py --top 25
+"""
+
+import argparse
+import subprocess
+import sys
+
+
+def measure(module: str) -> list[tuple[str, int, int]]:
+    """Return (module, self_us, cumulative_us) for every module imported by ``module``."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="src.main")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = measure(args.module)
+    total_us = next(cumulative for name, _, cumulative in rows if name == args.module)
+    print(f"Total import time for {args.module}: {total_us / 1000:.1f} ms\n")
+
+    for title, key in (("cumulative", 2), ("self", 1)):
+        print(f"Top {args.top} modules by {title} time:")
+        for name, self_us, cumulative_us in sorted(rows, key=lambda row: row[key], reverse=True)[: args.top]:
+            print(f"  {cumulative_us / 1000:8.1f} ms cumulative  {self_us / 1000:8.1f} ms self  {name}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
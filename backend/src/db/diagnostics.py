@@ -0,0 +1,84 @@
+"""Connection pool diagnostics.
+
+Tracks which route checked out each pooled connection so that pool exhaustion can be
+reported in terms of the requests holding connections rather than a bare timeout.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+logger = logging.getLogger(__name__)
+
+current_scope: ContextVar[Dict[str, Any] | None] = ContextVar("current_scope", default=None)
+
+# DBAPI connection id -> (route, checkout time)
+_holders: Dict[int, tuple[str, float]] = {}
+
+
+def _route_name(scope: Dict[str, Any] | None) -> str:
+    if scope is None:
+        return "<background>"
+    route = scope.get("route")
+    path = route.path if route is not None else scope.get("path", "")
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+def track_connection_holders(engine: Engine) -> None:
+    """Record the route holding each connection checked out of ``engine``'s pool."""
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        _holders[id(dbapi_connection)] = (_route_name(current_scope.get()), time.monotonic())
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record) -> None:
+        _holders.pop(id(dbapi_connection), None)
+
+
+def connection_holders() -> List[Dict[str, Any]]:
+    """Summarise checked-out connections by route, longest held first."""
+    now = time.monotonic()
+    counts: Counter[str] = Counter()
+    oldest: Dict[str, float] = {}
+    for route, checked_out_at in list(_holders.values()):
+        counts[route] += 1
+        oldest[route] = max(oldest.get(route, 0.0), now - checked_out_at)
+    return [
+        {"route": route, "connections": count, "longest_held_seconds": round(oldest[route], 3)}
+        for route, count in sorted(counts.items(), key=lambda item: oldest[item[0]], reverse=True)
+    ]
+
+
+class RouteContextMiddleware:
+    """Expose the current request scope to pool event listeners."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
+
+
+async def pool_exhausted_handler(request: Request, exc: PoolTimeout) -> JSONResponse:
+    logger.error(
+        "Database connection pool exhausted while serving %s; connections held by: %s",
+        _route_name(request.scope),
+        connection_holders(),
+    )
+    return JSONResponse(status_code=503, content={"detail": "Database connection pool exhausted"})
@@ -1,9 +1,14 @@
 """Database models using SQLModel."""
 
 from datetime import datetime
+from enum import Enum
+from typing import Any, Dict
 from uuid import UUID, uuid4
 
+from sqlalchemy import CheckConstraint, Column, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlmodel import Field, SQLModel
+from src.db.read_model import install_read_model
 
 
 class DBUser(SQLModel, table=True):
@@ -30,7 +35,9 @@ class DBAuthor(SQLModel, table=True):
     name: str = Field(index=True)
     bio: str | None = Field(default=None)
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": datetime.utcnow})
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow, index=True, sa_column_kwargs={"onupdate": datetime.utcnow}
+    )
 
 
 class DBBook(SQLModel, table=True):
@@ -44,20 +51,122 @@ class DBBook(SQLModel, table=True):
     description: str | None = Field(default=None)
     price: float
     published_date: datetime | None = Field(default=None)
+    # Units left, or None when stock is not tracked. Sales are held in Redis and applied
+    # here in batches by inventory reconciliation
+    stock: int | None = Field(default=None)
+    version: int = Field(default=1)  # Bumped by every update, which is conditional on it
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": datetime.utcnow})
+    # Indexed so that delta sync (updated_at > cursor) is an index range scan
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow, index=True, sa_column_kwargs={"onupdate": datetime.utcnow}
+    )
+
+
+class DBCatalogBook(SQLModel, table=True):
+    """Read model: a book with its author name, maintained by triggers (see db/read_model.py)."""
+
+    __tablename__ = "catalog_books"
+
+    id: UUID = Field(primary_key=True)
+    title: str
+    author_id: UUID = Field(index=True)
+    author_name: str
+    description: str | None = Field(default=None)
+    price: float
+    published_date: datetime | None = Field(default=None)
+
+
+class DBCatalogAuthor(SQLModel, table=True):
+    """Read model: an author with book count and price range, maintained by triggers."""
+
+    __tablename__ = "catalog_authors"
+
+    id: UUID = Field(primary_key=True)
+    name: str
+    bio: str | None = Field(default=None)
+    book_count: int = Field(default=0)
+    min_price: float | None = Field(default=None)
+    max_price: float | None = Field(default=None)
+
+
+class DBTombstone(SQLModel, table=True):
+    """Record of a deleted catalog row, so that delta sync can report deletions."""
+
+    __tablename__ = "tombstones"
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    entity_type: str  # book or author
+    entity_id: UUID
+    deleted_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
+class OrderStatus(str, Enum):
+    """Order lifecycle: pending orders are completed or cancelled, and then never change."""
+
+    PENDING = "pending"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
 
 
 class DBOrder(SQLModel, table=True):
     """Order model for user orders."""
 
     __tablename__ = "orders"
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ({})".format(", ".join(f"'{status.value}'" for status in OrderStatus)), name="ck_orders_status"
+        ),
+        # Covers only the live pending orders that expiry scans for, not the growing history
+        Index("ix_orders_pending_created_at", "created_at", postgresql_where=text("status = 'pending'")),
+        # Order history pages by (created_at, id) within a user; also serves lookups by user
+        Index("ix_orders_user_created_at", "user_id", "created_at", "id"),
+        # Orders are appended in created_at order, so per-block-range summaries make date range
+        # scans cheap at a tiny fraction of a B-tree's size
+        Index("ix_orders_created_at_brin", "created_at", postgresql_using="brin"),
+    )
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
-    user_id: UUID = Field(foreign_key="users.id", index=True)
-    book_id: UUID = Field(foreign_key="books.id", index=True)
+    user_id: UUID = Field(foreign_key="users.id")
+    book_id: UUID | None = Field(default=None, foreign_key="books.id", index=True)  # Single-book orders only
     quantity: int = Field(default=1)
     total_amount: float
-    status: str = Field(default="pending", index=True)  # pending, completed, cancelled
+    status: str = Field(default=OrderStatus.PENDING.value, index=True)  # See OrderStatus
+    version: int = Field(default=1)  # Bumped by every update, which is conditional on it
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow, sa_column_kwargs={"onupdate": datetime.utcnow})
+
+
+class DBOrderItem(SQLModel, table=True):
+    """Line item of an order placed through checkout, priced when the order was placed."""
+
+    __tablename__ = "order_items"
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    order_id: UUID = Field(foreign_key="orders.id", index=True, ondelete="CASCADE")
+    book_id: UUID = Field(foreign_key="books.id", index=True)
+    quantity: int
+    unit_price: float
+    stock_applied: bool = Field(default=False)  # Deducted from books.stock by reconciliation
+
+    # Reconciliation scans only the items it has not applied yet
+    __table_args__ = (Index("ix_order_items_unapplied_stock", "book_id", postgresql_where=text("NOT stock_applied")),)
+
+
+class DBOutboxMessage(SQLModel, table=True):
+    """Side effect of a committed write, waiting for the outbox relay (see db/outbox.py)."""
+
+    __tablename__ = "outbox"
+    # The relay scans only live messages, oldest due first; dead ones are kept for inspection
+    __table_args__ = (Index("ix_outbox_due", "available_at", postgresql_where=text("dead_at IS NULL")),)
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    topic: str
+    payload: Dict[str, Any] = Field(sa_column=Column(JSONB, nullable=False))
+    attempts: int = Field(default=0)
+    available_at: datetime = Field(default_factory=datetime.utcnow)  # Not delivered before this
+    last_error: str | None = Field(default=None)
+    dead_at: datetime | None = Field(default=None)  # Set once OUTBOX_MAX_ATTEMPTS are used up
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+install_read_model(SQLModel.metadata)
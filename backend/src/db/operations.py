@@ -1,17 +1,71 @@
+import asyncio
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict
+from uuid import uuid4
 
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.diagnostics import track_connection_holders
 from src.settings import settings
 
+
+def get_engine_options() -> Dict[str, Any]:
+    """Build the engine keyword arguments for the configured connection mode.
+
+    In PgBouncer mode a server connection is only ours for the duration of a
+    transaction, so prepared statements must not be cached per connection and
+    any statement asyncpg does prepare gets a unique name to avoid collisions.
+    """
+    if not settings.DATABASE_PGBOUNCER_MODE:
+        return {
+            "pool_size": settings.DATABASE_WORKER_POOL_SIZE,
+            "max_overflow": settings.DATABASE_WORKER_POOL_OVERFLOW,
+            "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        }
+
+    options: Dict[str, Any] = {
+        "connect_args": {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        },
+    }
+    if settings.DATABASE_PGBOUNCER_POOL_SIZE > 0:
+        options.update(
+            pool_size=settings.DATABASE_PGBOUNCER_POOL_SIZE,
+            max_overflow=0,
+            pool_pre_ping=True,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        )
+    else:
+        options["poolclass"] = NullPool
+    return options
+
+
 # SQLAlchemy engine with custom pool settings
-async_engine = create_async_engine(
-    settings.DATABASE_URL, pool_size=settings.DATABASE_POOL_SIZE, max_overflow=settings.DATABASE_POOL_SIZE_OVERFLOW
-)
+async_engine = create_async_engine(settings.DATABASE_URL, **get_engine_options())
+track_connection_holders(async_engine.sync_engine)
 AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
 
 
+async def prewarm_pool(engine: AsyncEngine, count: int) -> int:
+    """Open up to ``count`` connections concurrently and return them to the pool.
+
+    Pays connect and TLS handshake latency at startup rather than on the first requests.
+    Returns the number of connections opened.
+    """
+    if isinstance(engine.pool, NullPool):
+        return 0
+    count = min(count, engine.pool.size())
+    if count <= 0:
+        return 0
+    connections = await asyncio.gather(*(engine.connect() for _ in range(count)))
+    for connection in connections:
+        await connection.close()
+    return count
+
+
 @asynccontextmanager
 async def managed_session():
     async with AsyncSessionLocal() as session:
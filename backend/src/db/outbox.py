@@ -0,0 +1,153 @@
+"""Transactional outbox for the side effects of committed writes.
+
+Work that follows a write (analytics, notifications, cache invalidation) should neither
+add latency to the request nor be lost if the process dies right after the commit. The
+service adds an ``outbox`` row in the same transaction as the write, so the message
+exists exactly when the write does and the request pays for one more row in its INSERT.
+
+An ``OutboxRelay`` drains the table in batches. A batch locks the oldest due messages
+with ``FOR UPDATE SKIP LOCKED``, so any number of relays share the work without waiting
+on each other; runs the handlers registered for each message's topic; deletes the
+messages that were delivered; and reschedules the others with exponential backoff. A
+message that fails OUTBOX_MAX_ATTEMPTS times is kept, with its last error, as dead.
+
+Delivery is at least once: a relay that dies after a handler ran but before its batch
+committed delivers the message again, so handlers must be idempotent. Handlers get the
+message id for that purpose.
+
+Relays run in ``python -m src.worker``, or in every API worker with OUTBOX_RELAY_ENABLED.
+"""
+
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Mapping
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import col, delete, select
+from src.db.models import DBOutboxMessage
+from src.db.operations import AsyncSessionLocal
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[UUID, Dict[str, Any]], Awaitable[None]]
+
+MAX_ERROR_LENGTH = 1000
+
+
+class NoHandler(Exception):
+    def __init__(self, topic: str) -> None:
+        super().__init__(f"No outbox handler for {topic}")
+
+
+def outbox_message(topic: str, payload: Mapping[str, Any]) -> DBOutboxMessage:
+    """A message to add to the session of the write it follows from."""
+    return DBOutboxMessage(topic=topic, payload=jsonable_encoder(payload))
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff with jitter, so that messages failed together are not retried together."""
+    delay = min(settings.OUTBOX_RETRY_MAX_SECONDS, settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+class OutboxRelay:
+    def __init__(self, session_factory: async_sessionmaker = AsyncSessionLocal) -> None:
+        self.session_factory = session_factory
+        self._handlers: Dict[str, List[Handler]] = {}
+        self._worker: asyncio.Task | None = None
+
+    def handler(self, topic: str) -> Callable[[Handler], Handler]:
+        """Register the decorated coroutine to run for every message on ``topic``."""
+
+        def register(handler: Handler) -> Handler:
+            self._handlers.setdefault(topic, []).append(handler)
+            return handler
+
+        return register
+
+    @property
+    def topics(self) -> List[str]:
+        return list(self._handlers)
+
+    async def drain(self) -> int:
+        """Deliver one batch of due messages and return how many were attempted."""
+        async with self.session_factory() as session:
+            stmt = (
+                select(DBOutboxMessage)
+                .where(col(DBOutboxMessage.dead_at).is_(None), DBOutboxMessage.available_at <= datetime.utcnow())
+                .order_by(DBOutboxMessage.available_at)
+                .limit(settings.OUTBOX_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            messages = (await session.exec(stmt)).all()
+            if not messages:
+                return 0
+
+            slots = asyncio.Semaphore(settings.OUTBOX_CONCURRENCY)
+
+            async def deliver(message: DBOutboxMessage) -> Exception | None:
+                async with slots:
+                    return await self._deliver(message)
+
+            errors = await asyncio.gather(*(deliver(message) for message in messages))
+            delivered = [message.id for message, error in zip(messages, errors) if error is None]
+            if delivered:
+                await session.exec(delete(DBOutboxMessage).where(col(DBOutboxMessage.id).in_(delivered)))
+            now = datetime.utcnow()
+            for message, error in zip(messages, errors):
+                if error is None:
+                    continue
+                message.attempts += 1
+                message.last_error = repr(error)[:MAX_ERROR_LENGTH]
+                if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                    message.dead_at = now
+                    logger.error(f"Outbox message {message.id} ({message.topic}) is dead: {error!r}")
+                else:
+                    message.available_at = now + retry_delay(message.attempts)
+            await session.commit()
+        return len(messages)
+
+    async def _deliver(self, message: DBOutboxMessage) -> Exception | None:
+        handlers = self._handlers.get(message.topic)
+        try:
+            if not handlers:
+                raise NoHandler(message.topic)
+            for handler in handlers:
+                await asyncio.wait_for(
+                    handler(message.id, message.payload), timeout=settings.OUTBOX_HANDLER_TIMEOUT_SECONDS
+                )
+        except Exception as exc:
+            logger.warning(f"Outbox message {message.id} ({message.topic}) failed: {exc!r}")
+            return exc
+        return None
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # A full batch suggests a backlog, so carry on without waiting
+                if await self.drain() >= settings.OUTBOX_BATCH_SIZE:
+                    continue
+            except Exception as exc:
+                logger.warning(f"Outbox drain failed: {exc!r}")
+            await asyncio.sleep(settings.OUTBOX_POLL_SECONDS)
+
+
+outbox_relay = OutboxRelay()
@@ -0,0 +1,133 @@
+"""Denormalized catalog read model maintained by database triggers.
+
+``catalog_books`` holds each book with its author name, and ``catalog_authors`` each
+author with their book count and price range, so that catalog reads are single-table
+index lookups instead of joins and per-request aggregation. Row triggers on ``books``
+and ``authors`` keep both tables in step within the writing transaction.
+
+Triggers lock the author's ``catalog_authors`` row before reading the author name or
+recomputing aggregates. Under READ COMMITTED each statement that follows the lock sees
+every concurrent write that committed while waiting for it, so concurrent book writes and
+author renames cannot leave a stale name or count behind.
+
+The functions and triggers are (re)installed after ``create_all``; when the read model
+tables are created, they are backfilled from the existing rows.
+"""
+
+from sqlalchemy import MetaData, event
+
+FUNCTIONS = [
+    """
+    CREATE OR REPLACE FUNCTION catalog_refresh_author(target uuid) RETURNS void AS $$
+    BEGIN
+        PERFORM 1 FROM catalog_authors WHERE id = target FOR UPDATE;
+        UPDATE catalog_authors
+        SET (book_count, min_price, max_price) = (
+            SELECT count(*), min(price), max(price) FROM books WHERE author_id = target
+        )
+        WHERE id = target;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION catalog_books_sync() RETURNS trigger AS $$
+    DECLARE
+        current_author_name text;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            DELETE FROM catalog_books WHERE id = OLD.id;
+            PERFORM catalog_refresh_author(OLD.author_id);
+            RETURN NULL;
+        END IF;
+
+        IF TG_OP = 'UPDATE' AND OLD.author_id <> NEW.author_id THEN
+            -- Lock both authors in a fixed order so that opposite moves cannot deadlock
+            PERFORM 1 FROM catalog_authors WHERE id IN (OLD.author_id, NEW.author_id) ORDER BY id FOR UPDATE;
+        END IF;
+        SELECT name INTO current_author_name FROM catalog_authors WHERE id = NEW.author_id FOR UPDATE;
+
+        INSERT INTO catalog_books (id, title, author_id, author_name, description, price, published_date)
+        VALUES (NEW.id, NEW.title, NEW.author_id, current_author_name, NEW.description, NEW.price, NEW.published_date)
+        ON CONFLICT (id) DO UPDATE SET
+            title = EXCLUDED.title,
+            author_id = EXCLUDED.author_id,
+            author_name = EXCLUDED.author_name,
+            description = EXCLUDED.description,
+            price = EXCLUDED.price,
+            published_date = EXCLUDED.published_date;
+
+        IF TG_OP = 'UPDATE' AND OLD.author_id <> NEW.author_id THEN
+            PERFORM catalog_refresh_author(OLD.author_id);
+        END IF;
+        IF TG_OP = 'INSERT' OR OLD.author_id <> NEW.author_id OR OLD.price IS DISTINCT FROM NEW.price THEN
+            PERFORM catalog_refresh_author(NEW.author_id);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION catalog_authors_sync() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO catalog_authors (id, name, bio, book_count) VALUES (NEW.id, NEW.name, NEW.bio, 0)
+            ON CONFLICT (id) DO NOTHING;
+        ELSIF TG_OP = 'UPDATE' THEN
+            UPDATE catalog_authors SET name = NEW.name, bio = NEW.bio WHERE id = NEW.id;
+            IF OLD.name IS DISTINCT FROM NEW.name THEN
+                UPDATE catalog_books SET author_name = NEW.name WHERE author_id = NEW.id;
+            END IF;
+        ELSE
+            DELETE FROM catalog_authors WHERE id = OLD.id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+]
+
+TRIGGERS = [
+    # CREATE OR REPLACE TRIGGER needs PostgreSQL 14; drop and recreate to support 13
+    "DROP TRIGGER IF EXISTS catalog_books_sync ON books",
+    """
+    CREATE TRIGGER catalog_books_sync
+    AFTER INSERT OR DELETE OR UPDATE OF title, author_id, description, price, published_date ON books
+    FOR EACH ROW EXECUTE FUNCTION catalog_books_sync()
+    """,
+    "DROP TRIGGER IF EXISTS catalog_authors_sync ON authors",
+    """
+    CREATE TRIGGER catalog_authors_sync
+    AFTER INSERT OR DELETE OR UPDATE OF name, bio ON authors
+    FOR EACH ROW EXECUTE FUNCTION catalog_authors_sync()
+    """,
+]
+
+BACKFILL = [
+    """
+    INSERT INTO catalog_authors (id, name, bio, book_count, min_price, max_price)
+    SELECT a.id, a.name, a.bio, count(b.id), min(b.price), max(b.price)
+    FROM authors a LEFT JOIN books b ON b.author_id = a.id
+    GROUP BY a.id
+    ON CONFLICT (id) DO NOTHING
+    """,
+    """
+    INSERT INTO catalog_books (id, title, author_id, author_name, description, price, published_date)
+    SELECT b.id, b.title, b.author_id, a.name, b.description, b.price, b.published_date
+    FROM books b JOIN authors a ON a.id = b.author_id
+    ON CONFLICT (id) DO NOTHING
+    """,
+]
+
+
+def install_read_model(metadata: MetaData) -> None:
+    """Install the read model triggers whenever ``metadata.create_all`` runs on PostgreSQL."""
+
+    @event.listens_for(metadata, "after_create")
+    def after_create(target, connection, tables=(), **kw) -> None:
+        if connection.dialect.name != "postgresql":
+            return
+        for statement in (*FUNCTIONS, *TRIGGERS):
+            connection.exec_driver_sql(statement)
+        if any(table.name in ("catalog_books", "catalog_authors") for table in tables):
+            for statement in BACKFILL:
+                connection.exec_driver_sql(statement)
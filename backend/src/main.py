@@ -3,12 +3,14 @@ from itertools import chain
 
 from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.routing import APIRoute, APIWebSocketRoute
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from src.db.diagnostics import RouteContextMiddleware, pool_exhausted_handler
 from src.routes.health import router as health_router
 from src.routes.v1 import router as v1_router
 from src.settings import settings
 from src.utils.app_lifespan import lifespan
+from src.utils.sse import EventStreamAwareGZipMiddleware
 
 # Configure logging
 logging.basicConfig(
@@ -33,10 +35,15 @@ def get_application() -> FastAPI:
 
     # Add compression middleware to compress larger responses
     app.add_middleware(
-        GZipMiddleware,
+        EventStreamAwareGZipMiddleware,
         minimum_size=1000,  # Don't compress tiny responses
+        excluded_prefix="/api/v1/events",
     )
 
+    # Attribute pooled database connections to the routes holding them
+    app.add_middleware(RouteContextMiddleware)
+    app.add_exception_handler(PoolTimeout, pool_exhausted_handler)
+
     # Collect all routes from all routers
     routers = [health_router, v1_router]
     routes = list(chain.from_iterable(router.routes for router in routers))
@@ -45,11 +52,12 @@ def get_application() -> FastAPI:
     app.include_router(APIRouter(routes=routes))
 
     # Log the addition of each route
-    for route in routes:
-        if isinstance(route, APIRoute):
-            logger.info(f"HTTP Route added: {route.path} - {route.methods}")
-        elif isinstance(route, APIWebSocketRoute):
-            logger.info(f"WebSocket Route added: {route.path}")
+    if logger.isEnabledFor(logging.DEBUG):
+        for route in routes:
+            if isinstance(route, APIRoute):
+                logger.debug(f"HTTP Route added: {route.path} - {route.methods}")
+            elif isinstance(route, APIWebSocketRoute):
+                logger.debug(f"WebSocket Route added: {route.path}")
 
     logger.info(f"FastAPI application initialised with {len(routes)} routes")
 
@@ -60,6 +68,7 @@ def get_application() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
         allow_credentials=True,
+        expose_headers=["ETag"],  # Sent back as If-Match by edit forms
     )
 
     return app
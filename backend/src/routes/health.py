@@ -1,6 +1,8 @@
-"""Health check endpoint."""
+"""Health check endpoints."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from src.utils.health_probes import dependency_checks
 
 router = APIRouter(tags=["health"])
 
@@ -14,3 +16,35 @@ async def health_check():
         dict: Simple OK status
     """
     return {"status": "OK"}
+
+
+@router.get("/health/live")
+async def liveness_check():
+    """
+    Liveness endpoint, answered without touching any dependency.
+
+    Returns:
+        dict: Simple OK status while the process can serve requests
+    """
+    return {"status": "OK"}
+
+
+@router.get("/health/ready")
+async def readiness_check(request: Request):
+    """
+    Readiness endpoint for load balancers.
+
+    Checks a database pool checkout, a Redis ping and that the startup warm-up has
+    completed. Dependency probes are cached for a short interval.
+
+    Returns:
+        JSONResponse: Per-dependency status and latency; 503 if any check fails
+    """
+    checks = dict(await dependency_checks())
+    warm = getattr(request.app.state, "ready", False)
+    checks["warmup"] = {"status": "ok" if warm else "pending"}
+    ready = all(check["status"] == "ok" for check in checks.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "unavailable", "checks": checks},
+    )
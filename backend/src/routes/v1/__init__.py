@@ -1,10 +1,15 @@
 """API v1 router aggregation."""
 
 from fastapi import APIRouter
+from src.routes.v1.admin.router import router as admin_router
 from src.routes.v1.authors.router import router as authors_router
 from src.routes.v1.books.router import router as books_router
+from src.routes.v1.catalog.router import router as catalog_router
+from src.routes.v1.events.router import router as events_router
+from src.routes.v1.inventory.router import router as inventory_router
 from src.routes.v1.orders.router import router as orders_router
 from src.routes.v1.users.router import router as users_router
+from src.routes.v1.waiting_room.router import router as waiting_room_router
 
 router = APIRouter(prefix="/api/v1")
 
@@ -12,3 +17,8 @@ router.include_router(users_router)
 router.include_router(authors_router)
 router.include_router(books_router)
 router.include_router(orders_router)
+router.include_router(inventory_router)
+router.include_router(waiting_room_router)
+router.include_router(catalog_router)
+router.include_router(events_router)
+router.include_router(admin_router)
@@ -0,0 +1,64 @@
+from datetime import date, datetime
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from src.db.models import DBUser, OrderStatus
+from src.routes.v1.books.service import catalog_snapshot
+from src.routes.v1.orders.analytics import daily_sales
+from src.routes.v1.orders.schema import AdminOrderPage, BulkStatusInput, BulkStatusOutput
+from src.routes.v1.orders.service import OrderService, get_order_service
+from src.utils.auth import authenticate_admin
+from src.utils.response_cache import hit_ratios
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/cache/stats")
+async def get_cache_stats(current_user: DBUser = Depends(authenticate_admin)):
+    return await hit_ratios()
+
+
+@router.get("/catalog/snapshot")
+async def get_catalog_snapshot_stats(current_user: DBUser = Depends(authenticate_admin)):
+    """Report this worker's catalog snapshot; each worker holds its own."""
+    return catalog_snapshot.stats()
+
+
+@router.get("/sales/{day}")
+async def get_daily_sales(day: date, current_user: DBUser = Depends(authenticate_admin)):
+    """Orders, units and revenue of a UTC day, and its best-selling books, as counted by the outbox worker."""
+    return await daily_sales(day)
+
+
+@router.get("/orders", response_model=AdminOrderPage)
+async def list_orders(
+    status: OrderStatus | None = None,
+    user_id: UUID | None = None,
+    book_id: UUID | None = None,
+    created_from: datetime | None = Query(default=None, description="Placed at or after"),
+    created_to: datetime | None = Query(default=None, description="Placed before"),
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
+    order_service: OrderService = Depends(get_order_service),
+    current_user: DBUser = Depends(authenticate_admin),
+):
+    """All users' orders, newest first. Narrow large tables by date range, which is cheap to scan."""
+    return await order_service.search(
+        limit=limit,
+        cursor=cursor,
+        status=status,
+        user_id=user_id,
+        book_id=book_id,
+        created_from=created_from,
+        created_to=created_to,
+    )
+
+
+@router.post("/orders/status", response_model=BulkStatusOutput)
+async def transition_orders(
+    status_input: BulkStatusInput,
+    order_service: OrderService = Depends(get_order_service),
+    current_user: DBUser = Depends(authenticate_admin),
+):
+    """Move the selected orders to a status; those that cannot make the transition are skipped."""
+    return await order_service.transition_many(order_ids=status_input.order_ids, status=status_input.status)
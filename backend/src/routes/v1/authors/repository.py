@@ -1,11 +1,29 @@
-from typing import List
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
 from uuid import UUID
 
-from sqlmodel import select
+from sqlmodel import func, select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.models import DBAuthor, DBBook
+from src.db.models import DBAuthor, DBBook, DBCatalogAuthor, DBCatalogBook, DBTombstone
 from src.routes.v1.authors.schema import AuthorCreateInput
 
+CATALOG_AUTHOR_COLUMNS = (
+    DBCatalogAuthor.id,
+    DBCatalogAuthor.name,
+    DBCatalogAuthor.bio,
+    DBCatalogAuthor.book_count,
+    DBCatalogAuthor.min_price,
+    DBCatalogAuthor.max_price,
+)
+AUTHOR_BOOK_COLUMNS = (
+    DBCatalogBook.id,
+    DBCatalogBook.title,
+    DBCatalogBook.author_id,
+    DBCatalogBook.description,
+    DBCatalogBook.price,
+    DBCatalogBook.published_date,
+)
+
 
 class AuthorRepository:
     def __init__(self, db_session: AsyncSession):
@@ -23,33 +41,32 @@ class AuthorRepository:
         result = await self.db_session.exec(stmt)
         return result.one()
 
-    async def retrieve(self, author_id: UUID) -> dict:
-        # Get author
-        author = await self._get_author(author_id)
-        
-        # Get books
-        books_stmt = select(
-            DBBook.id,
-            DBBook.title,
-            DBBook.author_id,
-            DBBook.description,
-            DBBook.price,
-            DBBook.published_date
-        ).where(DBBook.author_id == author_id)
+    async def retrieve(self, author_id: UUID) -> Dict[str, Any]:
+        """Read the author and their books from the read model: two single-table index lookups."""
+        author_stmt = select(*CATALOG_AUTHOR_COLUMNS).where(DBCatalogAuthor.id == author_id)
+        author = (await self.db_session.exec(author_stmt)).one()._asdict()
+        books_stmt = select(*AUTHOR_BOOK_COLUMNS).where(DBCatalogBook.author_id == author_id)
         books_result = await self.db_session.exec(books_stmt)
-        books = [row._asdict() for row in books_result.all()]
-        
-        return {
-            "id": author.id,
-            "name": author.name,
-            "bio": author.bio,
-            "books": books
-        }
+        return {**author, "books": [row._asdict() for row in books_result.all()]}
+
+    async def list(self) -> List[Dict[str, Any]]:
+        """Every author with their books, in two queries."""
+        authors = (await self.db_session.exec(select(*CATALOG_AUTHOR_COLUMNS))).all()
+        books_by_author: Dict[UUID, List[Dict[str, Any]]] = {}
+        for row in (await self.db_session.exec(select(*AUTHOR_BOOK_COLUMNS))).all():
+            books_by_author.setdefault(row.author_id, []).append(row._asdict())
+        return [{**row._asdict(), "books": books_by_author.get(row.id, [])} for row in authors]
 
-    async def list(self) -> List[DBAuthor]:
-        stmt = select(DBAuthor)
+    async def list_version(self) -> Tuple[int, datetime | None, int, datetime | None]:
+        """Author and book row counts and newest updated_at values, which change with any listed value."""
+        stmt = select(
+            func.count(DBAuthor.id),
+            func.max(DBAuthor.updated_at),
+            select(func.count(DBBook.id)).scalar_subquery(),
+            select(func.max(DBBook.updated_at)).scalar_subquery(),
+        )
         result = await self.db_session.exec(stmt)
-        return result.all()
+        return tuple(result.one())
 
     async def update(self, author_id: UUID, **kwargs) -> DBAuthor:
         author = await self._get_author(author_id)
@@ -68,5 +85,9 @@ class AuthorRepository:
         books = books_result.all()
         for book in books:
             await self.db_session.delete(book)
+            self.db_session.add(DBTombstone(entity_type="book", entity_id=book.id))
+        # No relationship tells the unit of work to delete books first
+        await self.db_session.flush()
         await self.db_session.delete(author)
+        self.db_session.add(DBTombstone(entity_type="author", entity_id=author_id))
         await self.db_session.commit()
@@ -8,6 +8,9 @@ from src.routes.v1.authors.service import AuthorService, get_author_service
 from src.routes.v1.books.schema import BookOutput
 from src.routes.v1.books.service import BookService, get_book_service
 from src.utils.auth import authenticate_admin, authenticate_user
+from src.utils.idempotency import IdempotentRequest, idempotent
+from src.utils.response_cache import CachedResponse, response_cache
+from src.utils.serialization import TrustedJSONResponse
 
 router = APIRouter(prefix="/authors", tags=["authors"])
 
@@ -15,20 +18,26 @@ router = APIRouter(prefix="/authors", tags=["authors"])
 @router.post("", response_model=AuthorOutput, status_code=201)
 async def create_author(
     author_input: AuthorCreateInput,
+    idempotency: IdempotentRequest = Depends(idempotent("authors:create", authenticate_admin)),
     author_service: AuthorService = Depends(get_author_service),
     current_user: DBUser = Depends(authenticate_admin),
 ):
+    if idempotency.replay:
+        return idempotency.replay
     author = await author_service.create(data=author_input)
-    return AuthorOutput(**author)
+    return await idempotency.respond(AuthorOutput(**author), status_code=201)
 
 
 @router.get("", response_model=List[AuthorOutput])
 async def list_authors(
+    cache: CachedResponse = Depends(response_cache("authors:list", tags=["authors"])),
     author_service: AuthorService = Depends(get_author_service),
     current_user: DBUser = Depends(authenticate_user),
 ):
+    if cache.hit:
+        return cache.hit
     authors = await author_service.list()
-    return [AuthorOutput(**author) for author in authors]
+    return await cache.store(authors)
 
 
 @router.get("/{author_id}", response_model=AuthorOutput)
@@ -38,17 +47,20 @@ async def get_author(
     current_user: DBUser = Depends(authenticate_user),
 ):
     author = await author_service.retrieve(author_id=author_id)
-    return AuthorOutput(**author)
+    return TrustedJSONResponse(author)
 
 
 @router.get("/{author_id}/books", response_model=List[BookOutput])
 async def get_books_by_author(
     author_id: UUID,
+    cache: CachedResponse = Depends(response_cache("authors:books")),
     book_service: BookService = Depends(get_book_service),
     current_user: DBUser = Depends(authenticate_user),
 ):
+    if cache.hit:
+        return cache.hit
     books = await book_service.list_by_author(author_id=author_id)
-    return [BookOutput(**book) for book in books]
+    return await cache.store(books, tags=[f"author:{author_id}"])
 
 
 @router.patch("/{author_id}", response_model=AuthorOutput)
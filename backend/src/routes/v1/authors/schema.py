@@ -1,4 +1,5 @@
-from typing import Any, Dict, List
+from datetime import datetime
+from typing import List
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -14,8 +15,20 @@ class AuthorUpdateInput(BaseModel):
     bio: str | None = None
 
 
+class AuthorBookOutput(BaseModel):
+    id: UUID
+    title: str
+    author_id: UUID
+    description: str | None
+    price: float
+    published_date: datetime | None
+
+
 class AuthorOutput(BaseModel):
     id: UUID
     name: str
     bio: str | None
-    books: List[Dict[str, Any]]  # list of book dicts
+    book_count: int
+    min_price: float | None
+    max_price: float | None
+    books: List[AuthorBookOutput]
@@ -1,4 +1,5 @@
 import uuid
+from functools import partial
 from typing import Any, Dict, List
 
 from fastapi import Depends, HTTPException
@@ -6,9 +7,17 @@ from sqlalchemy.exc import NoResultFound
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from src.db.models import DBAuthor, DBBook
-from src.db.operations import get_db_session
+from src.db.operations import get_db_session, managed_session
 from src.routes.v1.authors.repository import AuthorRepository
-from src.routes.v1.authors.schema import AuthorCreateInput, AuthorUpdateInput
+from src.routes.v1.authors.schema import AuthorCreateInput, AuthorOutput, AuthorUpdateInput
+from src.routes.v1.inventory.reservations import stock_reservations
+from src.utils.change_feed import publish_catalog_event
+from src.utils.conditional import Validators, make_validators
+from src.utils.invalidation_bus import publish_invalidation
+from src.utils.read_through_cache import ReadThroughCache, invalidate_entries
+from src.utils.response_cache import invalidate_tags
+
+author_cache = ReadThroughCache("author", model=AuthorOutput)
 
 
 class AuthorNotFound(HTTPException):
@@ -20,16 +29,26 @@ async def get_author_service(db_session: AsyncSession = Depends(get_db_session))
     return AuthorService(db_session=db_session)
 
 
+async def _refresh_author(author_id: uuid.UUID) -> dict:
+    async with managed_session() as session:
+        return await AuthorService(db_session=session)._retrieve(author_id)
+
+
 class AuthorService:
     def __init__(self, db_session: AsyncSession) -> None:
         self.repository = AuthorRepository(db_session=db_session)
 
     async def create(self, data: AuthorCreateInput) -> dict:
         author = await self.repository.create(data=data)
+        await invalidate_tags("authors")
+        await publish_catalog_event("author.created", id=author.id)
         return {
             "id": author.id,
             "name": author.name,
             "bio": author.bio,
+            "book_count": 0,
+            "min_price": None,
+            "max_price": None,
             "books": []
         }
 
@@ -40,77 +59,50 @@ class AuthorService:
             raise AuthorNotFound from exc
 
     async def retrieve(self, author_id: uuid.UUID) -> dict:
+        return await author_cache.get(
+            str(author_id),
+            load=partial(self._retrieve, author_id),
+            refresh=partial(_refresh_author, author_id=author_id),
+        )
+
+    async def _retrieve(self, author_id: uuid.UUID) -> dict:
         try:
-            # Get author
-            author = await self._get_author(author_id)
-            
-            # Get books
-            books_stmt = select(
-                DBBook.id,
-                DBBook.title,
-                DBBook.author_id,
-                DBBook.description,
-                DBBook.price,
-                DBBook.published_date
-            ).where(DBBook.author_id == author_id)
-            books_result = await self.repository.db_session.exec(books_stmt)
-            books = [row._asdict() for row in books_result.all()]
-            
-            return {
-                "id": author.id,
-                "name": author.name,
-                "bio": author.bio,
-                "books": books
-            }
+            return await self.repository.retrieve(author_id)
         except NoResultFound as exc:
             raise AuthorNotFound from exc
 
     async def list(self) -> List[Dict[str, Any]]:
-        authors = await self.repository.list()
-        result = []
-        for author in authors:
-            # Get books for each
-            books_stmt = select(
-                DBBook.id,
-                DBBook.title,
-                DBBook.author_id,
-                DBBook.description,
-                DBBook.price,
-                DBBook.published_date
-            ).where(DBBook.author_id == author.id)
-            books_result = await self.repository.db_session.exec(books_stmt)
-            books = [row._asdict() for row in books_result.all()]
-            
-            result.append({
-                "id": author.id,
-                "name": author.name,
-                "bio": author.bio,
-                "books": books
-            })
-        return result
+        return await self.repository.list()
+
+    async def list_validators(self) -> Validators:
+        author_count, authors_updated_at, book_count, books_updated_at = await self.repository.list_version()
+        newest = max((value for value in (authors_updated_at, books_updated_at) if value is not None), default=None)
+        return make_validators(
+            "authors", author_count, authors_updated_at, book_count, books_updated_at, last_modified=newest
+        )
 
     async def update(self, author_id: uuid.UUID, data: AuthorUpdateInput) -> dict:
         author = await self._get_author(author_id=author_id)
         updated_author = await self.repository.update(author_id=author.id, **data.model_dump(exclude_unset=True))
-        # Get books
-        books_stmt = select(
-            DBBook.id,
-            DBBook.title,
-            DBBook.author_id,
-            DBBook.description,
-            DBBook.price,
-            DBBook.published_date
-        ).where(DBBook.author_id == updated_author.id)
-        books_result = await self.repository.db_session.exec(books_stmt)
-        books = [row._asdict() for row in books_result.all()]
-        
-        return {
-            "id": updated_author.id,
-            "name": updated_author.name,
-            "bio": updated_author.bio,
-            "books": books
-        }
+        # Book responses embed the author name
+        await invalidate_tags("authors", "books", f"author:{author_id}")
+        await author_cache.invalidate(str(author_id))
+        author = await self._retrieve(updated_author.id)
+        books = author["books"]
+        await invalidate_entries("book", *(book["id"] for book in books))
+        # Catalog snapshot records embed the author name
+        await publish_invalidation("catalog", *(book["id"] for book in books))
+        await publish_catalog_event("author.updated", id=updated_author.id, name=updated_author.name)
+        return author
 
     async def delete(self, author_id: uuid.UUID) -> None:
         author = await self._get_author(author_id=author_id)
+        book_ids = (await self.repository.db_session.exec(select(DBBook.id).where(DBBook.author_id == author_id))).all()
         await self.repository.delete(author_id=author.id)
+        for book_id in book_ids:
+            await stock_reservations.forget(book_id)
+        await invalidate_tags("authors", "books", f"author:{author_id}")
+        await author_cache.invalidate(str(author_id))
+        await invalidate_entries("book", *book_ids)
+        await publish_invalidation("catalog", *book_ids)
+        await publish_catalog_event("author.deleted", id=author_id, book_ids=book_ids)
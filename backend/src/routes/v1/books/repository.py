@@ -1,11 +1,23 @@
-from typing import Any, Dict, List
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
 from uuid import UUID
 
-from sqlmodel import select
+from sqlmodel import func, or_, select, update
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.models import DBBook, DBAuthor
+from src.db.models import DBAuthor, DBBook, DBCatalogBook, DBTombstone
 from src.routes.v1.books.schema import BookCreateInput
 
+# Reads go to the trigger-maintained read model, which already carries the author name
+CATALOG_BOOK_COLUMNS = (
+    DBCatalogBook.id,
+    DBCatalogBook.title,
+    DBCatalogBook.author_id,
+    DBCatalogBook.author_name,
+    DBCatalogBook.description,
+    DBCatalogBook.price,
+    DBCatalogBook.published_date,
+)
+
 
 class BookRepository:
     def __init__(self, db_session: AsyncSession):
@@ -24,23 +36,53 @@ class BookRepository:
         return result.one()
 
     async def retrieve_with_author(self, book_id: UUID) -> dict:
+        stmt = select(*CATALOG_BOOK_COLUMNS).where(DBCatalogBook.id == book_id)
+        result = await self.db_session.exec(stmt)
+        return result.one()._asdict()
+
+    async def list(self) -> List[Dict[str, Any]]:
+        stmt = select(*CATALOG_BOOK_COLUMNS)
+        result = await self.db_session.exec(stmt)
+        return [row._asdict() for row in result.all()]
+
+    async def list_by_author(self, author_id: UUID) -> List[Dict[str, Any]]:
+        stmt = select(*CATALOG_BOOK_COLUMNS).where(DBCatalogBook.author_id == author_id)
+        result = await self.db_session.exec(stmt)
+        return [row._asdict() for row in result.all()]
+
+    async def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        stmt = (
+            select(*CATALOG_BOOK_COLUMNS)
+            .where(DBCatalogBook.title.ilike(pattern, escape="\\") | DBCatalogBook.author_name.ilike(pattern, escape="\\"))
+            .order_by(DBCatalogBook.title)
+            .limit(limit)
+        )
+        result = await self.db_session.exec(stmt)
+        return [row._asdict() for row in result.all()]
+
+    async def list_version(self) -> Tuple[int, datetime | None, datetime | None]:
+        """Row count and newest book and author updated_at, which change with any listed value."""
+        stmt = select(
+            func.count(DBBook.id),
+            func.max(DBBook.updated_at),
+            select(func.max(DBAuthor.updated_at)).scalar_subquery(),
+        )
+        result = await self.db_session.exec(stmt)
+        return tuple(result.one())
+
+    async def version(self, book_id: UUID) -> Tuple[datetime, datetime]:
         stmt = (
-            select(
-                DBBook.id,
-                DBBook.title,
-                DBBook.author_id,
-                DBAuthor.name.label("author_name"),
-                DBBook.description,
-                DBBook.price,
-                DBBook.published_date,
-            )
+            select(DBBook.updated_at, DBAuthor.updated_at)
             .join(DBAuthor, DBBook.author_id == DBAuthor.id)
             .where(DBBook.id == book_id)
         )
         result = await self.db_session.exec(stmt)
-        return result.one()._asdict()
+        return tuple(result.one())
 
-    async def list(self) -> List[Dict[str, Any]]:
+    async def changed_since(self, since: datetime | None) -> List[Dict[str, Any]]:
+        """Books updated after ``since``, and books whose author was, since they embed the author name."""
         stmt = select(
             DBBook.id,
             DBBook.title,
@@ -48,34 +90,45 @@ class BookRepository:
             DBAuthor.name.label("author_name"),
             DBBook.description,
             DBBook.price,
-            DBBook.published_date
+            DBBook.published_date,
+            func.greatest(DBBook.updated_at, DBAuthor.updated_at).label("changed_at"),
         ).join(DBAuthor, DBBook.author_id == DBAuthor.id)
+        if since is not None:
+            changed_authors = select(DBAuthor.id).where(DBAuthor.updated_at > since)
+            stmt = stmt.where(or_(DBBook.updated_at > since, DBBook.author_id.in_(changed_authors)))
         result = await self.db_session.exec(stmt)
         return [row._asdict() for row in result.all()]
 
-    async def list_by_author(self, author_id: UUID) -> List[Dict[str, Any]]:
-        stmt = select(
-            DBBook.id,
-            DBBook.title,
-            DBBook.author_id,
-            DBAuthor.name.label("author_name"),
-            DBBook.description,
-            DBBook.price,
-            DBBook.published_date
-        ).join(DBAuthor, DBBook.author_id == DBAuthor.id).where(DBBook.author_id == author_id)
+    async def authors_changed_since(self, since: datetime | None) -> List[Dict[str, Any]]:
+        stmt = select(DBAuthor.id, DBAuthor.name, DBAuthor.bio, DBAuthor.updated_at.label("changed_at"))
+        if since is not None:
+            stmt = stmt.where(DBAuthor.updated_at > since)
         result = await self.db_session.exec(stmt)
         return [row._asdict() for row in result.all()]
 
-    async def update(self, book_id: UUID, **kwargs) -> DBBook:
-        book = await self.retrieve(book_id)
-        for key, value in kwargs.items():
-            setattr(book, key, value)
-        self.db_session.add(book)
+    async def deleted_since(self, since: datetime) -> List[Dict[str, Any]]:
+        stmt = select(DBTombstone.entity_type, DBTombstone.entity_id, DBTombstone.deleted_at).where(
+            DBTombstone.deleted_at > since
+        )
+        result = await self.db_session.exec(stmt)
+        return [row._asdict() for row in result.all()]
+
+    async def update(self, book_id: UUID, version: int, **kwargs) -> DBBook:
+        """Apply ``kwargs`` in one UPDATE if the book is still at ``version``, else raise NoResultFound."""
+        stmt = (
+            update(DBBook)
+            .where(DBBook.id == book_id, DBBook.version == version)
+            .values(**kwargs, version=DBBook.version + 1)
+            .returning(DBBook)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db_session.exec(stmt)
+        book = result.scalar_one()
         await self.db_session.commit()
-        await self.db_session.refresh(book)
         return book
 
     async def delete(self, book_id: UUID) -> None:
         book = await self.retrieve(book_id)
         await self.db_session.delete(book)
+        self.db_session.add(DBTombstone(entity_type="book", entity_id=book_id))
         await self.db_session.commit()
@@ -1,11 +1,16 @@
+from datetime import datetime
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
 from src.db.models import DBUser
-from src.routes.v1.books.schema import BookCreateInput, BookOutput, BookUpdateInput
+from src.routes.v1.books.schema import BookCreateInput, BookOutput, BookUpdateInput, CatalogChanges
 from src.routes.v1.books.service import BookService, get_book_service
 from src.utils.auth import authenticate_admin, authenticate_user
+from src.utils.conditional import apply_validators, is_not_modified, not_modified_response
+from src.utils.idempotency import IdempotentRequest, idempotent
+from src.utils.response_cache import CachedResponse, response_cache
+from src.utils.serialization import TrustedJSONResponse
 
 router = APIRouter(prefix="/books", tags=["books"])
 
@@ -13,42 +18,73 @@ router = APIRouter(prefix="/books", tags=["books"])
 @router.post("", response_model=BookOutput, status_code=201)
 async def create_book(
     book_input: BookCreateInput,
+    idempotency: IdempotentRequest = Depends(idempotent("books:create", authenticate_admin)),
     book_service: BookService = Depends(get_book_service),
     current_user: DBUser = Depends(authenticate_admin),
 ):
+    if idempotency.replay:
+        return idempotency.replay
     book = await book_service.create(data=book_input)
     book_with_author = await book_service.retrieve_with_author(book_id=book.id)
-    return BookOutput(**book_with_author)
+    return await idempotency.respond(BookOutput(**book_with_author), status_code=201)
 
 
 @router.get("", response_model=List[BookOutput])
 async def list_books(
+    request: Request,
+    cache: CachedResponse = Depends(response_cache("books:list", tags=["books"])),
     book_service: BookService = Depends(get_book_service),
     current_user: DBUser = Depends(authenticate_user),
 ):
+    if cache.hit:
+        return cache.hit
+    validators = await book_service.list_validators()
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
     books = await book_service.list()
-    return [BookOutput(**book) for book in books]
+    return await cache.store(books, validators=validators)
+
+
+@router.get("/changes", response_model=CatalogChanges)
+async def list_changes(
+    since: datetime | None = Query(default=None, description="Cursor returned by the previous call"),
+    book_service: BookService = Depends(get_book_service),
+    current_user: DBUser = Depends(authenticate_user),
+):
+    return TrustedJSONResponse(await book_service.changes(since=since))
 
 
 @router.get("/{book_id}", response_model=BookOutput)
 async def get_book(
     book_id: UUID,
+    request: Request,
+    cache: CachedResponse = Depends(response_cache("books:detail")),
     book_service: BookService = Depends(get_book_service),
     current_user: DBUser = Depends(authenticate_user),
 ):
+    if cache.hit:
+        return cache.hit
+    validators = await book_service.validators(book_id=book_id)
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
     book = await book_service.retrieve_with_author(book_id=book_id)
-    return BookOutput(**book)
+    return await cache.store(
+        book, tags=[f"book:{book_id}", f"author:{book['author_id']}"], validators=validators
+    )
 
 
 @router.patch("/{book_id}", response_model=BookOutput)
 async def update_book(
     book_id: UUID,
     update_input: BookUpdateInput,
+    response: Response,
+    if_match: str | None = Header(default=None, description="ETag from GET; the update fails with 412 if stale"),
     book_service: BookService = Depends(get_book_service),
     current_user: DBUser = Depends(authenticate_admin),
 ):
-    book = await book_service.update(book_id=book_id, data=update_input)
+    book = await book_service.update(book_id=book_id, data=update_input, if_match=if_match)
     book_with_author = await book_service.retrieve_with_author(book_id=book.id)
+    apply_validators(response, await book_service.validators(book_id=book.id))
     return BookOutput(**book_with_author)
 
 
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import List
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -10,6 +11,7 @@ class BookCreateInput(BaseModel):
     description: str | None = None
     price: float = Field(gt=0)
     published_date: datetime | None = None
+    stock: int | None = Field(default=None, ge=0, description="Limited stock; omit for an unlimited title")
 
 
 class BookUpdateInput(BaseModel):
@@ -28,3 +30,23 @@ class BookOutput(BaseModel):
     description: str | None
     price: float
     published_date: datetime | None
+
+
+class AuthorChange(BaseModel):
+    id: UUID
+    name: str
+    bio: str | None
+
+
+class CatalogChanges(BaseModel):
+    """Catalog rows created, updated or deleted after a cursor.
+
+    Pass ``cursor`` as ``since`` on the next request. Rows near the cursor may be sent
+    again, so clients should apply changes as upserts.
+    """
+
+    cursor: datetime
+    books: List[BookOutput]
+    authors: List[AuthorChange]
+    deleted_books: List[UUID]
+    deleted_authors: List[UUID]
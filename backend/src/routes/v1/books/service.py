@@ -1,13 +1,31 @@
 import uuid
+from datetime import datetime, timedelta, timezone
+from functools import partial
 from typing import Any, Dict, List
 
 from fastapi import Depends, HTTPException
 from sqlalchemy.exc import NoResultFound
 from sqlmodel.ext.asyncio.session import AsyncSession
 from src.db.models import DBBook
-from src.db.operations import get_db_session
+from src.db.operations import get_db_session, managed_session
 from src.routes.v1.books.repository import BookRepository
-from src.routes.v1.books.schema import BookCreateInput, BookUpdateInput
+from src.routes.v1.books.schema import BookCreateInput, BookOutput, BookUpdateInput, CatalogChanges
+from src.routes.v1.books.snapshot import CatalogSnapshot
+from src.routes.v1.inventory.reservations import stock_reservations
+from src.settings import settings
+from src.utils.change_feed import publish_catalog_event
+from src.utils.conditional import (
+    PreconditionFailed,
+    UpdateConflict,
+    Validators,
+    make_validators,
+    matches_if_match,
+)
+from src.utils.invalidation_bus import invalidation_bus, publish_invalidation
+from src.utils.read_through_cache import ReadThroughCache, invalidate_entries
+from src.utils.response_cache import invalidate_tags
+
+book_cache = ReadThroughCache("book", model=BookOutput)
 
 
 class BookNotFound(HTTPException):
@@ -19,12 +37,31 @@ async def get_book_service(db_session: AsyncSession = Depends(get_db_session)) -
     return BookService(db_session=db_session)
 
 
+async def _refresh_with_author(book_id: uuid.UUID) -> dict:
+    async with managed_session() as session:
+        return await BookRepository(db_session=session).retrieve_with_author(book_id=book_id)
+
+
+async def _load_catalog_changes(since: datetime | None) -> CatalogChanges:
+    async with managed_session() as session:
+        return await BookService(db_session=session).changes(since=since)
+
+
+catalog_snapshot = CatalogSnapshot(load_changes=_load_catalog_changes)
+invalidation_bus.register("catalog", catalog_snapshot)
+
+
 class BookService:
     def __init__(self, db_session: AsyncSession) -> None:
         self.repository = BookRepository(db_session=db_session)
 
     async def create(self, data: BookCreateInput) -> DBBook:
-        return await self.repository.create(data=data)
+        book = await self.repository.create(data=data)
+        await invalidate_tags("books", "authors", f"author:{book.author_id}")
+        await invalidate_entries("author", book.author_id)
+        await publish_invalidation("catalog", book.id)
+        await publish_catalog_event("book.created", id=book.id, author_id=book.author_id)
+        return book
 
     async def retrieve(self, book_id: uuid.UUID) -> DBBook:
         try:
@@ -33,21 +70,94 @@ class BookService:
             raise BookNotFound from exc
 
     async def retrieve_with_author(self, book_id: uuid.UUID) -> dict:
+        book = catalog_snapshot.get(book_id)
+        if book is not None:
+            return book
         try:
-            return await self.repository.retrieve_with_author(book_id=book_id)
+            return await book_cache.get(
+                str(book_id),
+                load=partial(self.repository.retrieve_with_author, book_id=book_id),
+                refresh=partial(_refresh_with_author, book_id=book_id),
+            )
         except NoResultFound as exc:
             raise BookNotFound from exc
 
     async def list(self) -> List[Dict[str, Any]]:
-        return await self.repository.list()
+        books = catalog_snapshot.list()
+        return books if books is not None else await self.repository.list()
+
+    async def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        return await self.repository.search(query=query, limit=limit)
+
+    async def changes(self, since: datetime | None) -> CatalogChanges:
+        """Return catalog changes after ``since``, or the whole catalog when it is None."""
+        if since is not None and since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)  # Columns hold naive UTC
+        # Taken before querying: anything stamped later is picked up by the next request
+        settled = datetime.utcnow() - timedelta(seconds=settings.CATALOG_CHANGES_SETTLE_SECONDS)
+        books = await self.repository.changed_since(since)
+        authors = await self.repository.authors_changed_since(since)
+        deleted = await self.repository.deleted_since(since) if since is not None else []
+
+        stamps = [row["changed_at"] for row in (*books, *authors)] + [row["deleted_at"] for row in deleted]
+        cursor = min(max(stamps, default=settled), settled)
+        if since is not None:
+            cursor = max(cursor, since)
+        return CatalogChanges(
+            cursor=cursor.replace(tzinfo=timezone.utc),
+            books=[BookOutput(**book) for book in books],
+            authors=authors,
+            deleted_books=[row["entity_id"] for row in deleted if row["entity_type"] == "book"],
+            deleted_authors=[row["entity_id"] for row in deleted if row["entity_type"] == "author"],
+        )
+
+    async def list_validators(self) -> Validators:
+        count, books_updated_at, authors_updated_at = await self.repository.list_version()
+        newest = max((value for value in (books_updated_at, authors_updated_at) if value is not None), default=None)
+        return make_validators("books", count, books_updated_at, authors_updated_at, last_modified=newest)
+
+    async def validators(self, book_id: uuid.UUID) -> Validators:
+        try:
+            book_updated_at, author_updated_at = await self.repository.version(book_id=book_id)
+        except NoResultFound as exc:
+            raise BookNotFound from exc
+        newest = max(book_updated_at, author_updated_at)
+        return make_validators("book", book_id, book_updated_at, author_updated_at, last_modified=newest)
 
     async def list_by_author(self, author_id: uuid.UUID) -> List[Dict[str, Any]]:
-        return await self.repository.list_by_author(author_id=author_id)
+        books = catalog_snapshot.list_by_author(author_id)
+        return books if books is not None else await self.repository.list_by_author(author_id=author_id)
 
-    async def update(self, book_id: uuid.UUID, data: BookUpdateInput) -> DBBook:
+    async def update(self, book_id: uuid.UUID, data: BookUpdateInput, if_match: str | None = None) -> DBBook:
+        """Update the book unless it changed since ``if_match`` (412) or while updating (409)."""
         book = await self.retrieve(book_id=book_id)
-        return await self.repository.update(book_id=book.id, **data.model_dump(exclude_unset=True))
+        if if_match is not None and not matches_if_match(if_match, await self.validators(book_id=book_id)):
+            raise PreconditionFailed
+        previous_author_id = book.author_id
+        try:
+            updated = await self.repository.update(
+                book_id=book.id, version=book.version, **data.model_dump(exclude_unset=True)
+            )
+        except NoResultFound as exc:
+            raise UpdateConflict from exc
+        await invalidate_tags(
+            "books", "authors", f"book:{book_id}", f"author:{previous_author_id}", f"author:{updated.author_id}"
+        )
+        await book_cache.invalidate(str(book_id))
+        await invalidate_entries("author", previous_author_id, updated.author_id)
+        await publish_invalidation("catalog", book_id)
+        await publish_catalog_event(
+            "book.updated", id=updated.id, author_id=updated.author_id, title=updated.title, price=updated.price
+        )
+        return updated
 
     async def delete(self, book_id: uuid.UUID) -> None:
         book = await self.retrieve(book_id=book_id)
+        author_id = book.author_id
         await self.repository.delete(book_id=book.id)
+        await stock_reservations.forget(book_id)
+        await invalidate_tags("books", "authors", f"book:{book_id}", f"author:{author_id}")
+        await book_cache.invalidate(str(book_id))
+        await invalidate_entries("author", author_id)
+        await publish_invalidation("catalog", book_id)
+        await publish_catalog_event("book.deleted", id=book_id, author_id=author_id)
@@ -0,0 +1,194 @@
+"""Per-worker in-memory snapshot of the book catalog.
+
+The catalog is read-mostly and small enough to hold in memory, so each worker keeps
+every book with its author name in ``__slots__`` records, indexed by book and by author.
+The snapshot is loaded at startup and kept current by polling the delta-sync query
+(``updated_at`` and tombstones) from a background task.
+
+Reads are served from the snapshot only while it is fresh: loaded, refreshed within
+CATALOG_SNAPSHOT_MAX_STALENESS_SECONDS, and with no pending invalidations for the books
+asked for. Writes publish invalidations through the invalidation bus; until the next
+refresh picks them up, the affected books (and listings) fall back to the database, so a
+write is visible immediately on every worker.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Set
+from uuid import UUID
+
+from src.routes.v1.books.schema import CatalogChanges
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+ChangesLoader = Callable[[datetime | None], Awaitable[CatalogChanges]]
+
+
+class SnapshotBook:
+    __slots__ = ("id", "title", "author_id", "author_name", "description", "price", "published_date")
+
+    def __init__(
+        self,
+        id: UUID,
+        title: str,
+        author_id: UUID,
+        author_name: str,
+        description: str | None,
+        price: float,
+        published_date: datetime | None,
+    ) -> None:
+        self.id = id
+        self.title = title
+        self.author_id = author_id
+        self.author_name = author_name
+        self.description = description
+        self.price = price
+        self.published_date = published_date
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class CatalogSnapshot:
+    def __init__(self, load_changes: ChangesLoader) -> None:
+        self._load_changes = load_changes
+        self._books: Dict[UUID, SnapshotBook] = {}
+        self._by_author: Dict[UUID, Dict[UUID, SnapshotBook]] = {}
+        self._author_names: Dict[UUID, str] = {}  # Shares one name string between an author's books
+        self._pending: Set[str] = set()
+        self._cursor: datetime | None = None
+        self._loaded = False
+        self._refreshed_at = 0.0
+        self._wake: asyncio.Event | None = None
+        self._poller: asyncio.Task | None = None
+
+    def _is_current(self) -> bool:
+        return self._loaded and time.monotonic() - self._refreshed_at <= settings.CATALOG_SNAPSHOT_MAX_STALENESS_SECONDS
+
+    def is_fresh(self) -> bool:
+        return self._is_current() and not self._pending
+
+    def list(self) -> List[Dict[str, Any]] | None:
+        if not self.is_fresh():
+            return None
+        return [book.as_dict() for book in self._books.values()]
+
+    def list_by_author(self, author_id: UUID) -> List[Dict[str, Any]] | None:
+        if not self.is_fresh():
+            return None
+        return [book.as_dict() for book in self._by_author.get(author_id, {}).values()]
+
+    def get(self, book_id: UUID) -> Dict[str, Any] | None:
+        """Return the book, or None if it must be read from the database."""
+        if not self._is_current() or str(book_id) in self._pending:
+            return None
+        book = self._books.get(book_id)
+        # A missing book may have been created since the last refresh
+        return book.as_dict() if book is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "books": len(self._books),
+            "authors": len(self._by_author),
+            "fresh": self.is_fresh(),
+            "pending_invalidations": len(self._pending),
+            "age_seconds": round(time.monotonic() - self._refreshed_at, 3) if self._loaded else None,
+        }
+
+    # Invalidation bus hooks, keyed by book id
+
+    def evict_local(self, *keys: str) -> None:
+        if self._poller is not None:
+            self._pending.update(keys)
+            self._wake_poller()
+
+    def clear_local(self) -> None:
+        self._loaded = False
+        self._cursor = None
+        self._wake_poller()
+
+    def _wake_poller(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    async def refresh(self) -> None:
+        """Apply catalog changes since the last refresh, or load everything on the first call."""
+        pending = set(self._pending)
+        reload = not self._loaded
+        changes = await self._load_changes(None if reload else self._cursor)
+        if reload:
+            self._books.clear()
+            self._by_author.clear()
+            self._author_names.clear()
+        self.apply(changes)
+        self._cursor = changes.cursor
+        self._pending -= pending  # Pending writes committed before this refresh started
+        self._refreshed_at = time.monotonic()
+        if reload:
+            logger.info(f"Catalog snapshot loaded with {len(self._books)} books")
+        self._loaded = True
+
+    def apply(self, changes: CatalogChanges) -> None:
+        for author in changes.authors:
+            self._author_names[author.id] = author.name
+        for book_id in changes.deleted_books:
+            self._remove(book_id)
+        for author_id in changes.deleted_authors:
+            self._author_names.pop(author_id, None)
+        for book in changes.books:
+            self._remove(book.id)
+            author_name = self._author_names.get(book.author_id)
+            if author_name != book.author_name:
+                author_name = self._author_names[book.author_id] = book.author_name
+            record = SnapshotBook(
+                book.id, book.title, book.author_id, author_name, book.description, book.price, book.published_date
+            )
+            self._books[book.id] = record
+            self._by_author.setdefault(book.author_id, {})[book.id] = record
+
+    def _remove(self, book_id: UUID) -> None:
+        record = self._books.pop(book_id, None)
+        if record is None:
+            return
+        books = self._by_author.get(record.author_id)
+        if books is not None:
+            books.pop(book_id, None)
+            if not books:
+                del self._by_author[record.author_id]
+
+    def start(self) -> None:
+        if self._poller is None or self._poller.done():
+            self._wake = asyncio.Event()
+            self._poller = asyncio.create_task(self._poll(self._wake))
+
+    async def close(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+            try:
+                await self._poller
+            except asyncio.CancelledError:
+                pass
+            self._poller = None
+            self._wake = None
+        self._loaded = False
+        self._cursor = None
+        self._pending.clear()
+        self._books.clear()
+        self._by_author.clear()
+        self._author_names.clear()
+
+    async def _poll(self, wake: asyncio.Event) -> None:
+        while True:
+            wake.clear()
+            try:
+                await self.refresh()
+            except Exception as exc:
+                # Reads fall back to the database once the snapshot is too old
+                logger.warning(f"Catalog snapshot refresh failed: {exc!r}")
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=settings.CATALOG_SNAPSHOT_REFRESH_SECONDS)
+            except TimeoutError:
+                pass
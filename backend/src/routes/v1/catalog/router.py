@@ -0,0 +1,115 @@
+"""Public, read-only catalog endpoints.
+
+These require no authentication and are marked cacheable by shared caches, so that a
+reverse proxy or CDN can absorb most browsing traffic. Responses other than search
+results are also backed by the Redis response cache and answer conditional requests with
+304.
+"""
+
+from typing import List
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from src.routes.v1.authors.schema import AuthorOutput
+from src.routes.v1.authors.service import AuthorService, get_author_service
+from src.routes.v1.books.schema import BookOutput
+from src.routes.v1.books.service import BookService, get_book_service
+from src.settings import settings
+from src.utils.conditional import is_not_modified, not_modified_response
+from src.utils.response_cache import CachedResponse, response_cache
+
+router = APIRouter(prefix="/catalog", tags=["catalog"])
+
+PUBLIC_CACHE_CONTROL = (
+    f"public, max-age={settings.CATALOG_CACHE_MAX_AGE_SECONDS}, "
+    f"s-maxage={settings.CATALOG_CACHE_S_MAXAGE_SECONDS}, "
+    f"stale-while-revalidate={settings.CATALOG_CACHE_STALE_WHILE_REVALIDATE_SECONDS}"
+)
+
+
+def public_cache(namespace: str, tags: List[str] | None = None):
+    return response_cache(namespace, tags=tags, cache_control=PUBLIC_CACHE_CONTROL)
+
+
+@router.get("/books", response_model=List[BookOutput])
+async def list_books(
+    request: Request,
+    cache: CachedResponse = Depends(public_cache("catalog:books", tags=["books"])),
+    book_service: BookService = Depends(get_book_service),
+):
+    if cache.hit:
+        return cache.hit
+    validators = await book_service.list_validators()
+    if is_not_modified(request, validators):
+        return not_modified_response(validators, PUBLIC_CACHE_CONTROL)
+    books = await book_service.list()
+    return await cache.store(books, validators=validators)
+
+
+@router.get("/books/search", response_model=List[BookOutput])
+async def search_books(
+    response: Response,
+    q: str = Query(min_length=1, max_length=100),
+    limit: int = Query(default=20, ge=1, le=100),
+    book_service: BookService = Depends(get_book_service),
+):
+    # Free-text queries are unbounded, so results are left to shared caches rather than Redis
+    response.headers["Cache-Control"] = PUBLIC_CACHE_CONTROL
+    return await book_service.search(query=q, limit=limit)
+
+
+@router.get("/books/{book_id}", response_model=BookOutput)
+async def get_book(
+    book_id: UUID,
+    request: Request,
+    cache: CachedResponse = Depends(public_cache("catalog:book")),
+    book_service: BookService = Depends(get_book_service),
+):
+    if cache.hit:
+        return cache.hit
+    validators = await book_service.validators(book_id=book_id)
+    if is_not_modified(request, validators):
+        return not_modified_response(validators, PUBLIC_CACHE_CONTROL)
+    book = await book_service.retrieve_with_author(book_id=book_id)
+    return await cache.store(
+        book, tags=[f"book:{book_id}", f"author:{book['author_id']}"], validators=validators
+    )
+
+
+@router.get("/authors", response_model=List[AuthorOutput])
+async def list_authors(
+    request: Request,
+    cache: CachedResponse = Depends(public_cache("catalog:authors", tags=["authors"])),
+    author_service: AuthorService = Depends(get_author_service),
+):
+    if cache.hit:
+        return cache.hit
+    validators = await author_service.list_validators()
+    if is_not_modified(request, validators):
+        return not_modified_response(validators, PUBLIC_CACHE_CONTROL)
+    authors = await author_service.list()
+    return await cache.store(authors, validators=validators)
+
+
+@router.get("/authors/{author_id}", response_model=AuthorOutput)
+async def get_author(
+    author_id: UUID,
+    cache: CachedResponse = Depends(public_cache("catalog:author")),
+    author_service: AuthorService = Depends(get_author_service),
+):
+    if cache.hit:
+        return cache.hit
+    author = await author_service.retrieve(author_id=author_id)
+    return await cache.store(author, tags=[f"author:{author_id}"])
+
+
+@router.get("/authors/{author_id}/books", response_model=List[BookOutput])
+async def get_books_by_author(
+    author_id: UUID,
+    cache: CachedResponse = Depends(public_cache("catalog:author-books")),
+    book_service: BookService = Depends(get_book_service),
+):
+    if cache.hit:
+        return cache.hit
+    books = await book_service.list_by_author(author_id=author_id)
+    return await cache.store(books, tags=[f"author:{author_id}"])
@@ -0,0 +1,62 @@
+"""Server-sent event streams of catalog and order changes, and of waiting room tickets.
+
+Streams carry change notifications rather than full state: clients refetch what changed
+(or everything, on a ``resync`` event). The request's database session is released once
+the user is authenticated, before streaming starts.
+"""
+
+import asyncio
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from src.db.models import DBUser
+from src.settings import settings
+from src.utils.auth import authenticate_user, authenticate_user_id
+from src.utils.change_feed import change_feed
+from src.utils.sse import EventStreamResponse, event_stream, format_event
+from src.utils.waiting_room import TicketNotFound, checkout_waiting_room
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+async def _stream(*topics: str):
+    async with change_feed.subscribe(*topics) as subscriber:
+        async for frame in event_stream(subscriber):
+            yield frame
+
+
+@router.get("/catalog")
+async def catalog_events():
+    """Stream book and author changes to anyone."""
+    return EventStreamResponse(_stream("catalog"))
+
+
+@router.get("/orders")
+async def order_events(current_user: DBUser = Depends(authenticate_user)):
+    """Stream catalog changes and status changes of the current user's orders."""
+    return EventStreamResponse(_stream("catalog", f"orders:{current_user.id}"))
+
+
+async def _ticket_stream(ticket_id: UUID, user_id: UUID):
+    yield f"retry: {settings.SSE_RETRY_MILLISECONDS}\n\n"
+    while True:
+        ticket = await checkout_waiting_room.status(ticket_id, user_id)
+        if ticket is None:
+            yield format_event("expired", {"id": ticket_id})
+            return
+        yield format_event("ticket", ticket.model_dump(mode="json"))
+        if ticket.admitted:
+            return
+        await asyncio.sleep(settings.WAITING_ROOM_ADMIT_INTERVAL_SECONDS)
+
+
+@router.get("/waiting-room/{ticket_id}")
+async def waiting_room_events(ticket_id: UUID, user_id: UUID = Depends(authenticate_user_id)):
+    """Stream a checkout waiting room ticket's place in the queue until it is admitted.
+
+    Each check keeps the ticket alive; the stream ends after the ``ticket`` event that
+    admits it, or with ``expired``. Only Redis is used, never the database.
+    """
+    if await checkout_waiting_room.status(ticket_id, user_id) is None:
+        raise TicketNotFound
+    return EventStreamResponse(_ticket_stream(ticket_id, user_id))
@@ -0,0 +1,102 @@
+from typing import Dict, Iterable, List
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlmodel import col, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.models import DBBook, DBOrderItem
+
+# Marks every unapplied order item as applied and deducts the units of tracked books from
+# their stock, in one statement. Concurrent runs serialize on the item row locks, and the
+# later one skips the items the earlier one applied.
+RECONCILE = """
+WITH applied AS (
+    UPDATE order_items SET stock_applied = true
+    WHERE NOT stock_applied {book_filter}
+    RETURNING book_id, quantity
+), sold AS (
+    SELECT book_id, sum(quantity) AS quantity FROM applied GROUP BY book_id
+)
+UPDATE books SET stock = books.stock - sold.quantity
+FROM sold
+WHERE books.id = sold.book_id AND books.stock IS NOT NULL
+RETURNING sold.quantity
+"""
+
+
+# Returns the units of orders being cancelled: units already applied go back to books.stock,
+# and unapplied ones are marked applied so that reconciliation never deducts them. The item
+# rows are locked first, so a concurrent reconciliation either applied them before (and the
+# units are added back) or sees them applied after. Returns the units per stock-tracked book.
+RESTOCK = """
+WITH items AS (
+    SELECT book_id, quantity, stock_applied FROM order_items
+    WHERE order_id = ANY(:order_ids)
+    FOR UPDATE
+), returned AS (
+    UPDATE books SET stock = books.stock + applied.quantity
+    FROM (SELECT book_id, sum(quantity) AS quantity FROM items WHERE stock_applied GROUP BY book_id) applied
+    WHERE books.id = applied.book_id AND books.stock IS NOT NULL
+), released AS (
+    UPDATE order_items SET stock_applied = true
+    WHERE order_id = ANY(:order_ids) AND NOT stock_applied
+)
+SELECT items.book_id, sum(items.quantity) AS quantity
+FROM items JOIN books ON books.id = items.book_id
+WHERE books.stock IS NOT NULL
+GROUP BY items.book_id
+"""
+
+
+class InventoryRepository:
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+
+    async def stock(self, book_id: UUID) -> int | None:
+        stmt = select(DBBook.stock).where(DBBook.id == book_id)
+        result = await self.db_session.exec(stmt)
+        return result.one()
+
+    async def stock_levels(self, book_ids: Iterable[UUID]) -> Dict[UUID, int | None]:
+        stmt = select(DBBook.id, DBBook.stock).where(col(DBBook.id).in_(list(book_ids)))
+        result = await self.db_session.exec(stmt)
+        return dict(result.all())
+
+    async def unsold_stock(self, book_ids: Iterable[UUID]) -> Dict[UUID, int]:
+        """Stock less the units of order items not yet reconciled, read in one snapshot."""
+        unapplied = func.coalesce(func.sum(DBOrderItem.quantity).filter(DBOrderItem.stock_applied.is_(False)), 0)
+        stmt = (
+            select(DBBook.id, DBBook.stock - unapplied)
+            .outerjoin(DBOrderItem, DBOrderItem.book_id == DBBook.id)
+            .where(col(DBBook.id).in_(list(book_ids)), DBBook.stock.is_not(None))
+            .group_by(DBBook.id)
+        )
+        result = await self.db_session.exec(stmt)
+        return dict(result.all())
+
+    async def reconcile(self) -> int:
+        """Apply every unapplied order item to stock; return the units deducted."""
+        result = await self.db_session.exec(text(RECONCILE.format(book_filter="")))
+        units = sum(row.quantity for row in result.all())
+        await self.db_session.commit()
+        return units
+
+    async def restock(self, order_ids: List[UUID]) -> Dict[UUID, int]:
+        """Return the stock sold to ``order_ids``, in the caller's transaction; return units per book."""
+        result = await self.db_session.exec(text(RESTOCK), params={"order_ids": order_ids})
+        return {row.book_id: row.quantity for row in result.all()}
+
+    async def set_stock(self, book_id: UUID, stock: int | None) -> int | None:
+        """Apply the book's pending sales, then set its stock; return the stock it replaced.
+
+        The book row stays locked from the first statement until commit, so the returned
+        value is exactly what the new stock replaces.
+        """
+        await self.db_session.exec(text(RECONCILE.format(book_filter="AND book_id = :book_id")), params={"book_id": book_id})
+        stmt = select(DBBook).where(DBBook.id == book_id).with_for_update()
+        book = (await self.db_session.exec(stmt)).one()
+        previous = book.stock
+        book.stock = stock
+        self.db_session.add(book)
+        await self.db_session.commit()
+        return previous
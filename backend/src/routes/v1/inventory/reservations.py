@@ -0,0 +1,320 @@
+"""Stock reservations held in Redis.
+
+Checkouts of a limited title must not queue on its ``books`` row, so stock is counted
+in Redis: ``inventory:available:<book_id>`` holds the units that can still be sold, and
+sales take units with ``DECRBY``, which never blocks and never retries. A sale that
+drives a counter below zero gives its units back and fails. While it does, a concurrent
+sale at the sell-out boundary may fail too, but stock is never oversold.
+
+Holds set units aside for a cart while the customer checks out. A hold is a hash of
+quantities per book, registered in the ``inventory:holds`` sorted set by expiry time;
+a background sweep returns the units of holds that expired unclaimed. Holds are claimed
+or released under WATCH, so exactly one of checkout, release and the sweep gets the units.
+
+Sold units stay deducted in Redis and are recorded by the order items. Reconciliation
+periodically deducts unapplied order items from ``books.stock`` in one statement, so the
+counters can be rebuilt from Postgres and the holds: a missing counter starts at
+``stock`` less the units of order items not yet applied and the units of live holds,
+which ``inventory:held:<book_id>`` counts in the same transactions that create, claim
+and release holds.
+
+Counters are stored as ``COUNTER_BASE`` plus the available units. ``DECRBY`` and ``INCRBY``
+create a key that is missing, for instance because its counter was just forgotten, so a
+counter below ``VALID_COUNTER`` was never loaded: it is treated as missing and replaced by
+the next load, and a sale or hold that lands on one gives its units back and raises
+CounterMissing for the caller to load the counter and try again.
+
+Each load also bumps ``inventory:epoch:<book_id>``. Units taken for a sale that is not
+written are only given back to the counter they were taken from: if it was not loaded,
+or was rebuilt since, it counted them from Postgres already.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Mapping
+from uuid import UUID, uuid4
+
+from redis.exceptions import RedisError, WatchError
+from src.settings import settings
+from src.utils.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+AVAILABLE_PREFIX = "inventory:available"
+EPOCH_PREFIX = "inventory:epoch"
+HELD_PREFIX = "inventory:held"
+HOLD_PREFIX = "inventory:hold"
+HOLDS_KEY = "inventory:holds"
+# Hold hashes outlive their expiry so that the sweep can still read what to give back
+HOLD_RETENTION_SECONDS = 24 * 60 * 60
+SWEEP_BATCH = 500
+# Far above any stock, so that counters created by DECRBY or INCRBY stay far below it
+COUNTER_BASE = 2**40
+VALID_COUNTER = COUNTER_BASE // 2
+
+Reconciler = Callable[[], Awaitable[int]]
+# Epoch of each loaded counter units were taken from, to give them back to
+Taken = Dict[UUID, str | None]
+
+
+class SoldOut(Exception):
+    def __init__(self, book_ids: List[UUID]) -> None:
+        super().__init__(f"Not enough stock for {', '.join(str(book_id) for book_id in book_ids)}")
+        self.book_ids = book_ids
+
+
+class CounterMissing(Exception):
+    def __init__(self, book_ids: List[UUID]) -> None:
+        super().__init__(f"No stock counter for {', '.join(str(book_id) for book_id in book_ids)}")
+        self.book_ids = book_ids
+
+
+class HoldUnavailable(Exception):
+    """The hold does not exist, has expired, or was already claimed or released."""
+
+
+class HoldMismatch(Exception):
+    """The hold belongs to another user or covers different quantities."""
+
+
+def available_key(book_id: UUID) -> str:
+    return f"{AVAILABLE_PREFIX}:{book_id}"
+
+
+def epoch_key(book_id: UUID) -> str:
+    return f"{EPOCH_PREFIX}:{book_id}"
+
+
+def held_key(book_id: UUID) -> str:
+    return f"{HELD_PREFIX}:{book_id}"
+
+
+def hold_key(hold_id: UUID) -> str:
+    return f"{HOLD_PREFIX}:{hold_id}"
+
+
+class StockReservations:
+    def __init__(self) -> None:
+        self._reconcile: Reconciler | None = None
+        self._worker: asyncio.Task | None = None
+
+    async def missing_counters(self, book_ids: List[UUID]) -> List[UUID]:
+        values = await redis_client.mget([available_key(book_id) for book_id in book_ids])
+        return [book_id for book_id, value in zip(book_ids, values) if value is None or int(value) < VALID_COUNTER]
+
+    async def load(self, unsold: Mapping[UUID, int]) -> None:
+        """Start counters that are missing or were never loaded at the ``unsold`` units less those held.
+
+        Loaded counters are left untouched.
+        """
+        for book_id, units in unsold.items():
+            key = available_key(book_id)
+            async with redis_client.pipeline(transaction=True) as pipe:
+                while True:
+                    try:
+                        await pipe.watch(key, held_key(book_id))
+                        value = await pipe.get(key)
+                        if value is not None and int(value) >= VALID_COUNTER:
+                            await pipe.unwatch()
+                            break
+                        held = int(await pipe.get(held_key(book_id)) or 0)
+                        pipe.multi()
+                        pipe.set(key, COUNTER_BASE + max(0, units - held))
+                        pipe.incr(epoch_key(book_id))
+                        await pipe.execute()
+                        break
+                    except WatchError:
+                        continue  # A sale or hold changed the counts meanwhile
+
+    async def available(self, book_id: UUID) -> int | None:
+        value = await redis_client.get(available_key(book_id))
+        if value is None or int(value) < VALID_COUNTER:
+            return None
+        return int(value) - COUNTER_BASE
+
+    @staticmethod
+    def _check(quantities: Mapping[UUID, int], remaining: List[int]) -> tuple[List[UUID], List[UUID]]:
+        """Books whose counter was missing, and books that would be oversold."""
+        missing = [book_id for book_id, units in zip(quantities, remaining) if units < VALID_COUNTER]
+        short = [book_id for book_id, units in zip(quantities, remaining) if VALID_COUNTER <= units < COUNTER_BASE]
+        return missing, short
+
+    async def take(self, quantities: Mapping[UUID, int]) -> Taken:
+        """Take units for an immediate sale, or raise SoldOut or CounterMissing and take nothing.
+
+        Returns what ``give_back`` needs to return the units if the sale is not written.
+        """
+        async with redis_client.pipeline(transaction=True) as pipe:
+            for book_id, quantity in quantities.items():
+                pipe.decrby(available_key(book_id), quantity)
+            for book_id in quantities:
+                pipe.get(epoch_key(book_id))
+            results = await pipe.execute()
+        remaining, epochs = results[: len(quantities)], results[len(quantities) :]
+        taken = {
+            book_id: epoch
+            for (book_id, quantity), units, epoch in zip(quantities.items(), remaining, epochs)
+            if units + quantity >= VALID_COUNTER
+        }
+        missing, short = self._check(quantities, remaining)
+        if missing or short:
+            await self.give_back(quantities, taken)
+            raise CounterMissing(missing) if missing else SoldOut(short)
+        return taken
+
+    async def give_back(self, quantities: Mapping[UUID, int], taken: Taken) -> None:
+        """Return units ``taken`` to counters that are still the ones they were taken from."""
+        for book_id, quantity in quantities.items():
+            if book_id not in taken:
+                continue  # Taken from a counter that was not loaded
+            key = available_key(book_id)
+            async with redis_client.pipeline(transaction=True) as pipe:
+                while True:
+                    try:
+                        await pipe.watch(key, epoch_key(book_id))
+                        value = await pipe.get(key)
+                        epoch = await pipe.get(epoch_key(book_id))
+                        if value is None or int(value) < VALID_COUNTER or epoch != taken[book_id]:
+                            await pipe.unwatch()
+                            break  # Forgotten or rebuilt from Postgres since
+                        pipe.multi()
+                        pipe.incrby(key, quantity)
+                        await pipe.execute()
+                        break
+                    except WatchError:
+                        continue
+
+    async def hold(self, user_id: UUID, quantities: Mapping[UUID, int]) -> tuple[UUID, float]:
+        """Set units aside for ``user_id`` until the hold expires; return its id and expiry time.
+
+        Raises SoldOut or CounterMissing and sets nothing aside if the units cannot be held.
+        """
+        hold_id = uuid4()
+        expires_at = time.time() + settings.INVENTORY_HOLD_SECONDS
+        key = hold_key(hold_id)
+        async with redis_client.pipeline(transaction=True) as pipe:
+            for book_id, quantity in quantities.items():
+                pipe.decrby(available_key(book_id), quantity)
+            for book_id, quantity in quantities.items():
+                pipe.incrby(held_key(book_id), quantity)
+            pipe.hset(key, mapping={"user_id": str(user_id), **{str(b): q for b, q in quantities.items()}})
+            pipe.expire(key, settings.INVENTORY_HOLD_SECONDS + HOLD_RETENTION_SECONDS)
+            pipe.zadd(HOLDS_KEY, {str(hold_id): expires_at})
+            remaining = (await pipe.execute())[: len(quantities)]
+        missing, short = self._check(quantities, remaining)
+        if missing or short:
+            await self.release(hold_id)
+            raise CounterMissing(missing) if missing else SoldOut(short)
+        return hold_id, expires_at
+
+    async def claim(self, hold_id: UUID, user_id: UUID, quantities: Mapping[UUID, int]) -> Taken:
+        """Turn the hold into a sale of ``quantities``; its units stay taken.
+
+        Returns what ``give_back`` needs to return the units if the sale is not written.
+        """
+        key = hold_key(hold_id)
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                await pipe.watch(key)
+                held = await pipe.hgetall(key)
+                if not held:
+                    raise HoldUnavailable
+                if held.pop("user_id") != str(user_id) or held != {str(b): str(q) for b, q in quantities.items()}:
+                    raise HoldMismatch
+                pipe.multi()
+                pipe.delete(key)
+                pipe.zrem(HOLDS_KEY, str(hold_id))
+                for book_id, quantity in quantities.items():
+                    pipe.decrby(held_key(book_id), quantity)
+                for book_id in quantities:
+                    pipe.get(available_key(book_id))
+                    pipe.get(epoch_key(book_id))
+                results = (await pipe.execute())[2 + len(quantities) :]
+        except WatchError as exc:
+            raise HoldUnavailable from exc  # Claimed, released or swept meanwhile
+        return {
+            book_id: epoch
+            for book_id, value, epoch in zip(quantities, results[::2], results[1::2])
+            if value is not None and int(value) >= VALID_COUNTER
+        }
+
+    async def release(self, hold_id: UUID, user_id: UUID | None = None) -> bool:
+        """Give the hold's units back; False if it was already claimed, released or swept."""
+        key = hold_key(hold_id)
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                await pipe.watch(key)
+                held = await pipe.hgetall(key)
+                if not held or (user_id is not None and held["user_id"] != str(user_id)):
+                    await pipe.unwatch()
+                    return False
+                del held["user_id"]
+                pipe.multi()
+                pipe.delete(key)
+                pipe.zrem(HOLDS_KEY, str(hold_id))
+                for book_id, quantity in held.items():
+                    pipe.incrby(available_key(book_id), int(quantity))
+                    pipe.decrby(held_key(book_id), int(quantity))
+                await pipe.execute()
+        except WatchError:
+            return False
+        return True
+
+    async def sweep(self) -> int:
+        """Release expired holds; return how many this worker released."""
+        expired = await redis_client.zrangebyscore(HOLDS_KEY, "-inf", time.time(), start=0, num=SWEEP_BATCH)
+        released = 0
+        for hold_id in expired:
+            if await self.release(UUID(hold_id)):
+                released += 1
+            else:
+                await redis_client.zrem(HOLDS_KEY, hold_id)
+        return released
+
+    async def adjust(self, book_id: UUID, delta: int) -> None:
+        """Add ``delta`` units to the counter.
+
+        A plain INCRBY, so it neither conflicts with concurrent sales nor forgets the counter:
+        on a missing counter it leaves a value that is never taken as loaded, and the next
+        load counts the units from Postgres instead.
+        """
+        await redis_client.incrby(available_key(book_id), delta)
+
+    async def forget(self, book_id: UUID) -> None:
+        """Drop the counter of a book whose stock was set or is no longer tracked."""
+        await redis_client.delete(available_key(book_id))
+
+    def start(self, reconcile: Reconciler) -> None:
+        self._reconcile = reconcile
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        next_reconcile = time.monotonic() + settings.INVENTORY_RECONCILE_SECONDS
+        while True:
+            try:
+                released = await self.sweep()
+                if released:
+                    logger.info(f"Released {released} expired stock holds")
+            except RedisError as exc:
+                logger.warning(f"Stock hold sweep failed: {exc!r}")
+            if time.monotonic() >= next_reconcile:
+                next_reconcile = time.monotonic() + settings.INVENTORY_RECONCILE_SECONDS
+                try:
+                    await self._reconcile()
+                except Exception as exc:
+                    logger.warning(f"Stock reconciliation failed: {exc!r}")
+            await asyncio.sleep(settings.INVENTORY_SWEEP_SECONDS)
+
+
+stock_reservations = StockReservations()
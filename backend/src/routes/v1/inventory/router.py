@@ -0,0 +1,48 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from src.db.models import DBUser
+from src.routes.v1.inventory.schema import HoldInput, HoldOutput, StockInput, StockOutput
+from src.routes.v1.inventory.service import InventoryService, get_inventory_service
+from src.utils.auth import authenticate_admin, authenticate_user
+from src.utils.waiting_room import require_admission
+
+router = APIRouter(prefix="/inventory", tags=["inventory"])
+
+
+@router.post("/holds", response_model=HoldOutput, status_code=201, dependencies=[Depends(require_admission)])
+async def create_hold(
+    hold_input: HoldInput,
+    inventory_service: InventoryService = Depends(get_inventory_service),
+    current_user: DBUser = Depends(authenticate_user),
+):
+    """Set aside limited stock for the cart while the customer checks out."""
+    return await inventory_service.hold(lines=hold_input.items, user_id=current_user.id)
+
+
+@router.delete("/holds/{hold_id}", status_code=204)
+async def release_hold(
+    hold_id: UUID,
+    inventory_service: InventoryService = Depends(get_inventory_service),
+    current_user: DBUser = Depends(authenticate_user),
+):
+    await inventory_service.release(hold_id=hold_id, user_id=current_user.id)
+
+
+@router.get("/books/{book_id}", response_model=StockOutput)
+async def get_stock(
+    book_id: UUID,
+    inventory_service: InventoryService = Depends(get_inventory_service),
+    current_user: DBUser = Depends(authenticate_user),
+):
+    return await inventory_service.stock(book_id=book_id)
+
+
+@router.put("/books/{book_id}", response_model=StockOutput)
+async def set_stock(
+    book_id: UUID,
+    stock_input: StockInput,
+    inventory_service: InventoryService = Depends(get_inventory_service),
+    current_user: DBUser = Depends(authenticate_admin),
+):
+    return await inventory_service.set_stock(book_id=book_id, stock=stock_input.stock)
@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import List
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+from src.routes.v1.orders.schema import MAX_CHECKOUT_LINES, CheckoutLineInput
+
+
+class HoldInput(BaseModel):
+    items: List[CheckoutLineInput] = Field(min_length=1, max_length=MAX_CHECKOUT_LINES)
+
+
+class HoldItemOutput(BaseModel):
+    book_id: UUID
+    quantity: int
+
+
+class HoldOutput(BaseModel):
+    """Stock set aside for a cart; pass ``id`` as ``hold_id`` to checkout before ``expires_at``.
+
+    Only books with limited stock are held; ``items`` is empty if the cart has none.
+    """
+
+    id: UUID
+    expires_at: datetime | None
+    items: List[HoldItemOutput]
+
+
+class StockInput(BaseModel):
+    stock: int | None = Field(ge=0, description="Units left, or null to stop tracking stock")
+
+
+class StockOutput(BaseModel):
+    book_id: UUID
+    stock: int | None  # As of the last reconciliation
+    available: int | None  # Less holds and recent sales
@@ -0,0 +1,160 @@
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Mapping
+
+from fastapi import Depends, HTTPException
+from sqlalchemy.exc import NoResultFound
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.operations import get_db_session, managed_session
+from src.routes.v1.books.service import BookNotFound
+from src.routes.v1.inventory.repository import InventoryRepository
+from src.routes.v1.inventory.reservations import (
+    CounterMissing,
+    HoldMismatch,
+    HoldUnavailable,
+    SoldOut,
+    Taken,
+    stock_reservations,
+)
+from src.routes.v1.inventory.schema import HoldOutput, StockOutput
+from src.routes.v1.orders.schema import CheckoutLineInput
+
+
+class OutOfStock(HTTPException):
+    def __init__(self, book_ids: List[uuid.UUID]) -> None:
+        super().__init__(status_code=409, detail=f"Out of stock: {', '.join(str(book_id) for book_id in book_ids)}")
+
+
+class StockCountUnavailable(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code=503, detail="Stock is being recounted, please retry", headers={"Retry-After": "1"})
+
+
+class HoldNotFound(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code=404, detail="Stock hold not found")
+
+
+class HoldExpired(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code=409, detail="Stock hold expired or was already used")
+
+
+class HoldDoesNotMatch(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code=409, detail="Stock hold does not match the cart")
+
+
+async def get_inventory_service(db_session: AsyncSession = Depends(get_db_session)) -> "InventoryService":
+    return InventoryService(db_session=db_session)
+
+
+async def reconcile_stock() -> int:
+    async with managed_session() as session:
+        return await InventoryRepository(db_session=session).reconcile()
+
+
+# Loads of a counter that was forgotten again before it could be used
+COUNTER_LOAD_ATTEMPTS = 3
+
+
+def merge_lines(lines: List[CheckoutLineInput]) -> Dict[uuid.UUID, int]:
+    quantities: Dict[uuid.UUID, int] = {}
+    for line in lines:
+        quantities[line.book_id] = quantities.get(line.book_id, 0) + line.quantity
+    return quantities
+
+
+class InventoryService:
+    def __init__(self, db_session: AsyncSession) -> None:
+        self.repository = InventoryRepository(db_session=db_session)
+
+    async def _load_counters(self, book_ids: List[uuid.UUID]) -> None:
+        missing = await stock_reservations.missing_counters(book_ids)
+        if missing:
+            await stock_reservations.load(await self.repository.unsold_stock(missing))
+
+    async def take(self, quantities: Mapping[uuid.UUID, int]) -> Taken:
+        """Take stock for an immediate sale of ``quantities`` of stock-tracked books."""
+        for _ in range(COUNTER_LOAD_ATTEMPTS):
+            await self._load_counters(list(quantities))
+            try:
+                return await stock_reservations.take(quantities)
+            except SoldOut as exc:
+                raise OutOfStock(exc.book_ids) from exc
+            except CounterMissing:
+                continue  # Forgotten after loading; load it again
+        raise StockCountUnavailable
+
+    async def give_back(self, quantities: Mapping[uuid.UUID, int], taken: Taken) -> None:
+        """Return stock taken for a sale that did not go through."""
+        await stock_reservations.give_back(quantities, taken)
+
+    async def restocked(self, quantities: Mapping[uuid.UUID, int]) -> None:
+        """Make stock returned by cancelled orders available again, once their transaction committed."""
+        for book_id, quantity in quantities.items():
+            await stock_reservations.adjust(book_id, quantity)
+
+    async def hold(self, lines: List[CheckoutLineInput], user_id: uuid.UUID) -> HoldOutput:
+        """Set aside the stock-tracked lines of a cart while the customer checks out."""
+        quantities = merge_lines(lines)
+        stock = await self.repository.stock_levels(quantities)
+        missing = [book_id for book_id in quantities if book_id not in stock]
+        if missing:
+            raise BookNotFound
+        tracked = {book_id: quantity for book_id, quantity in quantities.items() if stock[book_id] is not None}
+        if not tracked:
+            # Nothing to set aside; checkout accepts the id and ignores it
+            return HoldOutput(id=uuid.uuid4(), expires_at=None, items=[])
+        for _ in range(COUNTER_LOAD_ATTEMPTS):
+            await self._load_counters(list(tracked))
+            try:
+                hold_id, expires_at = await stock_reservations.hold(user_id, tracked)
+                break
+            except SoldOut as exc:
+                raise OutOfStock(exc.book_ids) from exc
+            except CounterMissing:
+                continue
+        else:
+            raise StockCountUnavailable
+        return HoldOutput(
+            id=hold_id,
+            expires_at=datetime.fromtimestamp(expires_at, tz=timezone.utc),
+            items=[{"book_id": book_id, "quantity": quantity} for book_id, quantity in tracked.items()],
+        )
+
+    async def claim(self, hold_id: uuid.UUID, user_id: uuid.UUID, quantities: Mapping[uuid.UUID, int]) -> Taken:
+        """Turn a hold into the sale of ``quantities`` of stock-tracked books."""
+        try:
+            return await stock_reservations.claim(hold_id, user_id, quantities)
+        except HoldUnavailable as exc:
+            raise HoldExpired from exc
+        except HoldMismatch as exc:
+            raise HoldDoesNotMatch from exc
+
+    async def release(self, hold_id: uuid.UUID, user_id: uuid.UUID) -> None:
+        if not await stock_reservations.release(hold_id, user_id=user_id):
+            raise HoldNotFound
+
+    async def stock(self, book_id: uuid.UUID) -> StockOutput:
+        try:
+            stock = await self.repository.stock(book_id)
+        except NoResultFound as exc:
+            raise BookNotFound from exc
+        if stock is None:
+            return StockOutput(book_id=book_id, stock=None, available=None)
+        await self._load_counters([book_id])
+        available = await stock_reservations.available(book_id)
+        return StockOutput(book_id=book_id, stock=stock, available=max(0, available) if available is not None else None)
+
+    async def set_stock(self, book_id: uuid.UUID, stock: int | None) -> StockOutput:
+        try:
+            previous = await self.repository.set_stock(book_id, stock)
+        except NoResultFound as exc:
+            raise BookNotFound from exc
+        if previous is not None and stock is not None:
+            await stock_reservations.adjust(book_id, stock - previous)
+        else:
+            # Tracking starts or stops; a counter is rebuilt from the new stock when needed
+            await stock_reservations.forget(book_id)
+        return await self.stock(book_id)
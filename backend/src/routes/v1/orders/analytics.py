@@ -0,0 +1,85 @@
+"""Daily sales counters, kept in Redis from the ``order.placed`` outbox messages.
+
+Counting happens in the outbox relay rather than at checkout, so it adds nothing to the
+request. Each day has a hash of order, unit and revenue totals and a sorted set of units
+per book. The outbox may deliver a message twice, so a message is counted in the same
+WATCH/MULTI transaction that records its id.
+"""
+
+from datetime import date
+from typing import Any, Dict, List
+from uuid import UUID
+
+from redis.exceptions import WatchError
+from src.db.models import DBOrder, DBOrderItem, DBOutboxMessage
+from src.db.outbox import outbox_message, outbox_relay
+from src.utils.redis import redis_client
+
+ORDER_PLACED = "order.placed"
+
+SALES_PREFIX = "analytics:sales"
+SALES_RETENTION_SECONDS = 400 * 24 * 60 * 60
+# Longer than a message can be retried for
+RECORDED_RETENTION_SECONDS = 7 * 24 * 60 * 60
+TOP_BOOKS = 10
+
+
+def sales_key(day: date) -> str:
+    return f"{SALES_PREFIX}:{day.isoformat()}"
+
+
+def order_placed_message(order: DBOrder, items: List[DBOrderItem]) -> DBOutboxMessage:
+    """The ``order.placed`` message, to be written with the order."""
+    return outbox_message(
+        ORDER_PLACED,
+        {
+            "order_id": order.id,
+            "user_id": order.user_id,
+            "quantity": order.quantity,
+            "total_amount": order.total_amount,
+            "created_at": order.created_at,
+            "items": [
+                {"book_id": item.book_id, "quantity": item.quantity, "unit_price": item.unit_price} for item in items
+            ],
+        },
+    )
+
+
+@outbox_relay.handler(ORDER_PLACED)
+async def record_sale(message_id: UUID, payload: Dict[str, Any]) -> None:
+    key = sales_key(date.fromisoformat(payload["created_at"][:10]))
+    recorded_key = f"{SALES_PREFIX}:recorded:{message_id}"
+    async with redis_client.pipeline(transaction=True) as pipe:
+        await pipe.watch(recorded_key)
+        if await pipe.exists(recorded_key):
+            await pipe.unwatch()
+            return
+        pipe.multi()
+        pipe.hincrby(key, "orders", 1)
+        pipe.hincrby(key, "units", payload["quantity"])
+        pipe.hincrbyfloat(key, "revenue", payload["total_amount"])
+        pipe.expire(key, SALES_RETENTION_SECONDS)
+        for item in payload["items"]:
+            pipe.zincrby(f"{key}:books", item["quantity"], item["book_id"])
+        if payload["items"]:
+            pipe.expire(f"{key}:books", SALES_RETENTION_SECONDS)
+        pipe.set(recorded_key, 1, ex=RECORDED_RETENTION_SECONDS)
+        try:
+            await pipe.execute()
+        except WatchError:
+            return  # Another relay recorded it meanwhile
+
+
+async def daily_sales(day: date) -> Dict[str, Any]:
+    key = sales_key(day)
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.hgetall(key)
+        pipe.zrevrange(f"{key}:books", 0, TOP_BOOKS - 1, withscores=True)
+        totals, top_books = await pipe.execute()
+    return {
+        "day": day,
+        "orders": int(totals.get("orders", 0)),
+        "units": int(totals.get("units", 0)),
+        "revenue": round(float(totals.get("revenue", 0)), 2),
+        "top_books": [{"book_id": book_id, "units": int(units)} for book_id, units in top_books],
+    }
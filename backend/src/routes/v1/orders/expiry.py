@@ -0,0 +1,50 @@
+"""Background expiry of abandoned pending orders.
+
+Every replica runs the loop, but each batch first takes a transaction-scoped Postgres
+advisory lock with ``pg_try_advisory_xact_lock``: while one replica is expiring orders the
+others skip their turn instead of queueing behind it. A transaction-scoped lock needs no
+dedicated connection and also works behind a transaction-pooling PgBouncer.
+
+A batch selects the oldest stale pending orders with ``FOR UPDATE SKIP LOCKED``, so rows
+that live requests are updating are left for the next run rather than waited for, and
+cancels them with their stock returned in one transaction.
+"""
+
+import asyncio
+import logging
+
+from src.routes.v1.orders.service import expire_stale_orders
+from src.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OrderExpiry:
+    def __init__(self) -> None:
+        self._worker: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                cancelled = await expire_stale_orders()
+                if cancelled:
+                    logger.info(f"Cancelled {cancelled} stale pending orders")
+            except Exception as exc:
+                logger.warning(f"Order expiry failed: {exc!r}")
+            await asyncio.sleep(settings.ORDER_EXPIRY_INTERVAL_SECONDS)
+
+
+order_expiry = OrderExpiry()
@@ -1,23 +1,52 @@
-from typing import List
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
 from uuid import UUID
 
-from sqlmodel import select
+from sqlalchemy import CTE, tuple_
+from sqlmodel import col, func, or_, select, update
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.models import DBOrder
-from src.routes.v1.orders.schema import OrderCreateInput
+from src.db.models import DBBook, DBCatalogBook, DBOrder, DBOrderItem, DBOutboxMessage, OrderStatus
+from src.routes.v1.inventory.repository import InventoryRepository
+
+# Held by whichever replica is running an expiry batch; released when the batch commits
+EXPIRY_LOCK = func.hashtext("orders:expiry")
 
 
 class OrderRepository:
     def __init__(self, db_session: AsyncSession):
         self.db_session = db_session
 
-    async def create(self, user_id: UUID, data: OrderCreateInput) -> DBOrder:
-        order = DBOrder(user_id=user_id, **data.model_dump())
+    async def book_prices(self, book_ids: Iterable[UUID]) -> Dict[UUID, Tuple[float, int | None]]:
+        """Price and stock (None if unlimited) of each book found."""
+        stmt = select(DBBook.id, DBBook.price, DBBook.stock).where(col(DBBook.id).in_(list(book_ids)))
+        result = await self.db_session.exec(stmt)
+        return {book_id: (price, stock) for book_id, price, stock in result.all()}
+
+    async def book_stock(self, book_id: UUID) -> int | None:
+        stmt = select(DBBook.stock).where(DBBook.id == book_id)
+        result = await self.db_session.exec(stmt)
+        return result.one_or_none()
+
+    async def create_with_items(
+        self, order: DBOrder, items: List[DBOrderItem], outbox: List[DBOutboxMessage]
+    ) -> DBOrder:
+        """Insert the order, its items and its outbox messages in one transaction, the items as one batched INSERT."""
         self.db_session.add(order)
+        self.db_session.add_all(items)
+        self.db_session.add_all(outbox)
         await self.db_session.commit()
-        await self.db_session.refresh(order)
         return order
 
+    async def list_items(self, order_id: UUID) -> List[DBOrderItem]:
+        stmt = select(DBOrderItem).where(DBOrderItem.order_id == order_id)
+        result = await self.db_session.exec(stmt)
+        return result.all()
+
+    async def has_items(self, order_id: UUID) -> bool:
+        stmt = select(DBOrderItem.order_id).where(DBOrderItem.order_id == order_id).limit(1)
+        result = await self.db_session.exec(stmt)
+        return result.first() is not None
+
     async def retrieve(self, order_id: UUID) -> DBOrder:
         stmt = select(DBOrder).where(DBOrder.id == order_id)
         result = await self.db_session.exec(stmt)
@@ -28,8 +57,36 @@ class OrderRepository:
         result = await self.db_session.exec(stmt)
         return result.one()
 
-    async def list(self) -> List[DBOrder]:
+    async def search(
+        self,
+        limit: int,
+        before: Tuple[datetime, UUID] | None = None,
+        status: OrderStatus | None = None,
+        user_id: UUID | None = None,
+        book_id: UUID | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+    ) -> List[DBOrder]:
+        """Up to ``limit`` orders matching every filter given, before the (created_at, id) key, newest first.
+
+        ``created_from`` is inclusive and ``created_to`` exclusive. ``book_id`` matches
+        single-book orders of the book and checkout orders with an item of it.
+        """
         stmt = select(DBOrder)
+        if status is not None:
+            stmt = stmt.where(DBOrder.status == status.value)
+        if user_id is not None:
+            stmt = stmt.where(DBOrder.user_id == user_id)
+        if book_id is not None:
+            has_item = select(DBOrderItem.id).where(DBOrderItem.order_id == DBOrder.id, DBOrderItem.book_id == book_id)
+            stmt = stmt.where(or_(DBOrder.book_id == book_id, has_item.exists()))
+        if created_from is not None:
+            stmt = stmt.where(DBOrder.created_at >= created_from)
+        if created_to is not None:
+            stmt = stmt.where(DBOrder.created_at < created_to)
+        if before is not None:
+            stmt = stmt.where(tuple_(DBOrder.created_at, DBOrder.id) < tuple_(*before))
+        stmt = stmt.order_by(DBOrder.created_at.desc(), DBOrder.id.desc()).limit(limit)
         result = await self.db_session.exec(stmt)
         return result.all()
 
@@ -38,16 +95,154 @@ class OrderRepository:
         result = await self.db_session.exec(stmt)
         return result.all()
 
-    async def update(self, user_id: UUID, order_id: UUID, **kwargs) -> DBOrder:
-        order = await self.retrieve_by_user(user_id=user_id, order_id=order_id)
-        for key, value in kwargs.items():
-            setattr(order, key, value)
-        self.db_session.add(order)
+    async def history_by_user(
+        self, user_id: UUID, limit: int, before: Tuple[datetime, UUID] | None = None
+    ) -> List[Dict[str, Any]]:
+        """Up to ``limit`` of the user's orders before the (created_at, id) key, newest first, a row per line.
+
+        Lines carry the book's title and author name from the catalog read model. Checkout
+        orders have a line per item; single-book orders one line, priced from their total.
+        """
+        page = select(
+            DBOrder.id, DBOrder.book_id, DBOrder.status, DBOrder.quantity, DBOrder.total_amount, DBOrder.created_at
+        ).where(DBOrder.user_id == user_id)
+        if before is not None:
+            page = page.where(tuple_(DBOrder.created_at, DBOrder.id) < tuple_(*before))
+        page = page.order_by(DBOrder.created_at.desc(), DBOrder.id.desc()).limit(limit).subquery("page")
+
+        line_book_id = func.coalesce(DBOrderItem.book_id, page.c.book_id)
+        stmt = (
+            select(
+                page,
+                line_book_id.label("line_book_id"),
+                func.coalesce(DBOrderItem.quantity, page.c.quantity).label("line_quantity"),
+                func.coalesce(DBOrderItem.unit_price, page.c.total_amount / page.c.quantity).label("unit_price"),
+                DBCatalogBook.title,
+                DBCatalogBook.author_name,
+            )
+            .outerjoin(DBOrderItem, DBOrderItem.order_id == page.c.id)
+            .outerjoin(DBCatalogBook, DBCatalogBook.id == line_book_id)
+            .order_by(page.c.created_at.desc(), page.c.id.desc(), DBCatalogBook.title)
+        )
+        result = await self.db_session.exec(stmt)
+        return [row._asdict() for row in result.all()]
+
+    async def list_version_by_user(self, user_id: UUID) -> Tuple[int, datetime | None]:
+        stmt = select(func.count(DBOrder.id), func.max(DBOrder.updated_at)).where(DBOrder.user_id == user_id)
+        result = await self.db_session.exec(stmt)
+        return tuple(result.one())
+
+    async def version_by_user(self, user_id: UUID, order_id: UUID) -> datetime:
+        stmt = select(DBOrder.updated_at).where(DBOrder.id == order_id, DBOrder.user_id == user_id)
+        result = await self.db_session.exec(stmt)
+        return result.one()
+
+    async def _update_version(self, user_id: UUID, order_id: UUID, version: int, **kwargs) -> DBOrder:
+        stmt = (
+            update(DBOrder)
+            .where(DBOrder.id == order_id, DBOrder.user_id == user_id, DBOrder.version == version)
+            .values(**kwargs, version=DBOrder.version + 1)
+            .returning(DBOrder)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.db_session.exec(stmt)
+        return result.scalar_one()
+
+    async def update(self, user_id: UUID, order_id: UUID, version: int, **kwargs) -> DBOrder:
+        """Apply ``kwargs`` in one UPDATE if the order is still at ``version``, else raise NoResultFound."""
+        order = await self._update_version(user_id=user_id, order_id=order_id, version=version, **kwargs)
         await self.db_session.commit()
-        await self.db_session.refresh(order)
         return order
 
-    async def delete(self, user_id: UUID, order_id: UUID) -> None:
-        order = await self.retrieve_by_user(user_id=user_id, order_id=order_id)
+    async def cancel(self, user_id: UUID, order_id: UUID, version: int, **kwargs) -> Tuple[DBOrder, Dict[UUID, int]]:
+        """Like ``update``, but also cancel the order and return its stock, in the same transaction.
+
+        Returns the order and the units returned per stock-tracked book.
+        """
+        order = await self._update_version(
+            user_id=user_id, order_id=order_id, version=version, **kwargs, status=OrderStatus.CANCELLED.value
+        )
+        restocked = await InventoryRepository(db_session=self.db_session).restock([order_id])
+        await self.db_session.commit()
+        return order, restocked
+
+    async def expire_pending(
+        self, created_before: datetime, limit: int
+    ) -> Tuple[List[Tuple[UUID, UUID]], Dict[UUID, int]] | None:
+        """Cancel up to ``limit`` pending orders placed before ``created_before``, oldest first.
+
+        Orders locked by live requests are skipped rather than waited for. Returns the
+        (order id, user id) pairs cancelled and the units returned per stock-tracked book,
+        or None if another replica is running a batch.
+        """
+        locked = await self.db_session.exec(select(func.pg_try_advisory_xact_lock(EXPIRY_LOCK)))
+        if not locked.one():
+            await self.db_session.rollback()
+            return None
+        stale = (
+            select(DBOrder.id)
+            .where(DBOrder.status == OrderStatus.PENDING.value, DBOrder.created_at < created_before)
+            .order_by(DBOrder.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .cte("stale")
+        )
+        expired, restocked = await self._set_status(stale, OrderStatus.CANCELLED)
+        await self.db_session.commit()
+        return expired, restocked
+
+    async def transition(
+        self, order_ids: List[UUID], status: OrderStatus, from_statuses: Iterable[OrderStatus]
+    ) -> Tuple[List[Tuple[UUID, UUID]], Dict[UUID, int]]:
+        """Move the orders currently in one of ``from_statuses`` to ``status``, in one transaction.
+
+        Rows are locked in id order, so overlapping bulk transitions cannot deadlock. Returns
+        the (order id, user id) pairs moved and, for cancellations, the units returned per
+        stock-tracked book.
+        """
+        selected = (
+            select(DBOrder.id)
+            .where(
+                col(DBOrder.id).in_(order_ids),
+                col(DBOrder.status).in_([from_status.value for from_status in from_statuses]),
+            )
+            .order_by(DBOrder.id)
+            .with_for_update()
+            .cte("selected")
+        )
+        moved, restocked = await self._set_status(selected, status)
+        await self.db_session.commit()
+        return moved, restocked
+
+    async def _set_status(self, selected: CTE, status: OrderStatus) -> Tuple[List[Tuple[UUID, UUID]], Dict[UUID, int]]:
+        """Set ``status`` on the orders ``selected`` has locked; cancelled orders return their stock."""
+        stmt = (
+            update(DBOrder)
+            .where(DBOrder.id == selected.c.id)
+            .values(status=status.value, version=DBOrder.version + 1)
+            .returning(DBOrder.id, DBOrder.user_id)
+            .execution_options(synchronize_session=False)
+        )
+        moved = [tuple(row) for row in (await self.db_session.exec(stmt)).all()]
+        restocked = {}
+        if moved and status is OrderStatus.CANCELLED:
+            inventory = InventoryRepository(db_session=self.db_session)
+            restocked = await inventory.restock([order_id for order_id, _ in moved])
+        return moved, restocked
+
+    async def delete(self, user_id: UUID, order_id: UUID) -> Dict[UUID, int]:
+        """Delete the order; a pending order returns its stock. Return the units returned per book."""
+        # Locked first, so a cancel or transition committing meanwhile is seen and stock is returned once
+        stmt = (
+            select(DBOrder)
+            .where(DBOrder.id == order_id, DBOrder.user_id == user_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        order = (await self.db_session.exec(stmt)).one()
+        restocked = {}
+        if order.status == OrderStatus.PENDING.value:
+            restocked = await InventoryRepository(db_session=self.db_session).restock([order_id])
         await self.db_session.delete(order)
         await self.db_session.commit()
+        return restocked
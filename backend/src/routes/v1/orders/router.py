@@ -1,52 +1,125 @@
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
-from src.db.models import DBUser
-from src.routes.v1.orders.schema import OrderCreateInput, OrderOutput, OrderUpdateInput
-from src.routes.v1.orders.service import OrderService, get_order_service
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
+from src.db.models import DBOrder, DBOrderItem, DBUser
+from src.routes.v1.orders.schema import (
+    CheckoutInput,
+    OrderCreateInput,
+    OrderDetailOutput,
+    OrderHistoryPage,
+    OrderItemOutput,
+    OrderOutput,
+    OrderUpdateInput,
+)
+from src.routes.v1.orders.service import OrderService, get_order_service, order_validators
 from src.utils.auth import authenticate_user
+from src.utils.conditional import apply_validators, is_not_modified, not_modified_response
+from src.utils.idempotency import IdempotentRequest, idempotent
+from src.utils.waiting_room import spend_admission
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
 
-@router.post("", response_model=OrderOutput, status_code=201)
+def order_detail(order: DBOrder, items: List[DBOrderItem]) -> OrderDetailOutput:
+    return OrderDetailOutput(**order.model_dump(), items=[OrderItemOutput(**item.model_dump()) for item in items])
+
+
+@router.post(
+    "", response_model=OrderOutput, status_code=201, deprecated=True, dependencies=[Depends(spend_admission)]
+)
 async def create_order(
     order_input: OrderCreateInput,
+    idempotency: IdempotentRequest = Depends(idempotent("orders:create", authenticate_user)),
     order_service: OrderService = Depends(get_order_service),
     current_user: DBUser = Depends(authenticate_user),
 ):
+    if idempotency.replay:
+        return idempotency.replay
     order = await order_service.create(data=order_input, user_id=current_user.id)
-    return OrderOutput(**order.model_dump())
+    return await idempotency.respond(OrderOutput(**order.model_dump()), status_code=201)
+
+
+@router.post(
+    "/checkout", response_model=OrderDetailOutput, status_code=201, dependencies=[Depends(spend_admission)]
+)
+async def checkout(
+    checkout_input: CheckoutInput,
+    idempotency: IdempotentRequest = Depends(idempotent("orders:checkout", authenticate_user)),
+    order_service: OrderService = Depends(get_order_service),
+    current_user: DBUser = Depends(authenticate_user),
+):
+    """Order every line of the cart at once, at current catalog prices.
+
+    While the checkout waiting room is enabled, requests need an admitted ticket, which a
+    successful checkout spends.
+    """
+    if idempotency.replay:
+        return idempotency.replay
+    order, items = await order_service.checkout(data=checkout_input, user_id=current_user.id)
+    return await idempotency.respond(order_detail(order, items), status_code=201)
 
 
 @router.get("", response_model=List[OrderOutput])
 async def list_orders(
+    request: Request,
+    response: Response,
     order_service: OrderService = Depends(get_order_service),
     current_user: DBUser = Depends(authenticate_user),
 ):
+    validators = await order_service.list_by_user_validators(user_id=current_user.id)
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
     orders = await order_service.list_by_user(user_id=current_user.id)
+    apply_validators(response, validators)
     return [OrderOutput(**order.model_dump()) for order in orders]
 
 
-@router.get("/{order_id}", response_model=OrderOutput)
+@router.get("/history", response_model=OrderHistoryPage)
+async def list_order_history(
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
+    order_service: OrderService = Depends(get_order_service),
+    current_user: DBUser = Depends(authenticate_user),
+):
+    """The user's orders, newest first, with each line's book title, author and price paid."""
+    return await order_service.history(user_id=current_user.id, limit=limit, cursor=cursor)
+
+
+@router.get("/{order_id}", response_model=OrderDetailOutput)
 async def get_order(
     order_id: UUID,
+    request: Request,
+    response: Response,
     order_service: OrderService = Depends(get_order_service),
     current_user: DBUser = Depends(authenticate_user),
 ):
+    validators = await order_service.validators_by_user(order_id=order_id, user_id=current_user.id)
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
     order = await order_service.retrieve_by_user(order_id=order_id, user_id=current_user.id)
-    return OrderOutput(**order.model_dump())
+    items = await order_service.list_items(order_id=order.id)
+    apply_validators(response, validators)
+    return order_detail(order, items)
 
 
 @router.patch("/{order_id}", response_model=OrderOutput)
 async def update_order(
     order_id: UUID,
     update_input: OrderUpdateInput,
+    response: Response,
+    if_match: str | None = Header(default=None, description="ETag from GET; the update fails with 412 if stale"),
     order_service: OrderService = Depends(get_order_service),
     current_user: DBUser = Depends(authenticate_user),
 ):
-    order = await order_service.update(order_id=order_id, user_id=current_user.id, data=update_input)
+    order = await order_service.update(
+        order_id=order_id,
+        user_id=current_user.id,
+        data=update_input,
+        if_match=if_match,
+        is_admin=current_user.role == "admin",
+    )
+    apply_validators(response, order_validators(order))
     return OrderOutput(**order.model_dump())
 
 
@@ -1,6 +1,12 @@
+from datetime import datetime
+from typing import List
 from uuid import UUID
 
 from pydantic import BaseModel, Field
+from src.db.models import OrderStatus
+
+MAX_CHECKOUT_LINES = 100
+MAX_BULK_ORDERS = 500
 
 
 class OrderCreateInput(BaseModel):
@@ -9,16 +15,82 @@ class OrderCreateInput(BaseModel):
     total_amount: float = Field(gt=0)
 
 
+class CheckoutLineInput(BaseModel):
+    book_id: UUID
+    quantity: int = Field(default=1, gt=0)
+
+
+class CheckoutInput(BaseModel):
+    items: List[CheckoutLineInput] = Field(min_length=1, max_length=MAX_CHECKOUT_LINES)
+    hold_id: UUID | None = Field(default=None, description="Stock hold placed for these items, if any")
+
+
 class OrderUpdateInput(BaseModel):
     quantity: int | None = Field(default=None, gt=0)
     total_amount: float | None = Field(default=None, gt=0)
-    status: str | None = None
+    status: OrderStatus | None = None
 
 
 class OrderOutput(BaseModel):
     id: UUID
     user_id: UUID
+    book_id: UUID | None
+    quantity: int
+    total_amount: float
+    status: OrderStatus
+
+
+class OrderItemOutput(BaseModel):
+    book_id: UUID
+    quantity: int
+    unit_price: float
+
+
+class OrderDetailOutput(OrderOutput):
+    items: List[OrderItemOutput]
+
+
+class OrderHistoryLineOutput(BaseModel):
     book_id: UUID
+    title: str | None  # None once the book has left the catalog
+    author_name: str | None
+    quantity: int
+    unit_price: float  # As charged when the order was placed
+
+
+class OrderHistoryOutput(BaseModel):
+    id: UUID
+    status: OrderStatus
     quantity: int
     total_amount: float
-    status: str
+    created_at: datetime
+    lines: List[OrderHistoryLineOutput]
+
+
+class OrderHistoryPage(BaseModel):
+    """Orders newest first. Pass ``next_cursor`` as ``cursor`` for the next, older page."""
+
+    orders: List[OrderHistoryOutput]
+    next_cursor: str | None
+
+
+class AdminOrderOutput(OrderOutput):
+    created_at: datetime
+    updated_at: datetime
+
+
+class AdminOrderPage(BaseModel):
+    """Orders newest first. Pass ``next_cursor`` as ``cursor`` for the next, older page."""
+
+    orders: List[AdminOrderOutput]
+    next_cursor: str | None
+
+
+class BulkStatusInput(BaseModel):
+    order_ids: List[UUID] = Field(min_length=1, max_length=MAX_BULK_ORDERS)
+    status: OrderStatus
+
+
+class BulkStatusOutput(BaseModel):
+    updated: List[UUID]
+    skipped: List[UUID] = Field(description="Orders not found, or whose status cannot make the transition")
@@ -1,13 +1,37 @@
+import base64
 import uuid
-from typing import List
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
 
 from fastapi import Depends, HTTPException
 from sqlalchemy.exc import NoResultFound
 from sqlmodel.ext.asyncio.session import AsyncSession
-from src.db.models import DBOrder
-from src.db.operations import get_db_session
+from src.db.group_commit import GroupCommitBatcher
+from src.db.models import DBOrder, DBOrderItem, OrderStatus
+from src.db.operations import get_db_session, managed_session
+from src.routes.v1.inventory.service import InventoryService, merge_lines
+from src.routes.v1.orders.analytics import order_placed_message
 from src.routes.v1.orders.repository import OrderRepository
-from src.routes.v1.orders.schema import OrderCreateInput, OrderUpdateInput
+from src.routes.v1.orders.schema import (
+    AdminOrderOutput,
+    AdminOrderPage,
+    BulkStatusOutput,
+    CheckoutInput,
+    OrderCreateInput,
+    OrderHistoryLineOutput,
+    OrderHistoryOutput,
+    OrderHistoryPage,
+    OrderUpdateInput,
+)
+from src.settings import settings
+from src.utils.change_feed import publish_order_event
+from src.utils.conditional import (
+    PreconditionFailed,
+    UpdateConflict,
+    Validators,
+    make_validators,
+    matches_if_match,
+)
 
 
 class OrderNotFound(HTTPException):
@@ -15,6 +39,99 @@ class OrderNotFound(HTTPException):
         super().__init__(status_code=404, detail="Order not found")
 
 
+class BooksNotFound(HTTPException):
+    def __init__(self, book_ids: List[uuid.UUID]) -> None:
+        super().__init__(status_code=404, detail=f"Books not found: {', '.join(str(book_id) for book_id in book_ids)}")
+
+
+class InvalidStatusTransition(HTTPException):
+    def __init__(self, current: str, requested: str) -> None:
+        super().__init__(status_code=409, detail=f"A {current} order cannot become {requested}")
+
+
+class OrderIsFinal(HTTPException):
+    def __init__(self, status: str) -> None:
+        super().__init__(status_code=409, detail=f"A {status} order can no longer be changed")
+
+
+class OrderPricedFromItems(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code=409, detail="Orders with items are priced from them and cannot be edited")
+
+
+class OrderTotalsNeedAdmin(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code=403, detail="Only admins can change an order's quantity or total")
+
+
+# Pending orders are completed or cancelled; both are final
+STATUS_TRANSITIONS = {
+    OrderStatus.PENDING: {OrderStatus.COMPLETED, OrderStatus.CANCELLED},
+    OrderStatus.COMPLETED: set(),
+    OrderStatus.CANCELLED: set(),
+}
+
+
+# The only change owners make themselves; completion is fulfilment's, through ``transition_many``
+OWNER_STATUSES = {OrderStatus.CANCELLED}
+
+
+class StatusNeedsFulfilment(HTTPException):
+    def __init__(self, status: str) -> None:
+        super().__init__(status_code=403, detail=f"Orders become {status} through the admin order console")
+
+
+class UnreachableStatus(HTTPException):
+    def __init__(self, status: str) -> None:
+        super().__init__(status_code=409, detail=f"No order can become {status}")
+
+
+class InvalidCursor(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code=422, detail="Invalid order history cursor")
+
+
+class StockedBookNeedsCheckout(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code=409, detail="Books with limited stock must be ordered through checkout")
+
+
+order_batcher = GroupCommitBatcher(
+    "Order inserts",
+    window_seconds=settings.ORDER_GROUP_COMMIT_WINDOW_MILLISECONDS / 1000,
+    max_batch=settings.ORDER_GROUP_COMMIT_MAX_BATCH,
+)
+
+
+def encode_cursor(created_at: datetime, order_id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{order_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        created_at, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), uuid.UUID(order_id)
+    except ValueError as exc:
+        raise InvalidCursor from exc
+
+
+def naive_utc(value: datetime | None) -> datetime | None:
+    # Columns hold naive UTC
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def order_validators(order: DBOrder) -> Validators:
+    """The validators of ``order``'s representation, as served by GET /orders/{order_id}."""
+    return make_validators("order", order.id, order.updated_at, last_modified=order.updated_at)
+
+
+async def expire_stale_orders() -> int:
+    async with managed_session() as session:
+        return await OrderService(db_session=session).expire_stale()
+
+
 async def get_order_service(db_session: AsyncSession = Depends(get_db_session)) -> "OrderService":
     return OrderService(db_session=db_session)
 
@@ -22,9 +139,68 @@ async def get_order_service(db_session: AsyncSession = Depends(get_db_session))
 class OrderService:
     def __init__(self, db_session: AsyncSession) -> None:
         self.repository = OrderRepository(db_session=db_session)
+        self.inventory = InventoryService(db_session=db_session)
 
     async def create(self, data: OrderCreateInput, user_id: uuid.UUID) -> DBOrder:
-        return await self.repository.create(user_id=user_id, data=data)
+        # Single-book orders have no items, so their sales could not be deducted from stock
+        if data.book_id is not None and await self.repository.book_stock(data.book_id) is not None:
+            raise StockedBookNeedsCheckout
+        order = DBOrder(user_id=user_id, **data.model_dump())
+        message = order_placed_message(order, [])
+        if settings.ORDER_GROUP_COMMIT_ENABLED:
+            await order_batcher.submit(order, message)
+        else:
+            await self.repository.create_with_items(order=order, items=[], outbox=[message])
+        await publish_order_event("order.created", user_id=user_id, id=order.id, status=order.status)
+        return order
+
+    async def checkout(self, data: CheckoutInput, user_id: uuid.UUID) -> Tuple[DBOrder, List[DBOrderItem]]:
+        """Place one order for every line of the cart, priced from the catalog.
+
+        The order, its items and its ``order.placed`` outbox message are inserted together,
+        so the order is either placed in full or not at all. Unless group commit is enabled,
+        the price lookup shares their transaction.
+
+        Books with limited stock are taken from the hold in ``data.hold_id``, or from the
+        available stock if there is none; the stock is given back if the order is not written.
+        """
+        quantities = merge_lines(data.items)
+        books = await self.repository.book_prices(quantities)
+        missing = [book_id for book_id in quantities if book_id not in books]
+        if missing:
+            raise BooksNotFound(missing)
+        prices = {book_id: price for book_id, (price, _) in books.items()}
+        stocked: Dict[uuid.UUID, int] = {
+            book_id: quantity for book_id, quantity in quantities.items() if books[book_id][1] is not None
+        }
+
+        order = DBOrder(
+            user_id=user_id,
+            quantity=sum(quantities.values()),
+            total_amount=round(sum(prices[book_id] * quantity for book_id, quantity in quantities.items()), 2),
+        )
+        items = [
+            DBOrderItem(order_id=order.id, book_id=book_id, quantity=quantity, unit_price=prices[book_id])
+            for book_id, quantity in quantities.items()
+        ]
+        message = order_placed_message(order, items)
+        if stocked:
+            if data.hold_id is not None:
+                taken = await self.inventory.claim(data.hold_id, user_id, stocked)
+            else:
+                taken = await self.inventory.take(stocked)
+        try:
+            if settings.ORDER_GROUP_COMMIT_ENABLED:
+                await order_batcher.submit(order, *items, message)
+            else:
+                await self.repository.create_with_items(order=order, items=items, outbox=[message])
+        except Exception:
+            # A cancelled group-commit caller's order is still written, so its stock stays taken
+            if stocked:
+                await self.inventory.give_back(stocked, taken)
+            raise
+        await publish_order_event("order.created", user_id=user_id, id=order.id, status=order.status)
+        return order, items
 
     async def retrieve(self, order_id: uuid.UUID) -> DBOrder:
         try:
@@ -38,20 +214,170 @@ class OrderService:
         except NoResultFound as exc:
             raise OrderNotFound from exc
 
-    async def list(self) -> List[DBOrder]:
-        return await self.repository.list()
+    async def list_items(self, order_id: uuid.UUID) -> List[DBOrderItem]:
+        return await self.repository.list_items(order_id=order_id)
+
+    async def search(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        **filters: Any,
+    ) -> AdminOrderPage:
+        """A page of all users' orders matching ``filters``, newest first."""
+        before = decode_cursor(cursor) if cursor is not None else None
+        orders = await self.repository.search(
+            limit=limit + 1,
+            before=before,
+            created_from=naive_utc(created_from),
+            created_to=naive_utc(created_to),
+            **filters,
+        )
+        page = [AdminOrderOutput(**order.model_dump()) for order in orders[:limit]]
+        next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(orders) > limit else None
+        return AdminOrderPage(orders=page, next_cursor=next_cursor)
 
     async def list_by_user(self, user_id: uuid.UUID) -> List[DBOrder]:
         return await self.repository.list_by_user(user_id=user_id)
 
-    async def update(self, order_id: uuid.UUID, user_id: uuid.UUID, data: OrderUpdateInput) -> DBOrder:
+    async def history(self, user_id: uuid.UUID, limit: int, cursor: str | None = None) -> OrderHistoryPage:
+        """A page of the user's orders with their lines, newest first, in one query."""
+        before = decode_cursor(cursor) if cursor is not None else None
+        # One order more than the page tells whether there is a next page
+        rows = await self.repository.history_by_user(user_id=user_id, limit=limit + 1, before=before)
+        orders: Dict[uuid.UUID, OrderHistoryOutput] = {}
+        for row in rows:
+            order = orders.get(row["id"])
+            if order is None:
+                order = orders[row["id"]] = OrderHistoryOutput(**row, lines=[])
+            if row["line_book_id"] is not None:
+                order.lines.append(
+                    OrderHistoryLineOutput(
+                        book_id=row["line_book_id"],
+                        title=row["title"],
+                        author_name=row["author_name"],
+                        quantity=row["line_quantity"],
+                        unit_price=round(row["unit_price"], 2),
+                    )
+                )
+        page = list(orders.values())
+        if len(page) <= limit:
+            return OrderHistoryPage(orders=page, next_cursor=None)
+        page = page[:limit]
+        return OrderHistoryPage(orders=page, next_cursor=encode_cursor(page[-1].created_at, page[-1].id))
+
+    async def list_by_user_validators(self, user_id: uuid.UUID) -> Validators:
+        count, updated_at = await self.repository.list_version_by_user(user_id=user_id)
+        return make_validators("orders", user_id, count, updated_at, last_modified=updated_at)
+
+    async def validators_by_user(self, order_id: uuid.UUID, user_id: uuid.UUID) -> Validators:
         try:
-            return await self.repository.update(user_id=user_id, order_id=order_id, **data.model_dump(exclude_unset=True))
+            updated_at = await self.repository.version_by_user(user_id=user_id, order_id=order_id)
         except NoResultFound as exc:
             raise OrderNotFound from exc
+        return make_validators("order", order_id, updated_at, last_modified=updated_at)
+
+    async def update(
+        self,
+        order_id: uuid.UUID,
+        user_id: uuid.UUID,
+        data: OrderUpdateInput,
+        if_match: str | None = None,
+        is_admin: bool = False,
+    ) -> DBOrder:
+        """Update the order unless it changed since ``if_match`` (412) or while updating (409).
+
+        Status changes must follow ``STATUS_TRANSITIONS`` (409 otherwise), and owners can only
+        cancel (403 otherwise). Only pending orders can be edited (409 otherwise). Cancelling
+        an order returns its stock. Quantity and total are only edited by admins (403), and
+        never on orders priced from their items (409).
+        """
+        changes = data.model_dump(exclude_unset=True)
+        status = changes.pop("status", None)
+        current = await self.retrieve_by_user(order_id=order_id, user_id=user_id)
+        if if_match is not None and not matches_if_match(if_match, order_validators(current)):
+            raise PreconditionFailed
+        current_status = OrderStatus(current.status)
+        if status == current_status:
+            status = None
+        if status is not None and status not in STATUS_TRANSITIONS[current_status]:
+            raise InvalidStatusTransition(current_status.value, status.value)
+        if status is not None and status not in OWNER_STATUSES:
+            raise StatusNeedsFulfilment(status.value)
+        if changes and current_status is not OrderStatus.PENDING:
+            raise OrderIsFinal(current_status.value)
+        if changes:
+            if not is_admin:
+                raise OrderTotalsNeedAdmin
+            if await self.repository.has_items(order_id=order_id):
+                raise OrderPricedFromItems
+
+        try:
+            if status is OrderStatus.CANCELLED:
+                order, restocked = await self.repository.cancel(
+                    user_id=user_id, order_id=order_id, version=current.version, **changes
+                )
+                await self.inventory.restocked(restocked)
+            else:
+                if status is not None:
+                    changes["status"] = status.value
+                order = await self.repository.update(
+                    user_id=user_id, order_id=order_id, version=current.version, **changes
+                )
+        except NoResultFound as exc:
+            raise UpdateConflict from exc
+        await publish_order_event("order.updated", user_id=user_id, id=order.id, status=order.status)
+        return order
+
+    async def transition_many(self, order_ids: List[uuid.UUID], status: OrderStatus) -> BulkStatusOutput:
+        """Move every listed order that ``STATUS_TRANSITIONS`` allows to ``status``, in one statement.
+
+        Orders not found or not allowed the transition are skipped. Cancelled orders return their stock.
+        """
+        from_statuses = [current for current, targets in STATUS_TRANSITIONS.items() if status in targets]
+        if not from_statuses:
+            raise UnreachableStatus(status.value)
+        order_ids = list(dict.fromkeys(order_ids))
+        moved, restocked = await self.repository.transition(
+            order_ids=order_ids, status=status, from_statuses=from_statuses
+        )
+        await self.inventory.restocked(restocked)
+        for order_id, user_id in moved:
+            await publish_order_event("order.updated", user_id=user_id, id=order_id, status=status.value)
+        updated = {order_id for order_id, _ in moved}
+        return BulkStatusOutput(
+            updated=[order_id for order_id in order_ids if order_id in updated],
+            skipped=[order_id for order_id in order_ids if order_id not in updated],
+        )
+
+    async def expire_stale(self) -> int:
+        """Cancel pending orders older than ORDER_PENDING_EXPIRY_MINUTES, a bounded batch per transaction.
+
+        Stops early if another replica is expiring orders. Returns how many were cancelled.
+        """
+        created_before = datetime.utcnow() - timedelta(minutes=settings.ORDER_PENDING_EXPIRY_MINUTES)
+        cancelled = 0
+        while True:
+            batch = await self.repository.expire_pending(
+                created_before=created_before, limit=settings.ORDER_EXPIRY_BATCH_SIZE
+            )
+            if batch is None:
+                return cancelled
+            expired, restocked = batch
+            await self.inventory.restocked(restocked)
+            for order_id, user_id in expired:
+                await publish_order_event(
+                    "order.updated", user_id=user_id, id=order_id, status=OrderStatus.CANCELLED.value
+                )
+            cancelled += len(expired)
+            if len(expired) < settings.ORDER_EXPIRY_BATCH_SIZE:
+                return cancelled
 
     async def delete(self, order_id: uuid.UUID, user_id: uuid.UUID) -> None:
         try:
-            await self.repository.delete(user_id=user_id, order_id=order_id)
+            restocked = await self.repository.delete(user_id=user_id, order_id=order_id)
         except NoResultFound as exc:
             raise OrderNotFound from exc
+        await self.inventory.restocked(restocked)
+        await publish_order_event("order.deleted", user_id=user_id, id=order_id)
@@ -15,6 +15,7 @@ from src.db.models import DBUser
 from src.db.operations import get_db_session
 from src.routes.v1.users.repository import UserRepository
 from src.routes.v1.users.schema import UserSignUpInput, UserUpdateInput
+from src.utils.invalidation_bus import publish_invalidation
 
 
 class UserAlreadyExists(HTTPException):
@@ -55,8 +56,11 @@ class UserService:
 
     async def update(self, user_id: uuid.UUID, data: UserUpdateInput) -> DBUser:
         await self.retrieve(user_id=user_id)
-        return await self.repository.update(user_id=user_id, **data.model_dump(exclude_unset=True))
+        user = await self.repository.update(user_id=user_id, **data.model_dump(exclude_unset=True))
+        await publish_invalidation("user", user_id)
+        return user
 
     async def delete(self, user_id: uuid.UUID) -> None:
         user = await self.retrieve(user_id=user_id)
         await self.repository.update(user_id=user.id, is_active=False)
+        await publish_invalidation("user", user_id)
@@ -0,0 +1,39 @@
+"""Checkout waiting room: join the queue, then poll the ticket (or stream it from
+``/events/waiting-room/{ticket_id}``) until admitted.
+
+These endpoints authenticate from the access token alone and only use Redis, so the
+queue can absorb a flash-sale crowd without touching the database.
+"""
+
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Response
+from src.routes.v1.waiting_room.schema import TicketOutput
+from src.settings import settings
+from src.utils.auth import authenticate_user_id
+from src.utils.waiting_room import TicketNotFound, checkout_waiting_room
+
+router = APIRouter(prefix="/waiting-room", tags=["waiting-room"])
+
+
+@router.post("/tickets", response_model=TicketOutput)
+async def join_waiting_room(response: Response, user_id: UUID = Depends(authenticate_user_id)):
+    """Join the checkout queue, or get the ticket already held.
+
+    Send the ticket id as the ``Waiting-Room-Ticket`` header of checkout once admitted.
+    """
+    ticket = await checkout_waiting_room.join(user_id)
+    if not ticket.admitted:
+        response.headers["Retry-After"] = str(max(1, round(settings.WAITING_ROOM_ADMIT_INTERVAL_SECONDS)))
+    return ticket
+
+
+@router.get("/tickets/{ticket_id}", response_model=TicketOutput)
+async def get_ticket(ticket_id: UUID, response: Response, user_id: UUID = Depends(authenticate_user_id)):
+    """Check the ticket's place in the queue; polling keeps a waiting ticket alive."""
+    ticket = await checkout_waiting_room.status(ticket_id, user_id)
+    if ticket is None:
+        raise TicketNotFound
+    if not ticket.admitted:
+        response.headers["Retry-After"] = str(max(1, round(settings.WAITING_ROOM_ADMIT_INTERVAL_SECONDS)))
+    return ticket
@@ -0,0 +1,10 @@
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class TicketOutput(BaseModel):
+    id: UUID
+    admitted: bool
+    position: int  # Tickets ahead of this one, counting it; 0 once admitted
+    estimated_wait_seconds: float
@@ -0,0 +1,82 @@
+"""Production server entrypoint.
+
+Runs the application under uvicorn with multiple worker processes, uvloop and httptools:
+
+    python -m src.server
+
+SIGTERM stops the listening sockets and gives in-flight requests
+SERVER_GRACEFUL_SHUTDOWN_SECONDS to drain before workers exit. With more than one worker,
+workers exit after SERVER_MAX_REQUESTS requests and are replaced by the supervisor, capping
+memory growth; a single worker runs without a supervisor, so it is never recycled. Each
+worker process adds its own random share of SERVER_MAX_REQUESTS_JITTER to the limit, so
+workers started together do not all restart at once.
+"""
+
+import random
+import socket
+import sys
+from typing import Any, Dict, List
+
+import uvicorn
+from src.settings import settings
+from uvicorn.main import STARTUP_FAILURE
+from uvicorn.supervisors import Multiprocess
+
+
+def get_server_options() -> Dict[str, Any]:
+    """Build the uvicorn options for the production runtime."""
+    options = {
+        "host": settings.SERVER_HOST,
+        "port": settings.SERVER_PORT,
+        "workers": settings.WEB_CONCURRENCY,
+        "loop": "uvloop",
+        "http": "httptools",
+        "backlog": settings.SERVER_BACKLOG,
+        "timeout_keep_alive": settings.SERVER_KEEP_ALIVE_SECONDS,
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        "proxy_headers": True,
+        "forwarded_allow_ips": "*",
+        "access_log": settings.SERVER_ACCESS_LOG,
+        "log_level": settings.LOGGING_LEVEL.lower(),
+    }
+    if settings.WEB_CONCURRENCY > 1:
+        # Nothing would restart a lone worker that exits
+        options["limit_max_requests"] = settings.SERVER_MAX_REQUESTS
+    return options
+
+
+class RecyclingServer(uvicorn.Server):
+    """A uvicorn server that draws its request limit when its worker process starts.
+
+    uvicorn hands every worker the same ``limit_max_requests``; the supervisor sends each
+    worker its own copy of this server, so each one, including replacements, draws its own
+    jitter.
+    """
+
+    def __init__(self, config: uvicorn.Config, max_requests_jitter: int = 0) -> None:
+        super().__init__(config)
+        self.max_requests_jitter = max_requests_jitter
+
+    def run(self, sockets: List[socket.socket] | None = None) -> None:
+        if self.config.limit_max_requests is not None and self.max_requests_jitter > 0:
+            self.config.limit_max_requests += random.randint(0, self.max_requests_jitter)
+        super().run(sockets=sockets)
+
+
+def main() -> None:
+    # uvicorn.run(), with the server swapped for one that jitters the request limit
+    config = uvicorn.Config("src.main:app", **get_server_options())
+    server = RecyclingServer(config, max_requests_jitter=settings.SERVER_MAX_REQUESTS_JITTER)
+    try:
+        if config.workers > 1:
+            Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+        else:
+            server.run()
+    except KeyboardInterrupt:
+        pass
+    if config.workers == 1 and not server.started:
+        sys.exit(STARTUP_FAILURE)
+
+
+if __name__ == "__main__":
+    main()
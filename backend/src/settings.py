@@ -2,7 +2,7 @@
 
 from typing import List, Literal
 
-from pydantic import computed_field
+from pydantic import computed_field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -27,10 +27,109 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int = 5432
     DATABASE_POOL_SIZE: int = 20
     DATABASE_POOL_SIZE_OVERFLOW: int = 40
+    DATABASE_POOL_TIMEOUT: int = 30  # Seconds to wait for a pooled connection
+    # Global connection budget shared by every worker process; when set, per-worker
+    # pool sizes are derived from it instead of DATABASE_POOL_SIZE(_OVERFLOW)
+    DATABASE_CONNECTION_BUDGET: int | None = None
+    DATABASE_POOL_PREWARM: int = 0  # Connections opened per worker at startup
+    DATABASE_CREATE_TABLES: bool = True  # Run create_all on startup; disable once schema is managed elsewhere
+    # Transaction-mode pooler (e.g. PgBouncer) compatibility: disables the asyncpg
+    # prepared statement caches and lets the pooler own connection pooling
+    DATABASE_PGBOUNCER_MODE: bool = False
+    DATABASE_PGBOUNCER_POOL_SIZE: int = 0  # 0 uses NullPool, otherwise a small local pool
+
+    # Server
+    WEB_CONCURRENCY: int = 1  # Number of worker processes sharing the connection budget
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8080
+    SERVER_BACKLOG: int = 2048  # Pending connections queued by the kernel per listening socket
+    SERVER_KEEP_ALIVE_SECONDS: int = 75  # Longer than typical load balancer idle timeouts (60s)
+    SERVER_MAX_REQUESTS: int | None = 50_000  # Recycle a worker after this many requests (WEB_CONCURRENCY > 1)
+    SERVER_MAX_REQUESTS_JITTER: int = 5_000  # Up to this many more per worker, so workers recycle at different times
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30  # In-flight request drain time on SIGTERM
+    SERVER_ACCESS_LOG: bool = False  # Usually recorded by the load balancer instead
 
     # Redis
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
+    REDIS_POOL_PREWARM: int = 4  # Connections opened per worker at startup
+
+    # Response cache
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: int = 300  # Upper bound on staleness if an invalidation is missed
+
+    # Public catalog Cache-Control
+    CATALOG_CACHE_MAX_AGE_SECONDS: int = 60  # Browsers
+    CATALOG_CACHE_S_MAXAGE_SECONDS: int = 300  # Shared caches (reverse proxy, CDN)
+    CATALOG_CACHE_STALE_WHILE_REVALIDATE_SECONDS: int = 600
+
+    # Catalog delta sync: the returned cursor lags the clock by this much so that rows
+    # stamped before a slow commit became visible are not skipped
+    CATALOG_CHANGES_SETTLE_SECONDS: int = 5
+
+    # Per-worker in-memory catalog snapshot
+    CATALOG_SNAPSHOT_ENABLED: bool = True
+    CATALOG_SNAPSHOT_REFRESH_SECONDS: float = 5
+    CATALOG_SNAPSHOT_MAX_STALENESS_SECONDS: float = 30  # Older snapshots fall back to the database
+
+    # Server-sent event streams
+    SSE_HEARTBEAT_SECONDS: int = 15  # Keeps idle streams open through proxies
+    SSE_QUEUE_SIZE: int = 100  # Events buffered per client before it is disconnected
+    SSE_RETRY_MILLISECONDS: int = 3000  # Client reconnect delay
+
+    # Read-through cache for single-entity lookups
+    READ_CACHE_ENABLED: bool = True
+    READ_CACHE_LOCAL_TTL_SECONDS: float = 5.0  # Bounds staleness of other workers' in-process copies
+    READ_CACHE_LOCAL_MAX_ENTRIES: int = 10_000
+    READ_CACHE_TTL_SECONDS: int = 60
+    READ_CACHE_STALE_SECONDS: int = 30  # Served while a background refresh runs
+    READ_CACHE_LOCK_MILLISECONDS: int = 2000
+
+    # Idempotency-Key support on POST endpoints
+    IDEMPOTENCY_TTL_SECONDS: int = 60 * 60 * 24  # How long a retry replays the stored response
+    IDEMPOTENCY_LOCK_SECONDS: int = 60  # Claim expiry, should a worker die mid-request
+    IDEMPOTENCY_WAIT_SECONDS: float = 10  # Duplicates wait this long for the first request
+
+    # Group commit for order inserts: orders submitted within the window share one
+    # multi-row INSERT and commit, trading a few milliseconds of latency for WAL flushes
+    ORDER_GROUP_COMMIT_ENABLED: bool = False
+    ORDER_GROUP_COMMIT_WINDOW_MILLISECONDS: float = 2
+    ORDER_GROUP_COMMIT_MAX_BATCH: int = 500  # Written immediately once this many are waiting
+
+    # Expiry of abandoned pending orders: one replica at a time cancels them in batches
+    ORDER_EXPIRY_ENABLED: bool = True
+    ORDER_PENDING_EXPIRY_MINUTES: int = 24 * 60  # Pending orders older than this are cancelled
+    ORDER_EXPIRY_INTERVAL_SECONDS: float = 60
+    ORDER_EXPIRY_BATCH_SIZE: int = 500  # Orders cancelled per transaction
+
+    # Transactional outbox: side effects of orders, run by `python -m src.worker`
+    OUTBOX_RELAY_ENABLED: bool = False  # Also drain the outbox in every API worker
+    OUTBOX_POLL_SECONDS: float = 1  # Idle wait between batches
+    OUTBOX_BATCH_SIZE: int = 100  # Messages locked and delivered per transaction
+    OUTBOX_CONCURRENCY: int = 8  # Messages of a batch delivered at once
+    OUTBOX_HANDLER_TIMEOUT_SECONDS: float = 10
+    OUTBOX_MAX_ATTEMPTS: int = 10  # Then the message is kept as dead
+    OUTBOX_RETRY_BASE_SECONDS: float = 1  # Doubled after every failed attempt
+    OUTBOX_RETRY_MAX_SECONDS: float = 15 * 60
+
+    # Stock reservations
+    INVENTORY_HOLD_SECONDS: int = 600  # Unclaimed holds give their units back after this
+    INVENTORY_SWEEP_SECONDS: float = 1
+    INVENTORY_RECONCILE_SECONDS: float = 10  # Sales are applied to books.stock in batches this often
+
+    # Checkout waiting room, for flash sales
+    WAITING_ROOM_ENABLED: bool = False
+    WAITING_ROOM_ADMIT_PER_SECOND: float = 50  # Customers let through to checkout
+    WAITING_ROOM_ADMIT_INTERVAL_SECONDS: float = 1
+    WAITING_ROOM_TICKET_SECONDS: int = 60  # Waiting tickets not polled for this long are dropped
+    WAITING_ROOM_PASS_SECONDS: int = 300  # How long an admitted ticket allows checkout
+
+    # Startup
+    STARTUP_WARMUP: bool = True  # Prime pools and statement caches before reporting ready
+
+    # Health
+    HEALTH_PROBE_CACHE_SECONDS: float = 2.0  # Reuse dependency probe results for this long
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 1.0
 
     # Session
     SESSION_EXPIRE_MINUTES: int = 30
@@ -43,6 +142,33 @@ class Settings(BaseSettings):
     # CORS
     CORS_ALLOW_ORIGINS: List[str] = ["http://localhost:3000"]
 
+    @model_validator(mode="after")
+    def _check_connection_budget(self) -> "Settings":
+        if self.DATABASE_CONNECTION_BUDGET is not None and self.DATABASE_CONNECTION_BUDGET < self.WEB_CONCURRENCY:
+            raise ValueError(
+                f"DATABASE_CONNECTION_BUDGET ({self.DATABASE_CONNECTION_BUDGET}) must allow at least one "
+                f"connection per worker (WEB_CONCURRENCY={self.WEB_CONCURRENCY})"
+            )
+        return self
+
+    def _worker_connection_share(self) -> int:
+        return self.DATABASE_CONNECTION_BUDGET // max(1, self.WEB_CONCURRENCY)
+
+    @computed_field
+    @property
+    def DATABASE_WORKER_POOL_SIZE(self) -> int:
+        """Persistent connections per worker, half of its share of the budget."""
+        if self.DATABASE_CONNECTION_BUDGET is None:
+            return self.DATABASE_POOL_SIZE
+        return max(1, self._worker_connection_share() // 2)
+
+    @computed_field
+    @property
+    def DATABASE_WORKER_POOL_OVERFLOW(self) -> int:
+        """Burst connections per worker, the rest of its share of the budget."""
+        if self.DATABASE_CONNECTION_BUDGET is None:
+            return self.DATABASE_POOL_SIZE_OVERFLOW
+        return self._worker_connection_share() - self.DATABASE_WORKER_POOL_SIZE
 
     @computed_field
     @property
@@ -7,6 +7,18 @@ from fastapi import FastAPI
 from sqlmodel import SQLModel
 
 from src.db.operations import async_engine
+from src.db.outbox import outbox_relay
+from src.routes.v1.books.service import catalog_snapshot
+from src.routes.v1.inventory.reservations import stock_reservations
+from src.routes.v1.inventory.service import reconcile_stock
+from src.routes.v1.orders.expiry import order_expiry
+from src.routes.v1.orders.service import order_batcher
+from src.settings import settings
+from src.utils.change_feed import change_feed
+from src.utils.invalidation_bus import invalidation_bus
+from src.utils.redis import redis_bytes_client, redis_client
+from src.utils.waiting_room import checkout_waiting_room
+from src.utils.warmup import warm_up
 
 logger = logging.getLogger(__name__)
 
@@ -14,19 +26,91 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def database():
     """Initialize database tables on startup."""
-    logger.info("Creating database tables...")
-    async with async_engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
-    logger.info("Database tables created successfully")
+    if settings.DATABASE_CREATE_TABLES:
+        logger.info("Creating database tables...")
+        async with async_engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        logger.info("Database tables created successfully")
+    logger.info(
+        "Database pool sized at %s (+%s overflow) per worker",
+        settings.DATABASE_WORKER_POOL_SIZE,
+        settings.DATABASE_WORKER_POOL_OVERFLOW,
+    )
     yield
     logger.info("Closing database connections...")
     await async_engine.dispose()
 
 
+@asynccontextmanager
+async def redis():
+    """Subscribe to cache invalidations, and release pooled Redis connections on shutdown."""
+    invalidation_bus.start()
+    yield
+    logger.info("Closing Redis connections...")
+    await invalidation_bus.close()
+    await change_feed.close()
+    await redis_client.connection_pool.disconnect()
+    await redis_bytes_client.connection_pool.disconnect()
+
+
+@asynccontextmanager
+async def catalog():
+    """Load the per-worker catalog snapshot and keep it refreshed."""
+    if settings.CATALOG_SNAPSHOT_ENABLED:
+        try:
+            await catalog_snapshot.refresh()
+        except Exception as exc:
+            logger.warning(f"Catalog snapshot load failed, reads use the database until it loads: {exc!r}")
+        catalog_snapshot.start()
+    yield
+    await catalog_snapshot.close()
+
+
+@asynccontextmanager
+async def orders():
+    """Expire stale pending orders, and write any order batch still collecting before the database closes."""
+    if settings.ORDER_EXPIRY_ENABLED:
+        order_expiry.start()
+    yield
+    await order_expiry.close()
+    await order_batcher.close()
+
+
+@asynccontextmanager
+async def outbox():
+    """Deliver outbox messages from this worker too, when no separate worker process runs."""
+    if settings.OUTBOX_RELAY_ENABLED:
+        outbox_relay.start()
+    yield
+    await outbox_relay.close()
+
+
+@asynccontextmanager
+async def inventory():
+    """Release expired stock holds and apply sales to stock in the background."""
+    stock_reservations.start(reconcile=reconcile_stock)
+    yield
+    await stock_reservations.close()
+
+
+@asynccontextmanager
+async def waiting_room():
+    """Admit queued customers to checkout at the configured rate."""
+    if settings.WAITING_ROOM_ENABLED:
+        checkout_waiting_room.start()
+    yield
+    await checkout_waiting_room.close()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifespan with startup and shutdown events."""
     logger.info("Starting application...")
-    async with database():
+    app.state.ready = False
+    async with database(), redis(), catalog(), orders(), outbox(), inventory(), waiting_room():
+        if settings.STARTUP_WARMUP:
+            await warm_up()
+        app.state.ready = True
         yield
+        app.state.ready = False
     logger.info("Application shutdown complete")
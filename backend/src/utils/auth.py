@@ -39,10 +39,12 @@ def create_refresh_token(user_id: UUID, role: str) -> tuple[str, str]:
     return encoded_jwt, jti
 
 
-async def authenticate_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db_session: AsyncSession = Depends(get_db_session),
-):
+async def authenticate_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)) -> UUID:
+    """Return the user id of a valid access token, without loading the user from the database.
+
+    For endpoints that must stay off Postgres under load; the user may have been
+    deactivated since the token was issued.
+    """
     token = credentials.credentials
 
     # Check if token is blacklisted
@@ -61,8 +63,17 @@ async def authenticate_user(
     except jwt.JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+    return UUID(user_id)
+
+
+async def authenticate_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db_session: AsyncSession = Depends(get_db_session),
+):
+    user_id = await authenticate_user_id(credentials)
+
     user_service = UserService(db_session=db_session)
-    user = await user_service.retrieve(user_id=UUID(user_id))
+    user = await user_service.retrieve(user_id=user_id)
 
     if not user.is_active:
         raise HTTPException(status_code=401, detail="User is inactive")
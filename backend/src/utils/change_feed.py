@@ -0,0 +1,133 @@
+"""Change events for server-sent event streams.
+
+Services publish catalog and order events to Redis pub/sub after committing. Each worker
+runs a single listener that subscribes to those channels and fans events out to the
+in-memory queues of its connected clients, so an idle client costs one coroutine and a
+small queue rather than a Redis or database connection.
+
+Catalog events go to every subscriber of the ``catalog`` topic; order events go only to
+the ``orders:<user_id>`` topic of the owning user. Clients whose queue fills up are
+disconnected and expected to reconnect and refetch. After the listener reconnects to
+Redis, every client receives a ``resync`` event, since events may have been missed.
+"""
+
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Set
+from uuid import UUID
+
+from redis.exceptions import RedisError
+from src.settings import settings
+from src.utils.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+CATALOG_CHANNEL = "events:catalog"
+ORDERS_CHANNEL = "events:orders"
+RECONNECT_DELAY_SECONDS = 1.0
+
+
+class Subscriber:
+    __slots__ = ("queue", "overflowed")
+
+    def __init__(self) -> None:
+        self.queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=settings.SSE_QUEUE_SIZE)
+        self.overflowed = False
+
+    def deliver(self, event: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class ChangeFeed:
+    """Per-worker fan-out of Redis pub/sub events to connected clients."""
+
+    def __init__(self) -> None:
+        self._topics: Dict[str, Set[Subscriber]] = {}
+        self._listener: asyncio.Task | None = None
+
+    @asynccontextmanager
+    async def subscribe(self, *topics: str) -> AsyncIterator[Subscriber]:
+        subscriber = Subscriber()
+        for topic in topics:
+            self._topics.setdefault(topic, set()).add(subscriber)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        try:
+            yield subscriber
+        finally:
+            for topic in topics:
+                subscribers = self._topics.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        del self._topics[topic]
+
+    def dispatch(self, topic: str, event: Dict[str, Any]) -> None:
+        for subscriber in self._topics.get(topic, ()):
+            subscriber.deliver(event)
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self) -> None:
+        connected_before = False
+        while True:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(CATALOG_CHANNEL, ORDERS_CHANNEL)
+                if connected_before:
+                    for subscribers in list(self._topics.values()):
+                        for subscriber in subscribers:
+                            subscriber.deliver({"event": "resync", "data": {}})
+                connected_before = True
+                async for message in pubsub.listen():
+                    self._on_message(message)
+            except (RedisError, OSError) as exc:
+                logger.warning(f"Change feed lost its Redis subscription, reconnecting: {exc!r}")
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+            finally:
+                await pubsub.aclose()
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        if message.get("type") != "message":
+            return
+        try:
+            event = json.loads(message["data"])
+            topic = "catalog" if message["channel"] == CATALOG_CHANNEL else f"orders:{event['data']['user_id']}"
+        except (KeyError, TypeError, ValueError):
+            # Raising would end the listener, and with it every subscriber's stream
+            logger.warning(f"Ignoring malformed change event on {message.get('channel')}")
+            return
+        self.dispatch(topic, event)
+
+
+change_feed = ChangeFeed()
+
+
+async def _publish(channel: str, event: str, data: Dict[str, Any]) -> None:
+    payload = json.dumps({"event": event, "data": data}, default=str)
+    try:
+        await redis_client.publish(channel, payload)
+    except RedisError as exc:
+        logger.warning(f"Failed to publish {event} change event: {exc!r}")
+
+
+async def publish_catalog_event(event: str, **data: Any) -> None:
+    """Announce a committed catalog change, e.g. ``book.updated``, to every client."""
+    await _publish(CATALOG_CHANNEL, event, data)
+
+
+async def publish_order_event(event: str, user_id: UUID, **data: Any) -> None:
+    """Announce a committed order change to the user who owns the order."""
+    await _publish(ORDERS_CHANNEL, event, {"user_id": user_id, **data})
@@ -0,0 +1,88 @@
+"""Conditional request support: ETag / Last-Modified validators, 304 and 412 responses.
+
+Validators are derived from cheap aggregates (row counts and ``updated_at`` values) so
+that a request can be answered with 304 before any response body is built.
+
+Writes use the same ETags with If-Match: a PATCH whose If-Match no longer matches the
+resource fails with 412. Updates are also conditional on the row's ``version`` column, so
+a write that races another one between read and update fails with 409 instead of
+overwriting it; neither takes a lock.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, NamedTuple
+
+from fastapi import HTTPException, Request, Response
+
+# Responses carrying validators may be stored by the browser but must be revalidated
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+class PreconditionFailed(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code=412, detail="The resource has changed since it was fetched (If-Match)")
+
+
+class UpdateConflict(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code=409, detail="The resource was modified concurrently; fetch it and try again")
+
+
+class Validators(NamedTuple):
+    etag: str
+    last_modified: datetime | None
+
+
+def make_validators(*parts: Any, last_modified: datetime | None = None) -> Validators:
+    """Build a strong ETag from ``parts`` and a Last-Modified from the newest ``updated_at``."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    if last_modified is not None and last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)  # Columns hold naive UTC
+    return Validators(etag=f'"{digest}"', last_modified=last_modified)
+
+
+def validator_headers(validators: Validators, cache_control: str = PRIVATE_CACHE_CONTROL) -> dict:
+    headers = {"ETag": validators.etag, "Cache-Control": cache_control}
+    if validators.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(validators.last_modified, usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, validators: Validators) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no If-None-Match is sent."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # If-None-Match uses the weak comparison function
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return validators.etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or validators.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return validators.last_modified.replace(microsecond=0) <= since
+
+
+def matches_if_match(if_match: str, validators: Validators) -> bool:
+    """Evaluate an If-Match header value against the current validators."""
+    if if_match.strip() == "*":
+        return True
+    # If-Match uses the strong comparison function, so weak tags never match
+    return validators.etag in {tag.strip() for tag in if_match.split(",")}
+
+
+def not_modified_response(validators: Validators, cache_control: str = PRIVATE_CACHE_CONTROL) -> Response:
+    return Response(status_code=304, headers=validator_headers(validators, cache_control))
+
+
+def apply_validators(response: Response, validators: Validators, cache_control: str = PRIVATE_CACHE_CONTROL) -> None:
+    response.headers.update(validator_headers(validators, cache_control))
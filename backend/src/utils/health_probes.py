@@ -0,0 +1,63 @@
+"""Dependency probes for the readiness endpoint.
+
+Probe results are cached for HEALTH_PROBE_CACHE_SECONDS and concurrent callers share a
+single in-flight probe, so load balancer polling adds at most one database checkout and
+one Redis ping per interval per worker.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from sqlalchemy import text
+from src.db.operations import async_engine
+from src.settings import settings
+from src.utils.redis import redis_client
+
+_cached: Dict[str, Any] | None = None
+_cached_at: float = 0.0
+_inflight: asyncio.Task | None = None
+
+
+async def probe_database() -> None:
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def probe_redis() -> None:
+    await redis_client.ping()
+
+
+async def _timed(probe: Callable[[], Awaitable[None]]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(probe(), timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+    except Exception as exc:
+        return {"status": "error", "latency_ms": _elapsed_ms(start), "error": type(exc).__name__}
+    return {"status": "ok", "latency_ms": _elapsed_ms(start)}
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+async def _probe_dependencies() -> Dict[str, Any]:
+    global _cached, _cached_at
+    database, redis = await asyncio.gather(_timed(probe_database), _timed(probe_redis))
+    _cached, _cached_at = {"database": database, "redis": redis}, time.monotonic()
+    return _cached
+
+
+async def dependency_checks() -> Dict[str, Any]:
+    """Return the cached dependency checks, probing again once they are stale."""
+    global _inflight
+    if _cached is not None and time.monotonic() - _cached_at < settings.HEALTH_PROBE_CACHE_SECONDS:
+        return _cached
+    if _inflight is None or _inflight.done():
+        _inflight = asyncio.create_task(_probe_dependencies())
+    return await asyncio.shield(_inflight)
+
+
+def reset_probe_cache() -> None:
+    global _cached, _cached_at, _inflight
+    _cached, _cached_at, _inflight = None, 0.0, None
@@ -0,0 +1,164 @@
+"""Idempotency-Key support for POST endpoints.
+
+A client that retries a request with the same ``Idempotency-Key`` header gets the
+response of the first attempt instead of creating the resource again. Keys are scoped to
+the authenticated user and the route, and stored in Redis with a TTL.
+
+The first request to use a key claims it with ``SET NX``, runs, and stores its serialized
+response under the key. A duplicate that arrives while the first is still running waits
+for that response (polling, like the read-through cache lock) instead of re-executing.
+Only successful responses are stored: if the first request fails, the key is released and
+the next retry runs again. Reusing a key with a different request body is rejected.
+
+Usage in a router:
+
+    @router.post("", response_model=OrderOutput, status_code=201)
+    async def create_order(
+        idempotency: IdempotentRequest = Depends(idempotent("orders:create", authenticate_user)), ...
+    ):
+        if idempotency.replay:
+            return idempotency.replay
+        ...
+        return await idempotency.respond(output, status_code=201)
+
+Redis errors are logged and the request runs without idempotency protection.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, AsyncGenerator, Callable
+from uuid import uuid4
+
+from fastapi import Depends, Header, HTTPException, Request, Response
+from redis.exceptions import RedisError, WatchError
+from src.db.models import DBUser
+from src.settings import settings
+from src.utils.redis import redis_client
+from src.utils.serialization import dump_json
+
+logger = logging.getLogger(__name__)
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+KEY_PREFIX = "idempotency"
+MAX_KEY_LENGTH = 255
+POLL_SECONDS = 0.05
+
+
+class IdempotencyKeyReused(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code=422, detail=f"{HEADER} was already used for a different request")
+
+
+class IdempotentRequestInProgress(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code=409, detail=f"A request with this {HEADER} is still in progress")
+
+
+class IdempotentRequest:
+    """Idempotency state of one request, and the means to record its response."""
+
+    def __init__(self, redis_key: str | None = None, fingerprint: str | None = None) -> None:
+        self.redis_key = redis_key
+        self.fingerprint = fingerprint
+        self.token = uuid4().hex
+        self.claimed = False
+        self.completed = False
+        self.replay: Response | None = None
+
+    async def claim(self) -> None:
+        """Claim the key, or wait for the request that holds it and take its response."""
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        pending = json.dumps({"state": "pending", "fingerprint": self.fingerprint, "token": self.token})
+        while True:
+            if await redis_client.set(self.redis_key, pending, nx=True, ex=settings.IDEMPOTENCY_LOCK_SECONDS):
+                self.claimed = True
+                return
+            raw = await redis_client.get(self.redis_key)
+            if raw is None:
+                continue  # Released by a failed request; try to claim it again
+            record = json.loads(raw)
+            if record["fingerprint"] != self.fingerprint:
+                raise IdempotencyKeyReused
+            if record["state"] == "completed":
+                self.replay = Response(
+                    content=record["body"],
+                    status_code=record["status_code"],
+                    media_type="application/json",
+                    headers={REPLAYED_HEADER: "true"},
+                )
+                return
+            if time.monotonic() >= deadline:
+                raise IdempotentRequestInProgress
+            await asyncio.sleep(POLL_SECONDS)
+
+    async def respond(self, content: Any, status_code: int = 200) -> Response:
+        """Serialize ``content``, record it as the response for this key, and return it."""
+        body = dump_json(content)
+        if self.claimed:
+            record = {
+                "state": "completed",
+                "fingerprint": self.fingerprint,
+                "status_code": status_code,
+                "body": body.decode(),
+            }
+            try:
+                await redis_client.set(self.redis_key, json.dumps(record), ex=settings.IDEMPOTENCY_TTL_SECONDS)
+                self.completed = True
+            except RedisError as exc:
+                logger.warning(f"Failed to store idempotent response for {self.redis_key}: {exc!r}")
+        return Response(content=body, status_code=status_code, media_type="application/json")
+
+    async def release(self) -> None:
+        """Release an unanswered claim, if this request still holds it, so that a retry runs again."""
+        if not self.claimed or self.completed:
+            return
+        try:
+            async with redis_client.pipeline() as pipe:
+                await pipe.watch(self.redis_key)
+                raw = await pipe.get(self.redis_key)
+                if raw is not None and json.loads(raw).get("token") == self.token:
+                    pipe.multi()
+                    pipe.delete(self.redis_key)
+                    await pipe.execute()
+        except (RedisError, WatchError) as exc:
+            logger.warning(f"Failed to release idempotency key {self.redis_key}: {exc!r}")
+
+
+def idempotent(scope: str, authenticate: Callable[..., Any]):
+    """Build a dependency that honours the Idempotency-Key header for ``scope``.
+
+    ``authenticate`` is the route's authentication dependency; keys are scoped to its user.
+    """
+
+    async def dependency(
+        request: Request,
+        key: str | None = Header(
+            default=None,
+            alias=HEADER,
+            min_length=1,
+            max_length=MAX_KEY_LENGTH,
+            description="Client-generated key; retries with the same key return the first response",
+        ),
+        current_user: DBUser = Depends(authenticate),
+    ) -> AsyncGenerator[IdempotentRequest, None]:
+        if key is None:
+            yield IdempotentRequest()
+            return
+
+        body = await request.body()
+        fingerprint = hashlib.sha256(f"{request.method} {request.url.path}\n".encode() + body).hexdigest()
+        idempotency = IdempotentRequest(f"{KEY_PREFIX}:{scope}:{current_user.id}:{key}", fingerprint)
+        try:
+            await idempotency.claim()
+        except RedisError as exc:
+            logger.warning(f"Idempotency lookup failed for {idempotency.redis_key}: {exc!r}")
+        try:
+            yield idempotency
+        finally:
+            await idempotency.release()
+
+    return dependency
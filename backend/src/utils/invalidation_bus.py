@@ -0,0 +1,156 @@
+"""Cross-worker invalidation of in-process caches.
+
+In-process caches register under a namespace. After committing a write, services publish
+an invalidation for the affected keys: the publishing worker evicts them immediately and
+every other worker evicts them when the message arrives over Redis pub/sub.
+
+Each message carries a sequence number taken from a Redis counter after the write
+committed. Publishers take the number and publish in two round trips, so concurrent
+publishers routinely deliver numbers slightly out of order. Evictions commute, so each
+message is applied as it arrives; only a gap that stays open for REORDER_WINDOW_SECONDS,
+or a counter that moved while the worker was reconnecting, means a message was lost. The
+worker cannot tell what it missed and clears every registered cache instead.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, NamedTuple, Protocol, Set, Tuple
+
+from redis.exceptions import RedisError
+from src.utils.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "invalidation"
+SEQUENCE_KEY = "invalidation:sequence"
+RECONNECT_DELAY_SECONDS = 1.0
+# How long a missing sequence number may be overtaken before it counts as lost
+REORDER_WINDOW_SECONDS = 1.0
+REORDER_MAX_PENDING = 1000
+
+
+class LocalCache(Protocol):
+    def evict_local(self, *keys: str) -> None: ...
+
+    def clear_local(self) -> None: ...
+
+
+class Invalidation(NamedTuple):
+    namespace: str
+    keys: Tuple[str, ...]
+
+
+class InvalidationBus:
+    def __init__(self) -> None:
+        self._caches: Dict[str, LocalCache] = {}
+        self._listener: asyncio.Task | None = None
+        # Every sequence number up to this one has arrived
+        self.last_sequence: int | None = None
+        self._ahead: Set[int] = set()  # Arrived past a gap
+        self._gap_timer: asyncio.TimerHandle | None = None
+
+    def register(self, namespace: str, cache: LocalCache) -> None:
+        self._caches[namespace] = cache
+
+    def start(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self.last_sequence = None
+        self._reset_gap()
+
+    async def publish(self, invalidation: Invalidation) -> None:
+        """Evict ``invalidation`` on this worker and announce it to the others."""
+        self._evict(invalidation)
+        try:
+            sequence = await redis_client.incr(SEQUENCE_KEY)
+            payload = {"sequence": sequence, "namespace": invalidation.namespace, "keys": invalidation.keys}
+            await redis_client.publish(CHANNEL, json.dumps(payload))
+        except RedisError as exc:
+            # Other workers keep their entries until the local TTL expires, or flush on
+            # the sequence gap if only the publish failed
+            logger.warning(f"Failed to publish invalidation {invalidation}: {exc!r}")
+
+    def flush(self, reason: str) -> None:
+        logger.warning(f"Clearing in-process caches: {reason}")
+        for cache in self._caches.values():
+            cache.clear_local()
+
+    def _evict(self, invalidation: Invalidation) -> None:
+        cache = self._caches.get(invalidation.namespace)
+        if cache is not None:
+            cache.evict_local(*invalidation.keys)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(CHANNEL)
+                # Read the counter only once subscribed, so nothing falls between the two
+                current = int(await redis_client.get(SEQUENCE_KEY) or 0)
+                if self.last_sequence is not None and current != self.last_sequence:
+                    self.flush(f"invalidations {self.last_sequence + 1}..{current} missed while reconnecting")
+                self.last_sequence = current
+                self._reset_gap()
+                async for message in pubsub.listen():
+                    self._on_message(message)
+            except (RedisError, OSError) as exc:
+                logger.warning(f"Invalidation bus lost its Redis subscription, reconnecting: {exc!r}")
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+            finally:
+                await pubsub.aclose()
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        if message.get("type") != "message":
+            return
+        try:
+            payload = json.loads(message["data"])
+            sequence = int(payload["sequence"])
+            invalidation = Invalidation(payload["namespace"], tuple(payload["keys"]))
+        except (TypeError, ValueError, KeyError):
+            self.flush("malformed invalidation message")
+            return
+
+        self._evict(invalidation)
+        if self.last_sequence is None:
+            self.last_sequence = sequence
+        elif sequence > self.last_sequence:
+            self._ahead.add(sequence)
+            while self.last_sequence + 1 in self._ahead:
+                self.last_sequence += 1
+                self._ahead.remove(self.last_sequence)
+            if not self._ahead:
+                self._reset_gap()
+            elif len(self._ahead) > REORDER_MAX_PENDING:
+                self._gap_expired()
+            elif self._gap_timer is None:
+                self._gap_timer = asyncio.get_running_loop().call_later(REORDER_WINDOW_SECONDS, self._gap_expired)
+
+    def _gap_expired(self) -> None:
+        self.flush(f"invalidations after {self.last_sequence} missed")
+        self.last_sequence = max(self._ahead)
+        self._reset_gap()
+
+    def _reset_gap(self) -> None:
+        self._ahead.clear()
+        if self._gap_timer is not None:
+            self._gap_timer.cancel()
+            self._gap_timer = None
+
+
+invalidation_bus = InvalidationBus()
+
+
+async def publish_invalidation(namespace: str, *keys: Any) -> None:
+    """Evict ``keys`` of the in-process cache registered under ``namespace`` on every worker."""
+    if keys:
+        await invalidation_bus.publish(Invalidation(namespace, tuple(str(key) for key in keys)))
@@ -0,0 +1,256 @@
+"""Two-tier read-through cache for single-entity lookups.
+
+A per-worker LRU with a short TTL sits in front of Redis. Concurrent misses for one key
+are coalesced (singleflight) so that a worker runs at most one load per key at a time,
+and a short Redis lock extends that to one load per key across the cluster: workers that
+lose the lock wait for the winner's value to appear in Redis. Entries past their fresh
+TTL but within the stale window are served while a background refresh reloads them.
+
+Invalidations bump a per-key generation, read before each load; a value loaded across an
+invalidation is returned to its callers but not cached, in Redis or in the worker, since
+it may predate the write.
+
+Values are the dicts returned by services, validated through a pydantic ``model`` on
+their way to and from Redis. Invalidations evict the per-worker tier of every worker
+through the invalidation bus.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Type
+from uuid import uuid4
+
+from pydantic import BaseModel, ValidationError
+from redis.exceptions import RedisError, WatchError
+from src.settings import settings
+from src.utils.invalidation_bus import invalidation_bus, publish_invalidation
+from src.utils.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "read_cache"
+LOCK_POLL_SECONDS = 0.02
+# Far longer than any load, so a generation cannot expire and restart while one is in flight
+GENERATION_RETENTION_SECONDS = 24 * 60 * 60
+
+Loader = Callable[[], Awaitable[Dict[str, Any]]]
+
+_caches: Dict[str, "ReadThroughCache"] = {}
+
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until", "local_until", "current")
+
+    def __init__(
+        self, value: Dict[str, Any], fresh_until: float, stale_until: float, local_until: float, current: bool = True
+    ) -> None:
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.local_until = local_until
+        self.current = current  # False if invalidated while it was loaded
+
+
+class ReadThroughCache:
+    def __init__(self, namespace: str, model: Type[BaseModel]) -> None:
+        self.namespace = namespace
+        self.model = model
+        self._local: OrderedDict[str, _Entry] = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        _caches[namespace] = self
+        invalidation_bus.register(namespace, self)
+
+    def redis_key(self, key: str) -> str:
+        return f"{KEY_PREFIX}:{self.namespace}:{key}"
+
+    def generation_key(self, key: str) -> str:
+        return f"{self.redis_key(key)}:generation"
+
+    async def get(self, key: str, load: Loader, refresh: Loader | None = None) -> Dict[str, Any]:
+        """Return the cached value for ``key``.
+
+        Misses and background revalidations are loaded with ``refresh``, by a task that
+        other requests wait on and that may outlive the calling request; it must therefore
+        not depend on the request's session. ``load`` may, and is only called when the
+        cache is disabled. Without ``refresh``, ``load`` is used for both.
+        """
+        if not settings.READ_CACHE_ENABLED:
+            return await load()
+
+        now = time.time()
+        entry = self._local.get(key)
+        if entry is not None and now < entry.local_until:
+            self._local.move_to_end(key)
+            if now >= entry.fresh_until:
+                self._revalidate(key, refresh or load)
+            return entry.value
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fill(key, refresh or load))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def invalidate(self, *keys: str) -> None:
+        """Evict ``keys`` from Redis and from every worker."""
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                for key in keys:
+                    # Loads in flight are not cached
+                    pipe.incr(self.generation_key(key))
+                    pipe.expire(self.generation_key(key), GENERATION_RETENTION_SECONDS)
+                pipe.delete(*(self.redis_key(key) for key in keys))
+                await pipe.execute()
+        except RedisError as exc:
+            logger.warning(f"Read cache invalidation failed for {self.namespace} {keys}: {exc!r}")
+        await publish_invalidation(self.namespace, *keys)
+
+    def evict_local(self, *keys: str) -> None:
+        for key in keys:
+            self._local.pop(key, None)
+
+    def clear_local(self) -> None:
+        self._local.clear()
+
+    async def _fill(self, key: str, refresh: Loader) -> Dict[str, Any]:
+        try:
+            entry = await self._redis_get(key)
+        except RedisError as exc:
+            logger.warning(f"Read cache lookup failed for {self.namespace}:{key}: {exc!r}")
+            return await refresh()
+
+        if entry is None:
+            entry = await self._load_once_per_cluster(key, refresh)
+        elif time.time() >= entry.fresh_until:
+            self._revalidate(key, refresh)
+        if entry.current:
+            self._store_local(key, entry)
+        return entry.value
+
+    async def _load_once_per_cluster(self, key: str, load: Loader) -> _Entry:
+        lock_key = f"{self.redis_key(key)}:lock"
+        token = uuid4().hex
+        lock_seconds = settings.READ_CACHE_LOCK_MILLISECONDS / 1000
+        try:
+            acquired = await redis_client.set(lock_key, token, nx=True, px=settings.READ_CACHE_LOCK_MILLISECONDS)
+            if not acquired:
+                # Another worker is loading this key; wait for its value rather than
+                # querying the database as well
+                deadline = time.monotonic() + lock_seconds
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(LOCK_POLL_SECONDS)
+                    entry = await self._redis_get(key)
+                    if entry is not None:
+                        return entry
+        except RedisError as exc:
+            logger.warning(f"Read cache lock failed for {self.namespace}:{key}: {exc!r}")
+            acquired = False
+
+        try:
+            generation = await self._generation(key)
+            value = await load()
+            return await self._redis_set(key, value, generation)
+        finally:
+            if acquired:
+                await self._release_lock(lock_key, token)
+
+    def _revalidate(self, key: str, refresh: Loader) -> None:
+        if key in self._refreshing:
+            return
+
+        async def revalidate() -> None:
+            lock_key = f"{self.redis_key(key)}:refresh"
+            token = uuid4().hex
+            try:
+                # Only one worker in the cluster refreshes a stale key
+                if not await redis_client.set(lock_key, token, nx=True, px=settings.READ_CACHE_LOCK_MILLISECONDS):
+                    return
+                try:
+                    generation = await self._generation(key)
+                    entry = await self._redis_set(key, await refresh(), generation)
+                    if entry.current:
+                        self._store_local(key, entry)
+                finally:
+                    await self._release_lock(lock_key, token)
+            except Exception as exc:
+                logger.warning(f"Read cache refresh failed for {self.namespace}:{key}: {exc!r}")
+
+        task = asyncio.create_task(revalidate())
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    def _store_local(self, key: str, entry: _Entry) -> None:
+        entry.local_until = min(time.time() + settings.READ_CACHE_LOCAL_TTL_SECONDS, entry.stale_until)
+        self._local[key] = entry
+        self._local.move_to_end(key)
+        while len(self._local) > settings.READ_CACHE_LOCAL_MAX_ENTRIES:
+            self._local.popitem(last=False)
+
+    async def _redis_get(self, key: str) -> _Entry | None:
+        raw = await redis_client.get(self.redis_key(key))
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        try:
+            value = self.model.model_validate(data["value"]).model_dump()
+        except ValidationError:
+            return None  # Written under an older schema; reload
+        fresh_until = data["fresh_until"]
+        return _Entry(value, fresh_until, fresh_until + settings.READ_CACHE_STALE_SECONDS, 0.0)
+
+    async def _generation(self, key: str) -> str | None:
+        try:
+            return await redis_client.get(self.generation_key(key)) or "0"
+        except RedisError as exc:
+            logger.warning(f"Read cache generation lookup failed for {self.namespace}:{key}: {exc!r}")
+            return None
+
+    async def _redis_set(self, key: str, value: Dict[str, Any], generation: str | None) -> _Entry:
+        """Cache ``value`` unless ``key`` was invalidated since ``generation`` was read."""
+        fresh_until = time.time() + settings.READ_CACHE_TTL_SECONDS
+        entry = _Entry(value, fresh_until, fresh_until + settings.READ_CACHE_STALE_SECONDS, 0.0, current=False)
+        if generation is None:
+            return entry
+        payload = json.dumps({"fresh_until": fresh_until, "value": self.model.model_validate(value).model_dump(mode="json")})
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                await pipe.watch(self.generation_key(key))
+                if (await pipe.get(self.generation_key(key)) or "0") != generation:
+                    await pipe.unwatch()
+                    return entry
+                pipe.multi()
+                pipe.set(
+                    self.redis_key(key), payload, ex=settings.READ_CACHE_TTL_SECONDS + settings.READ_CACHE_STALE_SECONDS
+                )
+                await pipe.execute()
+            entry.current = True
+        except WatchError:
+            pass  # Invalidated meanwhile
+        except RedisError as exc:
+            logger.warning(f"Read cache store failed for {self.namespace}:{key}: {exc!r}")
+        return entry
+
+    @staticmethod
+    async def _release_lock(lock_key: str, token: str) -> None:
+        """Delete the lock only if this caller still owns it."""
+        try:
+            async with redis_client.pipeline() as pipe:
+                await pipe.watch(lock_key)
+                if await pipe.get(lock_key) == token:
+                    pipe.multi()
+                    pipe.delete(lock_key)
+                    await pipe.execute()
+        except (RedisError, WatchError):
+            pass  # The lock expires on its own
+
+
+async def invalidate_entries(namespace: str, *keys: Any) -> None:
+    """Evict ``keys`` of the cache registered under ``namespace``."""
+    if not settings.READ_CACHE_ENABLED or not keys:
+        return
+    await _caches[namespace].invalidate(*(str(key) for key in keys))
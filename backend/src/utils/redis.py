@@ -8,12 +8,14 @@ from src.settings import settings
 logger = logging.getLogger(__name__)
 
 
-def get_redis_client() -> Redis:
+def get_redis_client(decode_responses: bool = True) -> Redis:
     return Redis(
         host=settings.REDIS_HOST,
         port=settings.REDIS_PORT,
-        decode_responses=True,
+        decode_responses=decode_responses,
     )
 
 
 redis_client = get_redis_client()
+# For binary payloads such as cached (pre-compressed) response bodies
+redis_bytes_client = get_redis_client(decode_responses=False)
@@ -0,0 +1,222 @@
+"""Redis-backed HTTP response cache for catalog endpoints.
+
+Serialized response bodies (and a gzip copy of larger ones) are stored in a Redis hash
+keyed by route namespace and path, with UUID path parameters in canonical form. The query
+string is not part of the key, so that clients cannot add entries by adding parameters;
+routes whose response depends on query parameters are not cached. Every entry is registered under one or more
+tags; services invalidate tags after committing writes, which drops every response
+built from the changed rows.
+
+Usage in a router:
+
+    @router.get("", response_model=List[BookOutput])
+    async def list_books(cache: CachedResponse = Depends(response_cache("books:list", ["books"])), ...):
+        if cache.hit:
+            return cache.hit
+        ...
+        return await cache.store(output)
+
+A response is only stored if no tags were invalidated while it was being built: lookups
+read a generation number that every invalidation bumps, and the store is a WATCH/MULTI
+transaction on it. Otherwise a request that read the database before a write could cache
+its old body after the write's invalidation ran.
+
+Entries stored with ETag / Last-Modified validators answer matching conditional requests
+with 304 straight from Redis. Redis errors are logged and treated as cache misses so that
+reads keep working.
+
+Content is stored as returned by the repository and is not validated against the route's
+``response_model``; see ``src.utils.serialization``.
+"""
+
+import gzip
+import logging
+from datetime import datetime
+from typing import Any, Iterable, List
+from uuid import UUID
+
+from fastapi import Request, Response
+from redis.exceptions import RedisError, WatchError
+from src.settings import settings
+from src.utils.conditional import (
+    PRIVATE_CACHE_CONTROL,
+    Validators,
+    is_not_modified,
+    not_modified_response,
+    validator_headers,
+)
+from src.utils.redis import redis_bytes_client
+from src.utils.serialization import dump_json
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "response_cache"
+STATS_KEY = f"{KEY_PREFIX}:stats"
+GENERATION_KEY = f"{KEY_PREFIX}:generation"
+GZIP_MINIMUM_SIZE = 1000  # Matches the GZipMiddleware threshold in main.py
+
+
+def _tag_key(tag: str) -> str:
+    return f"{KEY_PREFIX}:tag:{tag}"
+
+
+def _canonical_path(request: Request) -> str:
+    route = request.scope.get("route")
+    if route is None:
+        return request.url.path
+    params = {}
+    for name, value in request.path_params.items():
+        try:
+            params[name] = str(UUID(value))
+        except ValueError:
+            params[name] = value
+    return route.path_format.format(**params)
+
+
+class CachedResponse:
+    """Cache lookup result for one request, and the means to store its response."""
+
+    def __init__(self, request: Request, namespace: str, tags: List[str], cache_control: str | None = None) -> None:
+        self.namespace = namespace
+        self.cache_control = cache_control
+        self.tags = tags
+        self.request = request
+        self.accepts_gzip = "gzip" in request.headers.get("accept-encoding", "")
+        self.key = f"{KEY_PREFIX}:{namespace}:{_canonical_path(request)}"
+        self.hit: Response | None = None
+        # Invalidation generation read before the response is built; None if it could not be read
+        self.generation: bytes | None = None
+
+    async def lookup(self) -> None:
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return
+        field = "gzip" if self.accepts_gzip else "body"
+        try:
+            async with redis_bytes_client.pipeline(transaction=False) as pipe:
+                pipe.hmget(self.key, field, "body", "etag", "last_modified")
+                pipe.hincrby(STATS_KEY, f"{self.namespace}:lookups", 1)
+                pipe.get(GENERATION_KEY)
+                (compressed_or_body, body, etag, last_modified), _, generation = await pipe.execute()
+        except RedisError as exc:
+            logger.warning(f"Response cache lookup failed for {self.key}: {exc!r}")
+            return
+        if body is None:
+            self.generation = generation or b"0"
+            return
+
+        validators = None
+        if etag is not None:
+            validators = Validators(
+                etag=etag.decode(),
+                last_modified=datetime.fromisoformat(last_modified.decode()) if last_modified else None,
+            )
+            if is_not_modified(self.request, validators):
+                self.hit = not_modified_response(validators, self.cache_control or PRIVATE_CACHE_CONTROL)
+                return
+        if compressed_or_body is not None and self.accepts_gzip:
+            self.hit = self._response(compressed_or_body, "HIT", validators, compressed=True)
+        else:
+            self.hit = self._response(body, "HIT", validators)
+
+    async def store(self, content: Any, tags: Iterable[str] = (), validators: Validators | None = None) -> Response:
+        """Serialize ``content`` once, cache it under this request's key and tags, and return it."""
+        body = dump_json(content)
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return self._response(body, "BYPASS", validators)
+
+        compressed = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MINIMUM_SIZE else None
+        mapping = {"body": body}
+        if compressed is not None:
+            mapping["gzip"] = compressed
+        if validators is not None:
+            mapping["etag"] = validators.etag
+            if validators.last_modified is not None:
+                mapping["last_modified"] = validators.last_modified.isoformat()
+        try:
+            await self._store(mapping, [*self.tags, *tags])
+        except RedisError as exc:
+            logger.warning(f"Response cache store failed for {self.key}: {exc!r}")
+
+        if compressed is not None and self.accepts_gzip:
+            return self._response(compressed, "MISS", validators, compressed=True)
+        return self._response(body, "MISS", validators)
+
+    async def _store(self, mapping: dict, tags: List[str]) -> None:
+        ttl = settings.RESPONSE_CACHE_TTL_SECONDS
+        async with redis_bytes_client.pipeline(transaction=True) as pipe:
+            await pipe.watch(GENERATION_KEY)
+            current = self.generation is not None and (await pipe.get(GENERATION_KEY) or b"0") == self.generation
+            pipe.multi()
+            # Responses built across an invalidation may be stale and are only counted
+            if current:
+                pipe.hset(self.key, mapping=mapping)
+                pipe.expire(self.key, ttl)
+                for tag in tags:
+                    pipe.sadd(_tag_key(tag), self.key)
+                    pipe.expire(_tag_key(tag), ttl)
+            pipe.hincrby(STATS_KEY, f"{self.namespace}:misses", 1)
+            try:
+                await pipe.execute()
+            except WatchError:
+                await redis_bytes_client.hincrby(STATS_KEY, f"{self.namespace}:misses", 1)
+
+    def _response(self, body: bytes, status: str, validators: Validators | None = None, compressed: bool = False) -> Response:
+        headers = {"X-Cache": status}
+        if validators is not None:
+            headers.update(validator_headers(validators, self.cache_control or PRIVATE_CACHE_CONTROL))
+        elif self.cache_control is not None:
+            headers["Cache-Control"] = self.cache_control
+        if compressed:
+            headers.update({"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+def response_cache(namespace: str, tags: List[str] | None = None, cache_control: str | None = None):
+    """Build a dependency that looks up the cached response for ``namespace``.
+
+    ``cache_control`` sets the Cache-Control header of every response, cached or not.
+    """
+    async def dependency(request: Request) -> CachedResponse:
+        cached = CachedResponse(request, namespace, tags=list(tags or []), cache_control=cache_control)
+        await cached.lookup()
+        return cached
+
+    return dependency
+
+
+async def invalidate_tags(*tags: str) -> None:
+    """Drop every cached response registered under any of ``tags``."""
+    if not settings.RESPONSE_CACHE_ENABLED or not tags:
+        return
+    tag_keys = [_tag_key(tag) for tag in tags]
+    try:
+        async with redis_bytes_client.pipeline(transaction=True) as pipe:
+            # Responses being built now are not stored; those already stored are listed below
+            pipe.incr(GENERATION_KEY)
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            _, *members = await pipe.execute()
+        keys = set().union(*members)
+        await redis_bytes_client.delete(*keys, *tag_keys)
+    except RedisError as exc:
+        logger.warning(f"Response cache invalidation failed for tags {tags}: {exc!r}")
+
+
+async def hit_ratios() -> dict:
+    """Return lookups, hits and hit ratio per cached route, across all workers."""
+    counters = await redis_bytes_client.hgetall(STATS_KEY)
+    stats: dict = {}
+    for field, value in counters.items():
+        namespace, _, counter = field.decode().rpartition(":")
+        stats.setdefault(namespace, {"lookups": 0, "misses": 0})[counter] = int(value)
+    for route in stats.values():
+        route["hits"] = max(0, route["lookups"] - route["misses"])
+        route["hit_ratio"] = round(route["hits"] / route["lookups"], 4) if route["lookups"] else 0.0
+    return stats
+
+
+async def clear_response_cache() -> None:
+    """Remove every cached response, tag set and counter."""
+    keys = [key async for key in redis_bytes_client.scan_iter(match=f"{KEY_PREFIX}:*", count=1000)]
+    if keys:
+        await redis_bytes_client.delete(*keys)
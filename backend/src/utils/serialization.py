@@ -0,0 +1,29 @@
+"""JSON responses for data the application already trusts.
+
+Returning a model from a route with ``response_model`` set makes FastAPI validate it
+again, convert it with ``jsonable_encoder`` and encode it with the stdlib ``json``. For
+large catalog lists that dominates the request. Rows read from the database, and the
+read model in particular, already have the shape of the output schema, so routes return
+them as a ``TrustedJSONResponse`` instead: FastAPI passes a ``Response`` through untouched,
+and the body is encoded in one pass by pydantic-core's Rust serializer, which handles
+UUIDs, datetimes and models natively.
+
+Routes keep their ``response_model``, which then only documents the response in OpenAPI.
+"""
+
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+def dump_json(content: Any) -> bytes:
+    """Encode dicts, lists and models as JSON without validating them."""
+    return to_json(content)
+
+
+class TrustedJSONResponse(JSONResponse):
+    """A JSON response whose content is serialized as is, without response_model validation."""
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
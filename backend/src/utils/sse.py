@@ -0,0 +1,54 @@
+"""Server-sent event responses."""
+
+import asyncio
+import json
+from typing import AsyncIterator
+
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
+from src.settings import settings
+from src.utils.change_feed import Subscriber
+
+
+def format_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def event_stream(subscriber: Subscriber) -> AsyncIterator[str]:
+    """Yield queued events as SSE frames, with a comment line as heartbeat when idle.
+
+    The stream ends when the subscriber fell too far behind; the client reconnects and
+    refetches rather than silently missing events.
+    """
+    yield f"retry: {settings.SSE_RETRY_MILLISECONDS}\n\n"
+    while not subscriber.overflowed:
+        try:
+            async with asyncio.timeout(settings.SSE_HEARTBEAT_SECONDS):
+                message = await subscriber.queue.get()
+        except TimeoutError:
+            yield ": keep-alive\n\n"
+            continue
+        yield format_event(message["event"], message["data"])
+    yield format_event("resync", {})
+
+
+class EventStreamResponse(StreamingResponse):
+    media_type = "text/event-stream"
+
+    def __init__(self, content: AsyncIterator[str]) -> None:
+        # X-Accel-Buffering stops nginx from buffering the stream
+        super().__init__(content, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+class EventStreamAwareGZipMiddleware(GZipMiddleware):
+    """GZip compression that leaves event streams alone; compressing them buffers events."""
+
+    def __init__(self, app, minimum_size: int = 500, compresslevel: int = 9, excluded_prefix: str = "") -> None:
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.excluded_prefix = excluded_prefix
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http" and self.excluded_prefix and scope["path"].startswith(self.excluded_prefix):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,264 @@
+"""Virtual waiting room for checkout.
+
+During a flash sale, checkouts arrive far faster than Postgres can take them. With the
+waiting room enabled, a customer first joins the queue and gets a ticket; checkout
+endpoints only accept requests that carry an admitted ticket in the ``Waiting-Room-Ticket``
+header, so the rate of checkouts reaching the database is bounded by the admission rate
+while browsing and the rest of the API stay responsive.
+
+The queue is two Redis counters: joining takes the next number from ``tail``, and every
+admission interval one worker (whichever claims that interval's ``SET NX`` key) moves
+``head`` to ``min(head, tail) + quota``. Tickets numbered up to ``head`` are admitted, in
+the order they joined. ``head`` runs at most one quota ahead of ``tail``, so while the
+room is quiet customers are admitted straight away, and quiet periods do not build up
+admissions for later bursts.
+
+A waiting ticket is kept while its holder polls it, and dropped after
+``WAITING_ROOM_TICKET_SECONDS`` without a poll. Admission is a pass valid for
+``WAITING_ROOM_PASS_SECONDS`` and for one successful checkout, after which the customer
+queues again; a checkout that fails hands the pass back, and a ticket carries one checkout
+at a time. Dropped tickets keep their numbers, so the admission rate is an upper bound
+rather than a target. Each user holds at most one ticket; joining again returns it.
+
+Gated endpoints authenticate from the access token alone, so requests turned away never
+touch the database. When the room is disabled the gate is open and joining admits
+immediately, without Redis; if Redis fails, requests are let through and logged.
+"""
+
+import asyncio
+import logging
+import time
+from typing import AsyncIterator
+from uuid import UUID, uuid4
+
+from fastapi import Depends, Header, HTTPException
+from redis.exceptions import RedisError, WatchError
+from src.routes.v1.waiting_room.schema import TicketOutput
+from src.settings import settings
+from src.utils.auth import authenticate_user_id
+from src.utils.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+HEADER = "Waiting-Room-Ticket"
+KEY_PREFIX = "waiting_room"
+
+
+class TicketRequired(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=428, detail=f"Checkout is queued: join the waiting room and send the ticket as {HEADER}"
+        )
+
+
+class TicketNotFound(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code=404, detail="Waiting room ticket not found or expired")
+
+
+class TicketInUse(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code=409, detail="Waiting room ticket is already in use by another checkout")
+
+
+class NotAdmittedYet(HTTPException):
+    def __init__(self, ticket: TicketOutput) -> None:
+        super().__init__(
+            status_code=429,
+            detail=f"Waiting room ticket not admitted yet (position {ticket.position})",
+            headers={"Retry-After": str(max(1, round(ticket.estimated_wait_seconds)))},
+        )
+
+
+class WaitingRoom:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.head_key = f"{KEY_PREFIX}:{name}:head"
+        self.tail_key = f"{KEY_PREFIX}:{name}:tail"
+        self._admitter: asyncio.Task | None = None
+
+    def _ticket_key(self, ticket_id: UUID | str) -> str:
+        return f"{KEY_PREFIX}:{self.name}:ticket:{ticket_id}"
+
+    def _user_key(self, user_id: UUID) -> str:
+        return f"{KEY_PREFIX}:{self.name}:user:{user_id}"
+
+    def _checkout_key(self, ticket_id: UUID) -> str:
+        return f"{KEY_PREFIX}:{self.name}:checkout:{ticket_id}"
+
+    async def join(self, user_id: UUID) -> TicketOutput:
+        """Queue ``user_id``, or return the ticket they already hold."""
+        if not settings.WAITING_ROOM_ENABLED:
+            return TicketOutput(id=uuid4(), admitted=True, position=0, estimated_wait_seconds=0)
+        user_key = self._user_key(user_id)
+        async with redis_client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(user_key)
+                    existing = await pipe.get(user_key)
+                    if existing is not None:
+                        ticket = await self.status(UUID(existing), user_id)
+                        if ticket is not None:
+                            await pipe.unwatch()
+                            return ticket
+
+                    number = await redis_client.incr(self.tail_key)
+                    ticket_id = uuid4()
+                    pipe.multi()
+                    pipe.hset(self._ticket_key(ticket_id), mapping={"user_id": str(user_id), "number": number})
+                    pipe.expire(self._ticket_key(ticket_id), settings.WAITING_ROOM_TICKET_SECONDS)
+                    pipe.set(user_key, str(ticket_id), ex=settings.WAITING_ROOM_TICKET_SECONDS)
+                    await pipe.execute()
+                    break
+                except WatchError:
+                    continue  # A concurrent join for this user got there first: return its ticket
+        return await self.status(ticket_id, user_id)
+
+    async def status(self, ticket_id: UUID, user_id: UUID) -> TicketOutput | None:
+        """The ticket's place in the queue, or None if it is unknown, expired or someone else's.
+
+        Checking a waiting ticket keeps it; the first check after admission starts its pass.
+        """
+        if not settings.WAITING_ROOM_ENABLED:
+            return TicketOutput(id=ticket_id, admitted=True, position=0, estimated_wait_seconds=0)
+        key = self._ticket_key(ticket_id)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(key)
+            pipe.get(self.head_key)
+            held, head = await pipe.execute()
+        if not held or held["user_id"] != str(user_id):
+            return None
+
+        position = max(0, int(held["number"]) - int(head or 0))
+        if position == 0:
+            if "admitted_at" not in held:
+                async with redis_client.pipeline(transaction=True) as pipe:
+                    pipe.hset(key, "admitted_at", time.time())
+                    pipe.expire(key, settings.WAITING_ROOM_PASS_SECONDS)
+                    pipe.expire(self._user_key(user_id), settings.WAITING_ROOM_PASS_SECONDS)
+                    await pipe.execute()
+            return TicketOutput(id=ticket_id, admitted=True, position=0, estimated_wait_seconds=0)
+
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.expire(key, settings.WAITING_ROOM_TICKET_SECONDS)
+            pipe.expire(self._user_key(user_id), settings.WAITING_ROOM_TICKET_SECONDS)
+            await pipe.execute()
+        return TicketOutput(
+            id=ticket_id,
+            admitted=False,
+            position=position,
+            estimated_wait_seconds=position / settings.WAITING_ROOM_ADMIT_PER_SECOND,
+        )
+
+    async def claim(self, ticket_id: UUID) -> bool:
+        """Start a checkout on an admitted ticket; False while another checkout holds it."""
+        return bool(
+            await redis_client.set(self._checkout_key(ticket_id), 1, nx=True, ex=settings.WAITING_ROOM_PASS_SECONDS)
+        )
+
+    async def release(self, ticket_id: UUID) -> None:
+        """Hand the ticket back after a failed checkout."""
+        await redis_client.delete(self._checkout_key(ticket_id))
+
+    async def spend(self, ticket_id: UUID, user_id: UUID) -> None:
+        """End the ticket's pass after a successful checkout.
+
+        The checkout claim is left to expire, so requests that checked the ticket before it
+        was spent still cannot claim it.
+        """
+        await redis_client.delete(self._ticket_key(ticket_id), self._user_key(user_id))
+
+    async def admit(self) -> int | None:
+        """Admit the next quota of tickets if no worker has this interval; return the new head."""
+        interval = settings.WAITING_ROOM_ADMIT_INTERVAL_SECONDS
+        slot_key = f"{KEY_PREFIX}:{self.name}:admitted:{int(time.time() // interval)}"
+        if not await redis_client.set(slot_key, 1, nx=True, ex=max(1, round(2 * interval))):
+            return None
+        quota = max(1, round(settings.WAITING_ROOM_ADMIT_PER_SECOND * interval))
+        head, tail = await redis_client.mget(self.head_key, self.tail_key)
+        # Joins racing with this only make the new head more conservative
+        new_head = min(int(head or 0), int(tail or 0)) + quota
+        await redis_client.set(self.head_key, new_head)
+        return new_head
+
+    def start(self) -> None:
+        if self._admitter is None or self._admitter.done():
+            self._admitter = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._admitter is not None:
+            self._admitter.cancel()
+            try:
+                await self._admitter
+            except asyncio.CancelledError:
+                pass
+            self._admitter = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.admit()
+            except RedisError as exc:
+                logger.warning(f"{self.name} waiting room admission failed: {exc!r}")
+            interval = settings.WAITING_ROOM_ADMIT_INTERVAL_SECONDS
+            await asyncio.sleep(interval - time.time() % interval)
+
+
+checkout_waiting_room = WaitingRoom("checkout")
+
+
+async def require_admission(
+    ticket_id: UUID | None = Header(
+        default=None, alias=HEADER, description="Admitted waiting room ticket, required while the room is enabled"
+    ),
+    user_id: UUID = Depends(authenticate_user_id),
+) -> TicketOutput | None:
+    """Turn away checkout requests without an admitted ticket, before they reach the database.
+
+    Returns the admitted ticket, or None when the gate is open.
+    """
+    if not settings.WAITING_ROOM_ENABLED:
+        return None
+    if ticket_id is None:
+        raise TicketRequired
+    try:
+        ticket = await checkout_waiting_room.status(ticket_id, user_id)
+    except RedisError as exc:
+        logger.warning(f"Waiting room check failed, admitting the request: {exc!r}")
+        return None
+    if ticket is None:
+        raise TicketRequired
+    if not ticket.admitted:
+        raise NotAdmittedYet(ticket)
+    return ticket
+
+
+async def spend_admission(
+    ticket: TicketOutput | None = Depends(require_admission),
+    user_id: UUID = Depends(authenticate_user_id),
+) -> AsyncIterator[None]:
+    """Admit the request like require_admission, and spend the ticket if the checkout succeeds."""
+    if ticket is None:
+        yield
+        return
+    try:
+        claimed = await checkout_waiting_room.claim(ticket.id)
+    except RedisError as exc:
+        logger.warning(f"Waiting room claim failed, admitting the request: {exc!r}")
+        claimed = None
+    if claimed is False:
+        raise TicketInUse
+    try:
+        yield
+    except Exception:
+        if claimed:
+            try:
+                await checkout_waiting_room.release(ticket.id)
+            except RedisError as exc:
+                logger.warning(f"Waiting room ticket {ticket.id} could not be handed back: {exc!r}")
+        raise
+    if claimed:
+        try:
+            await checkout_waiting_room.spend(ticket.id, user_id)
+        except RedisError as exc:
+            logger.warning(f"Waiting room ticket {ticket.id} could not be spent: {exc!r}")
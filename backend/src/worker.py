@@ -0,0 +1,50 @@
+"""Background worker entrypoint.
+
+Delivers transactional outbox messages until SIGTERM or SIGINT:
+
+    python -m src.worker
+
+Run as many as the backlog needs; relays lock disjoint batches. A batch being delivered
+at shutdown is rolled back and delivered again by the next relay.
+"""
+
+import asyncio
+import logging
+import signal
+
+import src.routes.v1.orders.analytics  # noqa: F401  Registers the order outbox handlers
+from src.db.operations import async_engine
+from src.db.outbox import outbox_relay
+from src.settings import settings
+from src.utils.redis import redis_client
+
+logger = logging.getLogger(__name__)
+
+
+async def run() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+
+    logger.info(f"Delivering outbox messages for {', '.join(outbox_relay.topics)}")
+    outbox_relay.start()
+    try:
+        await stop.wait()
+    finally:
+        await outbox_relay.close()
+        await async_engine.dispose()
+        await redis_client.connection_pool.disconnect()
+    logger.info("Worker stopped")
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=settings.LOGGING_LEVEL,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -11,25 +11,31 @@ from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 import src.db.models  # Ensure all models are registered with SQLModel metadata.
 from src.db.models import DBUser
-from src.db.operations import get_db_session
+from src.db.operations import async_engine as app_engine
+from src.db.operations import get_db_session, get_engine_options
 from src.main import app
 from src.routes.v1.authors.service import AuthorService
 from src.routes.v1.books.service import BookService
 from src.routes.v1.orders.service import OrderService
 from src.routes.v1.users.service import UserService
 from src.settings import settings
-from src.utils.auth import authenticate_admin, authenticate_user, hash_password
+from src.utils.auth import authenticate_admin, authenticate_user, authenticate_user_id, hash_password
+from src.utils.redis import redis_bytes_client, redis_client
+from src.utils.response_cache import clear_response_cache
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def redis_connections() -> AsyncGenerator[None, None]:
+    yield
+    # Pooled Redis connections are bound to the event loop of the test that opened them
+    await redis_client.connection_pool.disconnect()
+    await redis_bytes_client.connection_pool.disconnect()
 
 
 @pytest_asyncio.fixture(scope="function")
 async def db_session() -> AsyncGenerator[AsyncSession, None]:
     # Create test engine - matching db/operations.py pattern
-    async_engine = create_async_engine(
-        settings.DATABASE_URL,
-        pool_size=settings.DATABASE_POOL_SIZE,
-        max_overflow=settings.DATABASE_POOL_SIZE_OVERFLOW,
-        echo=False,
-    )
+    async_engine = create_async_engine(settings.DATABASE_URL, echo=False, **get_engine_options())
 
     # Create tables
     async with async_engine.begin() as conn:
@@ -50,6 +56,8 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
         await conn.run_sync(SQLModel.metadata.drop_all)
 
     await async_engine.dispose()
+    # Cache misses load through the application's engine; its connections are bound to this loop
+    await app_engine.dispose()
 
 
 @pytest_asyncio.fixture
@@ -58,6 +66,8 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         return db_session
 
     app.dependency_overrides[get_db_session] = get_session_override
+    # Tables are recreated per test, so responses cached by a previous test are stale
+    await clear_response_cache()
 
     async with AsyncClient(
         transport=ASGITransport(app=app),
@@ -66,6 +76,7 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         yield client
 
     app.dependency_overrides.clear()
+    await clear_response_cache()
 
 
 @pytest_asyncio.fixture
@@ -95,6 +106,7 @@ async def authenticated_client(client: AsyncClient, test_user: DBUser) -> AsyncC
 
     app.dependency_overrides[authenticate_user] = mock_authenticate_user
     app.dependency_overrides[authenticate_admin] = mock_authenticate_user
+    app.dependency_overrides[authenticate_user_id] = lambda: test_user.id
     return client
 
 
@@ -0,0 +1,96 @@
+"""Integration tests for PgBouncer transaction-pooling compatibility mode.
+
+The ``pgbouncer`` target requires a transaction-mode pooler in front of the test
+database (``docker compose --profile pgbouncer up -d pgbouncer``) and is skipped
+unless ``PGBOUNCER_HOST`` is set.
+"""
+
+import asyncio
+import os
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.operations import get_engine_options
+from src.routes.v1.authors.schema import AuthorCreateInput
+from src.routes.v1.authors.service import AuthorService
+from src.routes.v1.books.schema import BookCreateInput
+from src.routes.v1.books.service import BookService
+from src.settings import settings
+
+
+def database_url(target: str) -> str:
+    if target == "direct":
+        return settings.DATABASE_URL
+    return (
+        f"postgresql+asyncpg://"
+        f"{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@"
+        f"{os.environ['PGBOUNCER_HOST']}:{os.environ.get('PGBOUNCER_PORT', '6432')}/{settings.POSTGRES_DB}"
+    )
+
+
+@pytest.fixture(params=["direct", "pgbouncer"])
+def target(request, monkeypatch) -> str:
+    if request.param == "pgbouncer" and not os.environ.get("PGBOUNCER_HOST"):
+        pytest.skip("PGBOUNCER_HOST not set")
+    monkeypatch.setattr(settings, "DATABASE_PGBOUNCER_MODE", True)
+    return request.param
+
+
+def test_engine_options_disable_prepared_statement_caches(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_PGBOUNCER_MODE", True)
+    monkeypatch.setattr(settings, "DATABASE_PGBOUNCER_POOL_SIZE", 0)
+
+    options = get_engine_options()
+
+    assert options["poolclass"] is NullPool
+    assert options["connect_args"]["statement_cache_size"] == 0
+    assert options["connect_args"]["prepared_statement_cache_size"] == 0
+    name_func = options["connect_args"]["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+
+def test_engine_options_small_local_pool(monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_PGBOUNCER_MODE", True)
+    monkeypatch.setattr(settings, "DATABASE_PGBOUNCER_POOL_SIZE", 4)
+
+    options = get_engine_options()
+
+    assert "poolclass" not in options
+    assert options["pool_size"] == 4
+    assert options["max_overflow"] == 0
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_repositories_under_transaction_pooling(target: str):
+    async_engine = create_async_engine(database_url(target), **get_engine_options())
+    async with async_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    try:
+        async with AsyncSessionLocal() as session:
+            author = await AuthorService(db_session=session).create(data=AuthorCreateInput(name="Pooled Author"))
+
+        async def create_and_read(index: int) -> dict:
+            # Each session runs the same statements, which would collide on cached
+            # prepared statement names once the pooler hands out shared server connections.
+            async with AsyncSessionLocal() as session:
+                book_service = BookService(db_session=session)
+                book = await book_service.create(
+                    data=BookCreateInput(title=f"Book {index}", author_id=author["id"], price=10 + index)
+                )
+                return await book_service.retrieve_with_author(book_id=book.id)
+
+        books = await asyncio.gather(*(create_and_read(index) for index in range(25)))
+        assert {book["author_name"] for book in books} == {"Pooled Author"}
+
+        async with AsyncSessionLocal() as session:
+            listed = await BookService(db_session=session).list_by_author(author_id=author["id"])
+        assert len(listed) == 25
+    finally:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.drop_all)
+        await async_engine.dispose()
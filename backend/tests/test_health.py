@@ -1,7 +1,13 @@
 """Tests for health check endpoint."""
 
+import asyncio
+
 import pytest
+import pytest_asyncio
 from httpx import AsyncClient
+from src.db.operations import async_engine
+from src.main import app
+from src.utils import health_probes
 
 
 @pytest.mark.asyncio
@@ -10,3 +16,81 @@ async def test_health_check(client: AsyncClient):
     response = await client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "OK"}
+
+
+@pytest_asyncio.fixture
+async def probes():
+    health_probes.reset_probe_cache()
+    yield health_probes
+    health_probes.reset_probe_cache()
+    app.state.ready = False
+    await async_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_liveness_check(client: AsyncClient):
+    response = await client.get("/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "OK"}
+
+
+@pytest.mark.asyncio
+async def test_readiness_check_ready(client: AsyncClient, probes):
+    app.state.ready = True
+
+    response = await client.get("/health/ready")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ready"
+    assert data["checks"]["database"]["status"] == "ok"
+    assert data["checks"]["redis"]["status"] == "ok"
+    assert data["checks"]["database"]["latency_ms"] >= 0
+    assert data["checks"]["redis"]["latency_ms"] >= 0
+    assert data["checks"]["warmup"] == {"status": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_readiness_check_waits_for_warmup(client: AsyncClient, probes):
+    app.state.ready = False
+
+    response = await client.get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["checks"]["warmup"] == {"status": "pending"}
+
+
+@pytest.mark.asyncio
+async def test_readiness_check_reports_failed_dependency(client: AsyncClient, probes, monkeypatch):
+    async def database_down() -> None:
+        raise ConnectionRefusedError
+
+    monkeypatch.setattr(probes, "probe_database", database_down)
+    app.state.ready = True
+
+    response = await client.get("/health/ready")
+
+    assert response.status_code == 503
+    data = response.json()
+    assert data["status"] == "unavailable"
+    assert data["checks"]["database"]["status"] == "error"
+    assert data["checks"]["database"]["error"] == "ConnectionRefusedError"
+    assert data["checks"]["redis"]["status"] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_readiness_probes_are_cached(client: AsyncClient, probes, monkeypatch):
+    calls = 0
+
+    async def counting_probe() -> None:
+        nonlocal calls
+        calls += 1
+
+    monkeypatch.setattr(probes, "probe_database", counting_probe)
+    monkeypatch.setattr(probes, "probe_redis", counting_probe)
+    app.state.ready = True
+
+    responses = await asyncio.gather(*(client.get("/health/ready") for _ in range(10)))
+
+    assert all(response.status_code == 200 for response in responses)
+    assert calls == 2
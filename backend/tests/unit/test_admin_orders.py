@@ -0,0 +1,153 @@
+"""Tests for the admin order console: filtered listing and bulk status transitions."""
+
+import uuid
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlmodel import update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.models import DBOrder, DBUser
+from src.utils.auth import hash_password
+from src.utils.redis import redis_client
+
+
+@pytest.fixture(autouse=True)
+async def inventory_keys():
+    yield
+    async for redis_key in redis_client.scan_iter(match="inventory:*"):
+        await redis_client.delete(redis_key)
+
+
+async def create_book(authenticated_client: AsyncClient, stock: int | None = None) -> dict:
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Console Author"})).json()
+    response = await authenticated_client.post(
+        "/api/v1/books", json={"title": "Console", "author_id": author["id"], "price": 10, "stock": stock}
+    )
+    return response.json()
+
+
+async def checkout(authenticated_client: AsyncClient, book_id: str, quantity: int = 1) -> str:
+    response = await authenticated_client.post(
+        "/api/v1/orders/checkout", json={"items": [{"book_id": book_id, "quantity": quantity}]}
+    )
+    return response.json()["id"]
+
+
+async def listed(authenticated_client: AsyncClient, **params) -> list[str]:
+    response = await authenticated_client.get("/api/v1/admin/orders", params=params)
+    assert response.status_code == 200
+    return [order["id"] for order in response.json()["orders"]]
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_orders_are_filtered(authenticated_client: AsyncClient, db_session: AsyncSession):
+    book = await create_book(authenticated_client)
+    other_book = await create_book(authenticated_client)
+    old = await checkout(authenticated_client, book["id"])
+    recent = await checkout(authenticated_client, other_book["id"])
+    single = (
+        await authenticated_client.post("/api/v1/orders", json={"book_id": book["id"], "total_amount": 10})
+    ).json()["id"]
+    await authenticated_client.post(
+        "/api/v1/admin/orders/status", json={"order_ids": [recent], "status": "completed"}
+    )
+    await db_session.exec(update(DBOrder).where(DBOrder.id == uuid.UUID(old)).values(created_at=datetime(2024, 3, 1)))
+    other_user = DBUser(
+        email=f"other_{uuid.uuid4()}@example.com", full_name="Other", hashed_password=hash_password("x")
+    )
+    db_session.add(other_user)
+    await db_session.commit()
+    db_session.add(DBOrder(user_id=other_user.id, book_id=other_book["id"], total_amount=10))
+    await db_session.commit()
+
+    assert len(await listed(authenticated_client)) == 4
+    assert await listed(authenticated_client, status="completed") == [recent]
+    assert set(await listed(authenticated_client, book_id=book["id"])) == {old, single}
+    assert len(await listed(authenticated_client, book_id=other_book["id"])) == 2
+    assert len(await listed(authenticated_client, user_id=str(other_user.id))) == 1
+    in_march = {"created_from": "2024-03-01T00:00:00Z", "created_to": "2024-04-01T00:00:00Z"}
+    assert await listed(authenticated_client, **in_march) == [old]
+    assert old not in await listed(authenticated_client, created_from="2024-03-01T00:00:01")
+    assert await listed(authenticated_client, status="pending", user_id=str(other_user.id), book_id=book["id"]) == []
+    bad = await authenticated_client.get("/api/v1/admin/orders", params={"status": "lost"})
+    assert bad.status_code == 422
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_orders_page_newest_first(authenticated_client: AsyncClient):
+    book = await create_book(authenticated_client)
+    orders = [await checkout(authenticated_client, book["id"]) for _ in range(5)]
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        page = (await authenticated_client.get("/api/v1/admin/orders", params=params)).json()
+        seen += [order["id"] for order in page["orders"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == orders[::-1]
+    assert (await authenticated_client.get("/api/v1/admin/orders", params={"cursor": "x"})).status_code == 422
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_bulk_transitions_follow_the_state_machine(authenticated_client: AsyncClient):
+    book = await create_book(authenticated_client, stock=10)
+    pending = [await checkout(authenticated_client, book["id"], quantity=2) for _ in range(3)]
+    completed = await checkout(authenticated_client, book["id"])
+    await authenticated_client.post(
+        "/api/v1/admin/orders/status", json={"order_ids": [completed], "status": "completed"}
+    )
+    missing = str(uuid.uuid4())
+    assert (await authenticated_client.get(f"/api/v1/inventory/books/{book['id']}")).json()["available"] == 3
+
+    response = await authenticated_client.post(
+        "/api/v1/admin/orders/status",
+        json={"order_ids": [pending[0], completed, pending[1], missing, pending[0]], "status": "cancelled"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"updated": [pending[0], pending[1]], "skipped": [completed, missing]}
+    assert (await authenticated_client.get(f"/api/v1/inventory/books/{book['id']}")).json()["available"] == 7
+    cancelled = (await authenticated_client.get(f"/api/v1/orders/{pending[0]}")).json()
+    assert cancelled["status"] == "cancelled"
+
+    etag = (await authenticated_client.get(f"/api/v1/orders/{pending[2]}")).headers["etag"]
+    response = await authenticated_client.post(
+        "/api/v1/admin/orders/status", json={"order_ids": pending, "status": "completed"}
+    )
+    assert response.json() == {"updated": [pending[2]], "skipped": pending[:2]}
+    # Owners editing from before the transition get 412 rather than overwriting it
+    stale = await authenticated_client.patch(
+        f"/api/v1/orders/{pending[2]}", json={"status": "cancelled"}, headers={"If-Match": etag}
+    )
+    assert stale.status_code == 412
+
+    reopen = await authenticated_client.post(
+        "/api/v1/admin/orders/status", json={"order_ids": pending, "status": "pending"}
+    )
+    assert reopen.status_code == 409
+    empty = await authenticated_client.post(
+        "/api/v1/admin/orders/status", json={"order_ids": [], "status": "completed"}
+    )
+    assert empty.status_code == 422
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_console_requires_an_admin(client: AsyncClient):
+    assert (await client.get("/api/v1/admin/orders")).status_code in (401, 403)
+    response = await client.post(
+        "/api/v1/admin/orders/status", json={"order_ids": [str(uuid.uuid4())], "status": "completed"}
+    )
+    assert response.status_code in (401, 403)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_created_at_has_a_brin_index(db_session: AsyncSession):
+    result = await db_session.exec(
+        text("SELECT indexdef FROM pg_indexes WHERE tablename = 'orders' AND indexname = 'ix_orders_created_at_brin'")
+    )
+    assert "USING brin (created_at)" in result.one()[0]
@@ -0,0 +1,92 @@
+"""Tests for the catalog delta-sync endpoint."""
+
+import pytest
+from httpx import AsyncClient
+from src.settings import settings
+
+
+@pytest.fixture
+def no_settle(monkeypatch):
+    monkeypatch.setattr(settings, "CATALOG_CHANGES_SETTLE_SECONDS", 0)
+
+
+async def create_author_with_books(client: AsyncClient, name: str, *titles: str) -> tuple[dict, list[dict]]:
+    author = (await client.post("/api/v1/authors", json={"name": name})).json()
+    books = [
+        (await client.post("/api/v1/books", json={"title": title, "author_id": author["id"], "price": 10})).json()
+        for title in titles
+    ]
+    return author, books
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_changes_without_cursor_returns_whole_catalog(authenticated_client: AsyncClient, no_settle):
+    await create_author_with_books(authenticated_client, "Author", "First", "Second")
+
+    response = await authenticated_client.get("/api/v1/books/changes")
+
+    assert response.status_code == 200
+    changes = response.json()
+    assert sorted(book["title"] for book in changes["books"]) == ["First", "Second"]
+    assert [author["name"] for author in changes["authors"]] == ["Author"]
+    assert changes["deleted_books"] == [] and changes["deleted_authors"] == []
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_changes_since_cursor_returns_only_changes(authenticated_client: AsyncClient, no_settle):
+    _, (first, second) = await create_author_with_books(authenticated_client, "Author", "First", "Second")
+    cursor = (await authenticated_client.get("/api/v1/books/changes")).json()["cursor"]
+
+    idle = (await authenticated_client.get("/api/v1/books/changes", params={"since": cursor})).json()
+    await authenticated_client.patch(f"/api/v1/books/{first['id']}", json={"price": 12})
+    await authenticated_client.delete(f"/api/v1/books/{second['id']}")
+    changes = (await authenticated_client.get("/api/v1/books/changes", params={"since": cursor})).json()
+
+    assert idle["books"] == [] and idle["cursor"] >= cursor
+    assert [(book["id"], book["price"]) for book in changes["books"]] == [(first["id"], 12)]
+    assert changes["authors"] == []
+    assert changes["deleted_books"] == [second["id"]]
+    assert changes["cursor"] > cursor
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_author_rename_reports_author_and_books(authenticated_client: AsyncClient, no_settle):
+    author, books = await create_author_with_books(authenticated_client, "Old Name", "First")
+    await create_author_with_books(authenticated_client, "Other", "Unrelated")
+    cursor = (await authenticated_client.get("/api/v1/books/changes")).json()["cursor"]
+
+    await authenticated_client.patch(f"/api/v1/authors/{author['id']}", json={"name": "New Name"})
+    changes = (await authenticated_client.get("/api/v1/books/changes", params={"since": cursor})).json()
+
+    assert [a["name"] for a in changes["authors"]] == ["New Name"]
+    assert [(book["id"], book["author_name"]) for book in changes["books"]] == [(books[0]["id"], "New Name")]
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_author_delete_leaves_tombstones(authenticated_client: AsyncClient, no_settle):
+    author, books = await create_author_with_books(authenticated_client, "Author", "First")
+    cursor = (await authenticated_client.get("/api/v1/books/changes")).json()["cursor"]
+
+    await authenticated_client.delete(f"/api/v1/authors/{author['id']}")
+    changes = (await authenticated_client.get("/api/v1/books/changes", params={"since": cursor})).json()
+
+    assert changes["deleted_authors"] == [author["id"]]
+    assert changes["deleted_books"] == [books[0]["id"]]
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_cursor_lags_recent_changes(authenticated_client: AsyncClient):
+    _, (book,) = await create_author_with_books(authenticated_client, "Author", "Recent")
+
+    changes = (await authenticated_client.get("/api/v1/books/changes")).json()
+    again = (await authenticated_client.get("/api/v1/books/changes", params={"since": changes["cursor"]})).json()
+
+    # The change is inside the settle window, so the next request sends it again
+    assert [b["id"] for b in again["books"]] == [book["id"]]
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_changes_requires_authentication(client: AsyncClient):
+    response = await client.get("/api/v1/books/changes")
+
+    assert response.status_code == 403
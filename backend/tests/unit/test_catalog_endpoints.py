@@ -0,0 +1,98 @@
+"""Tests for the public catalog endpoints."""
+
+import pytest
+from httpx import AsyncClient
+from src.utils.redis import redis_bytes_client
+from src.utils.response_cache import clear_response_cache
+
+
+async def seed_catalog(authenticated_client: AsyncClient) -> tuple[dict, list[dict]]:
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Ursula K. Le Guin"})).json()
+    books = []
+    for title in ("The Dispossessed", "The Left Hand of Darkness", "100% Pure"):
+        response = await authenticated_client.post(
+            "/api/v1/books", json={"title": title, "author_id": author["id"], "price": 12}
+        )
+        books.append(response.json())
+    return author, books
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_catalog_requires_no_authentication(client: AsyncClient):
+    response = await client.get("/api/v1/catalog/books")
+
+    assert response.status_code == 200
+    assert response.json() == []
+    cache_control = response.headers["cache-control"]
+    assert cache_control.startswith("public")
+    assert "s-maxage=" in cache_control
+    assert "stale-while-revalidate=" in cache_control
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_catalog_books_and_authors(authenticated_client: AsyncClient):
+    author, books = await seed_catalog(authenticated_client)
+
+    listed = await authenticated_client.get("/api/v1/catalog/books")
+    detail = await authenticated_client.get(f"/api/v1/catalog/books/{books[0]['id']}")
+    authors = await authenticated_client.get("/api/v1/catalog/authors")
+    author_detail = await authenticated_client.get(f"/api/v1/catalog/authors/{author['id']}")
+    by_author = await authenticated_client.get(f"/api/v1/catalog/authors/{author['id']}/books")
+
+    assert len(listed.json()) == 3
+    assert detail.json()["author_name"] == "Ursula K. Le Guin"
+    assert [a["name"] for a in authors.json()] == ["Ursula K. Le Guin"]
+    assert len(author_detail.json()["books"]) == 3
+    assert len(by_author.json()) == 3
+    for response in (listed, detail, authors, author_detail, by_author):
+        assert response.headers["cache-control"].startswith("public")
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_catalog_conditional_get_keeps_public_cache_control(authenticated_client: AsyncClient):
+    await seed_catalog(authenticated_client)
+    first = await authenticated_client.get("/api/v1/catalog/books")
+
+    response = await authenticated_client.get("/api/v1/catalog/books", headers={"If-None-Match": first.headers["etag"]})
+
+    assert response.status_code == 304
+    assert response.headers["cache-control"].startswith("public")
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_catalog_search(authenticated_client: AsyncClient):
+    await seed_catalog(authenticated_client)
+
+    by_title = await authenticated_client.get("/api/v1/catalog/books/search", params={"q": "darkness"})
+    by_author = await authenticated_client.get("/api/v1/catalog/books/search", params={"q": "le guin", "limit": 2})
+    literal_percent = await authenticated_client.get("/api/v1/catalog/books/search", params={"q": "100%"})
+    no_match = await authenticated_client.get("/api/v1/catalog/books/search", params={"q": "%x%"})
+
+    assert [book["title"] for book in by_title.json()] == ["The Left Hand of Darkness"]
+    assert len(by_author.json()) == 2
+    assert [book["title"] for book in literal_percent.json()] == ["100% Pure"]
+    assert no_match.json() == []
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_catalog_search_requires_query(client: AsyncClient):
+    response = await client.get("/api/v1/catalog/books/search")
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_catalog_cache_keys_ignore_undeclared_params(authenticated_client: AsyncClient):
+    _, books = await seed_catalog(authenticated_client)
+    await clear_response_cache()
+
+    for junk in range(5):
+        assert (await authenticated_client.get("/api/v1/catalog/books", params={"x": junk})).status_code == 200
+    await authenticated_client.get(f"/api/v1/catalog/books/{books[0]['id'].upper()}")
+    shouting = await authenticated_client.get(f"/api/v1/catalog/books/{books[0]['id']}")
+    searched = await authenticated_client.get("/api/v1/catalog/books/search", params={"q": "darkness"})
+
+    assert shouting.headers["x-cache"] == "HIT"
+    assert searched.headers["cache-control"].startswith("public")
+    keys = [key async for key in redis_bytes_client.scan_iter(match="response_cache:catalog:*")]
+    assert len(keys) == 2
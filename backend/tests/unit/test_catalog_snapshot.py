@@ -0,0 +1,109 @@
+"""Tests for the per-worker in-memory catalog snapshot."""
+
+from datetime import datetime
+from uuid import UUID, uuid4
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.operations import async_engine
+from src.routes.v1.books.schema import AuthorChange, BookOutput, CatalogChanges
+from src.routes.v1.books.service import BookService, catalog_snapshot
+from src.routes.v1.books.snapshot import CatalogSnapshot
+from src.settings import settings
+
+
+def book(author: AuthorChange, title: str) -> BookOutput:
+    return BookOutput(
+        id=uuid4(), title=title, author_id=author.id, author_name=author.name, description=None, price=10,
+        published_date=None,
+    )
+
+
+def changes(books=(), authors=(), deleted_books=()) -> CatalogChanges:
+    return CatalogChanges(
+        cursor=datetime.now(), books=list(books), authors=list(authors), deleted_books=list(deleted_books),
+        deleted_authors=[],
+    )
+
+
+@pytest_asyncio.fixture
+async def running_snapshot(db_session: AsyncSession):
+    # The snapshot loads through the application engine rather than the test session
+    await catalog_snapshot.refresh()
+    catalog_snapshot.start()
+    yield catalog_snapshot
+    await catalog_snapshot.close()
+    await async_engine.dispose()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_apply_indexes_books_by_author_and_handles_renames_and_deletes():
+    ann, bob = AuthorChange(id=uuid4(), name="Ann", bio=None), AuthorChange(id=uuid4(), name="Bob", bio=None)
+    first, second, third = book(ann, "First"), book(ann, "Second"), book(bob, "Third")
+
+    async def load(since):
+        return changes([first, second, third], [ann, bob])
+
+    snapshot = CatalogSnapshot(load_changes=load)
+    await snapshot.refresh()
+    renamed = first.model_copy(update={"author_name": "Ann Renamed"})
+    snapshot.apply(changes([renamed], [AuthorChange(id=ann.id, name="Ann Renamed", bio=None)], [second.id]))
+
+    assert [b["title"] for b in snapshot.list_by_author(ann.id)] == ["First"]
+    assert snapshot.get(first.id)["author_name"] == "Ann Renamed"
+    assert snapshot.get(second.id) is None
+    assert len(snapshot.list()) == 2
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_stale_or_unloaded_snapshot_falls_back(monkeypatch):
+    async def load(since):
+        return changes()
+
+    snapshot = CatalogSnapshot(load_changes=load)
+    assert snapshot.list() is None
+
+    await snapshot.refresh()
+    assert snapshot.list() == []
+
+    monkeypatch.setattr(settings, "CATALOG_SNAPSHOT_MAX_STALENESS_SECONDS", -1)
+    assert snapshot.list() is None
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_service_reads_fresh_snapshot_and_falls_back_to_database(db_session: AsyncSession, monkeypatch):
+    ann = AuthorChange(id=uuid4(), name="Ann", bio=None)
+    only_in_snapshot = book(ann, "Not in the database")
+
+    async def load(since):
+        return changes([only_in_snapshot], [ann])
+
+    snapshot = CatalogSnapshot(load_changes=load)
+    await snapshot.refresh()
+    monkeypatch.setattr("src.routes.v1.books.service.catalog_snapshot", snapshot)
+    service = BookService(db_session=db_session)
+
+    assert [b["title"] for b in await service.list()] == ["Not in the database"]
+    assert [b["title"] for b in await service.list_by_author(ann.id)] == ["Not in the database"]
+    assert (await service.retrieve_with_author(only_in_snapshot.id))["author_name"] == "Ann"
+
+    monkeypatch.setattr(settings, "CATALOG_SNAPSHOT_MAX_STALENESS_SECONDS", -1)
+    assert await service.list() == []
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_writes_are_visible_before_the_next_refresh(authenticated_client: AsyncClient, running_snapshot):
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Author"})).json()
+    created = (
+        await authenticated_client.post("/api/v1/books", json={"title": "Book", "author_id": author["id"], "price": 10})
+    ).json()
+
+    await authenticated_client.patch(f"/api/v1/books/{created['id']}", json={"price": 12})
+
+    assert (await authenticated_client.get(f"/api/v1/books/{created['id']}")).json()["price"] == 12
+    assert [b["price"] for b in (await authenticated_client.get("/api/v1/books")).json()] == [12]
+    await running_snapshot.refresh()
+    assert running_snapshot.is_fresh()
+    assert running_snapshot.get(UUID(created["id"]))["price"] == 12
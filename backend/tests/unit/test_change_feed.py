@@ -0,0 +1,102 @@
+"""Tests for the change feed and server-sent event streams."""
+
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from src.settings import settings
+from src.utils.change_feed import CATALOG_CHANNEL, ChangeFeed, Subscriber, change_feed
+from src.utils.redis import redis_client
+from src.utils.sse import event_stream
+
+
+@pytest_asyncio.fixture
+async def feed():
+    yield change_feed
+    await change_feed.close()
+
+
+async def wait_for_listener() -> None:
+    for _ in range(100):
+        if dict(await redis_client.pubsub_numsub(CATALOG_CHANNEL))[CATALOG_CHANNEL]:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Change feed listener did not subscribe")
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_book_update_reaches_catalog_subscribers(authenticated_client: AsyncClient, feed: ChangeFeed):
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Author"})).json()
+    book = (
+        await authenticated_client.post("/api/v1/books", json={"title": "Book", "author_id": author["id"], "price": 10})
+    ).json()
+
+    async with feed.subscribe("catalog") as subscriber:
+        await wait_for_listener()
+        await authenticated_client.patch(f"/api/v1/books/{book['id']}", json={"price": 8})
+        event = await asyncio.wait_for(subscriber.queue.get(), timeout=2)
+
+    assert event["event"] == "book.updated"
+    assert event["data"]["id"] == book["id"]
+    assert event["data"]["price"] == 8
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_order_events_reach_only_the_owner():
+    feed = ChangeFeed()
+    async with feed.subscribe("orders:owner") as owner, feed.subscribe("orders:other") as other:
+        event = {"event": "order.updated", "data": {"user_id": "owner", "status": "completed"}}
+        feed._on_message({"type": "message", "channel": "events:orders", "data": json.dumps(event)})
+    await feed.close()
+
+    assert owner.queue.get_nowait() == event
+    assert other.queue.empty()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_malformed_order_events_are_dropped():
+    feed = ChangeFeed()
+    async with feed.subscribe("orders:owner") as owner:
+        for data in ("{not json", json.dumps({"event": "order.updated", "data": {}}), json.dumps(["order"])):
+            feed._on_message({"type": "message", "channel": "events:orders", "data": data})
+        event = {"event": "order.updated", "data": {"user_id": "owner"}}
+        feed._on_message({"type": "message", "channel": "events:orders", "data": json.dumps(event)})
+    await feed.close()
+
+    assert owner.queue.get_nowait() == event
+    assert owner.queue.empty()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_event_stream_sends_heartbeats_and_events(monkeypatch):
+    monkeypatch.setattr(settings, "SSE_HEARTBEAT_SECONDS", 0.01)
+    subscriber = Subscriber()
+    stream = event_stream(subscriber)
+
+    assert (await anext(stream)).startswith("retry:")
+    assert await anext(stream) == ": keep-alive\n\n"
+    subscriber.deliver({"event": "book.deleted", "data": {"id": "1"}})
+    assert await anext(stream) == 'event: book.deleted\ndata: {"id": "1"}\n\n'
+    await stream.aclose()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_slow_subscriber_is_told_to_resync(monkeypatch):
+    monkeypatch.setattr(settings, "SSE_QUEUE_SIZE", 1)
+    subscriber = Subscriber()
+    subscriber.deliver({"event": "book.created", "data": {}})
+    subscriber.deliver({"event": "book.created", "data": {}})
+
+    frames = [frame async for frame in event_stream(subscriber)]
+
+    assert subscriber.overflowed
+    assert frames[-1] == "event: resync\ndata: {}\n\n"
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_order_events_require_authentication(client: AsyncClient):
+    response = await client.get("/api/v1/events/orders")
+
+    assert response.status_code == 403
@@ -0,0 +1,144 @@
+"""Tests for multi-line order checkout."""
+
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.models import DBOrder, DBOrderItem
+
+
+async def seed_books(authenticated_client: AsyncClient, prices: list[float]) -> list[dict]:
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Checkout Author"})).json()
+    books = []
+    for index, price in enumerate(prices):
+        response = await authenticated_client.post(
+            "/api/v1/books", json={"title": f"Book {index}", "author_id": author["id"], "price": price}
+        )
+        books.append(response.json())
+    return books
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_checkout_prices_the_cart_server_side(authenticated_client: AsyncClient, test_user):
+    books = await seed_books(authenticated_client, [12.5, 7.25])
+
+    response = await authenticated_client.post(
+        "/api/v1/orders/checkout",
+        json={
+            "items": [
+                {"book_id": books[0]["id"], "quantity": 2},
+                {"book_id": books[1]["id"]},
+                {"book_id": books[0]["id"], "quantity": 1},
+            ]
+        },
+    )
+
+    assert response.status_code == 201
+    order = response.json()
+    assert order["user_id"] == str(test_user.id)
+    assert order["book_id"] is None
+    assert order["quantity"] == 4
+    assert order["total_amount"] == 44.75
+    assert order["status"] == "pending"
+    # Repeated lines are merged
+    assert sorted((item["book_id"], item["quantity"], item["unit_price"]) for item in order["items"]) == sorted(
+        [(books[0]["id"], 3, 12.5), (books[1]["id"], 1, 7.25)]
+    )
+
+    detail = await authenticated_client.get(f"/api/v1/orders/{order['id']}")
+    assert detail.status_code == 200
+    assert detail.json() == order
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_checkout_totals_cannot_be_edited(authenticated_client: AsyncClient, test_user):
+    books = await seed_books(authenticated_client, [12.5])
+    order = (
+        await authenticated_client.post("/api/v1/orders/checkout", json={"items": [{"book_id": books[0]["id"]}]})
+    ).json()
+    single = (
+        await authenticated_client.post("/api/v1/orders", json={"book_id": books[0]["id"], "total_amount": 12.5})
+    ).json()
+
+    for change in ({"total_amount": 0.01}, {"quantity": 5}):
+        assert (await authenticated_client.patch(f"/api/v1/orders/{order['id']}", json=change)).status_code == 409
+    # Customers cannot reprice their single-book orders either
+    test_user.role = "user"
+    response = await authenticated_client.patch(f"/api/v1/orders/{single['id']}", json={"total_amount": 0.01})
+    assert response.status_code == 403
+
+    detail = (await authenticated_client.get(f"/api/v1/orders/{order['id']}")).json()
+    assert (detail["quantity"], detail["total_amount"]) == (1, 12.5)
+    assert (await authenticated_client.get(f"/api/v1/orders/{single['id']}")).json()["total_amount"] == 12.5
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_checkout_inserts_all_items_in_one_statement(
+    authenticated_client: AsyncClient, db_session: AsyncSession
+):
+    books = await seed_books(authenticated_client, [5 + index for index in range(20)])
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = await authenticated_client.post(
+            "/api/v1/orders/checkout", json={"items": [{"book_id": book["id"]} for book in books]}
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 201
+    assert len(response.json()["items"]) == 20
+    assert response.json()["total_amount"] == sum(5 + index for index in range(20))
+    assert len([statement for statement in statements if statement.startswith("SELECT books.id, books.price")]) == 1
+    assert len([statement for statement in statements if statement.startswith("INSERT INTO order_items")]) == 1
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_checkout_with_unknown_book_places_nothing(authenticated_client: AsyncClient, db_session: AsyncSession):
+    books = await seed_books(authenticated_client, [10])
+    missing_id = uuid.uuid4()
+
+    response = await authenticated_client.post(
+        "/api/v1/orders/checkout", json={"items": [{"book_id": books[0]["id"]}, {"book_id": str(missing_id)}]}
+    )
+
+    assert response.status_code == 404
+    assert str(missing_id) in response.json()["detail"]
+    assert (await db_session.exec(select(func.count(DBOrder.id)))).one() == 0
+    assert (await db_session.exec(select(func.count(DBOrderItem.id)))).one() == 0
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_checkout_validates_the_cart(authenticated_client: AsyncClient):
+    empty = await authenticated_client.post("/api/v1/orders/checkout", json={"items": []})
+    zero = await authenticated_client.post(
+        "/api/v1/orders/checkout", json={"items": [{"book_id": str(uuid.uuid4()), "quantity": 0}]}
+    )
+
+    assert empty.status_code == 422
+    assert zero.status_code == 422
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_deleting_a_checkout_order_deletes_its_items(
+    authenticated_client: AsyncClient, db_session: AsyncSession
+):
+    books = await seed_books(authenticated_client, [10, 20])
+    order = (
+        await authenticated_client.post(
+            "/api/v1/orders/checkout", json={"items": [{"book_id": book["id"]} for book in books]}
+        )
+    ).json()
+
+    response = await authenticated_client.delete(f"/api/v1/orders/{order['id']}")
+
+    assert response.status_code == 204
+    assert (await db_session.exec(select(func.count(DBOrderItem.id)))).one() == 0
@@ -0,0 +1,95 @@
+"""Tests for ETag / Last-Modified conditional GETs."""
+
+import pytest
+from httpx import AsyncClient
+
+
+async def create_book(client: AsyncClient) -> tuple[dict, dict]:
+    author = (await client.post("/api/v1/authors", json={"name": "Author"})).json()
+    book_data = {"title": "Book", "author_id": author["id"], "price": 10}
+    book = (await client.post("/api/v1/books", json=book_data)).json()
+    return author, book
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_list_books_not_modified(authenticated_client: AsyncClient):
+    await create_book(authenticated_client)
+
+    first = await authenticated_client.get("/api/v1/books")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["last-modified"]
+
+    # Served from the response cache, which stores the validators alongside the body
+    cached = await authenticated_client.get("/api/v1/books", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_list_books_not_modified_without_response_cache(authenticated_client: AsyncClient, monkeypatch):
+    from src.settings import settings
+
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+    await create_book(authenticated_client)
+    first = await authenticated_client.get("/api/v1/books")
+
+    response = await authenticated_client.get("/api/v1/books", headers={"If-None-Match": first.headers["etag"]})
+    by_date = await authenticated_client.get(
+        "/api/v1/books", headers={"If-Modified-Since": first.headers["last-modified"]}
+    )
+
+    assert response.status_code == 304
+    assert by_date.status_code == 304
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_author_rename_changes_book_etags(authenticated_client: AsyncClient):
+    author, book = await create_book(authenticated_client)
+    list_etag = (await authenticated_client.get("/api/v1/books")).headers["etag"]
+    detail_etag = (await authenticated_client.get(f"/api/v1/books/{book['id']}")).headers["etag"]
+
+    await authenticated_client.patch(f"/api/v1/authors/{author['id']}", json={"name": "Renamed"})
+
+    listed = await authenticated_client.get("/api/v1/books", headers={"If-None-Match": list_etag})
+    detail = await authenticated_client.get(f"/api/v1/books/{book['id']}", headers={"If-None-Match": detail_etag})
+    assert listed.status_code == 200
+    assert detail.status_code == 200
+    assert detail.json()["author_name"] == "Renamed"
+    assert detail.headers["etag"] != detail_etag
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_orders_not_modified_until_changed(authenticated_client: AsyncClient):
+    _, book = await create_book(authenticated_client)
+    order = (
+        await authenticated_client.post("/api/v1/orders", json={"book_id": book["id"], "total_amount": 10})
+    ).json()
+
+    listed = await authenticated_client.get("/api/v1/orders")
+    detail = await authenticated_client.get(f"/api/v1/orders/{order['id']}")
+    assert (
+        await authenticated_client.get("/api/v1/orders", headers={"If-None-Match": listed.headers["etag"]})
+    ).status_code == 304
+    assert (
+        await authenticated_client.get(f"/api/v1/orders/{order['id']}", headers={"If-None-Match": detail.headers["etag"]})
+    ).status_code == 304
+
+    await authenticated_client.patch(f"/api/v1/orders/{order['id']}", json={"quantity": 2})
+
+    assert (
+        await authenticated_client.get("/api/v1/orders", headers={"If-None-Match": listed.headers["etag"]})
+    ).status_code == 200
+    assert (
+        await authenticated_client.get(f"/api/v1/orders/{order['id']}", headers={"If-None-Match": detail.headers["etag"]})
+    ).status_code == 200
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_conditional_get_of_missing_book_is_not_found(authenticated_client: AsyncClient):
+    response = await authenticated_client.get(
+        "/api/v1/books/00000000-0000-0000-0000-000000000000", headers={"If-None-Match": "*"}
+    )
+
+    assert response.status_code == 404
@@ -0,0 +1,71 @@
+"""Tests for connection pool sizing, pre-warming and exhaustion diagnostics."""
+
+import pytest
+from fastapi import Request
+from pydantic import ValidationError
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.ext.asyncio import create_async_engine
+from src.db.diagnostics import connection_holders, current_scope, pool_exhausted_handler, track_connection_holders
+from src.db.operations import prewarm_pool
+from src.settings import Settings, settings
+
+
+def test_pool_size_defaults_without_budget():
+    configured = settings.model_copy(update={"DATABASE_CONNECTION_BUDGET": None})
+
+    assert configured.DATABASE_WORKER_POOL_SIZE == configured.DATABASE_POOL_SIZE
+    assert configured.DATABASE_WORKER_POOL_OVERFLOW == configured.DATABASE_POOL_SIZE_OVERFLOW
+
+
+@pytest.mark.parametrize(
+    "budget,workers,pool_size,overflow",
+    [(100, 8, 6, 6), (90, 4, 11, 11), (10, 3, 1, 2), (8, 8, 1, 0)],
+)
+def test_pool_size_derived_from_budget(budget, workers, pool_size, overflow):
+    configured = Settings(DATABASE_CONNECTION_BUDGET=budget, WEB_CONCURRENCY=workers)
+
+    assert configured.DATABASE_WORKER_POOL_SIZE == pool_size
+    assert configured.DATABASE_WORKER_POOL_OVERFLOW == overflow
+    assert workers * (pool_size + overflow) <= budget
+
+
+def test_budget_below_one_connection_per_worker_is_rejected():
+    with pytest.raises(ValidationError, match="DATABASE_CONNECTION_BUDGET"):
+        Settings(DATABASE_CONNECTION_BUDGET=4, WEB_CONCURRENCY=8)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_prewarm_pool_opens_connections_up_to_pool_size():
+    async_engine = create_async_engine(settings.DATABASE_URL, pool_size=3, max_overflow=2)
+    try:
+        opened = await prewarm_pool(async_engine, 5)
+
+        assert opened == 3
+        assert async_engine.pool.checkedin() == 3
+    finally:
+        await async_engine.dispose()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_pool_exhaustion_reports_holding_routes():
+    async_engine = create_async_engine(settings.DATABASE_URL, pool_size=1, max_overflow=0, pool_timeout=0.1)
+    track_connection_holders(async_engine.sync_engine)
+    token = current_scope.set({"type": "http", "method": "GET", "path": "/api/v1/books"})
+    try:
+        async with async_engine.connect():
+            with pytest.raises(PoolTimeout):
+                async with async_engine.connect():
+                    pass
+
+            holders = connection_holders()
+            assert holders[0]["route"] == "GET /api/v1/books"
+            assert holders[0]["connections"] == 1
+
+            request = Request({"type": "http", "method": "POST", "path": "/api/v1/orders", "headers": []})
+            response = await pool_exhausted_handler(request, PoolTimeout())
+            assert response.status_code == 503
+
+        assert connection_holders() == []
+    finally:
+        current_scope.reset(token)
+        await async_engine.dispose()
@@ -0,0 +1,97 @@
+"""Tests for group-committed order inserts."""
+
+import asyncio
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.group_commit import GroupCommitBatcher
+from src.db.models import DBOrder, DBUser
+from src.db.operations import async_engine
+from src.settings import settings
+
+
+@pytest_asyncio.fixture
+async def application_engine(db_session: AsyncSession):
+    # Batches are written through the application engine rather than the test session
+    yield async_engine
+    await async_engine.dispose()
+
+
+def order(user: DBUser, **kwargs) -> DBOrder:
+    return DBOrder(user_id=kwargs.pop("user_id", user.id), book_id=None, quantity=1, total_amount=10, **kwargs)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_concurrent_submissions_share_one_insert(application_engine, db_session: AsyncSession, test_user):
+    batcher = GroupCommitBatcher("test", window_seconds=0.05, max_batch=500)
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(application_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        orders = await asyncio.gather(*(batcher.submit(order(test_user)) for _ in range(50)))
+    finally:
+        event.remove(application_engine.sync_engine, "before_cursor_execute", record)
+
+    assert len({created.id for created in orders}) == 50
+    assert len([statement for statement in statements if statement.startswith("INSERT INTO orders")]) == 1
+    assert (await db_session.exec(select(func.count(DBOrder.id)))).one() == 50
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_full_batch_is_written_without_waiting_for_the_window(application_engine, test_user):
+    batcher = GroupCommitBatcher("test", window_seconds=10, max_batch=5)
+
+    orders = await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit(order(test_user)) for _ in range(5))), timeout=5
+    )
+
+    assert len(orders) == 5
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_a_failing_row_fails_only_its_own_submission(
+    application_engine, db_session: AsyncSession, test_user
+):
+    batcher = GroupCommitBatcher("test", window_seconds=0.05, max_batch=500)
+    submissions = [order(test_user) for _ in range(4)]
+    submissions.insert(2, order(test_user, user_id=uuid4()))  # Violates the users foreign key
+
+    results = await asyncio.gather(*(batcher.submit(row) for row in submissions), return_exceptions=True)
+
+    assert isinstance(results[2], IntegrityError)
+    assert [result.id for index, result in enumerate(results) if index != 2] == [
+        row.id for index, row in enumerate(submissions) if index != 2
+    ]
+    assert (await db_session.exec(select(func.count(DBOrder.id)))).one() == 4
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_checkout_through_group_commit(
+    authenticated_client: AsyncClient, application_engine, monkeypatch
+):
+    monkeypatch.setattr(settings, "ORDER_GROUP_COMMIT_ENABLED", True)
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Batch Author"})).json()
+    book = (
+        await authenticated_client.post("/api/v1/books", json={"title": "Batched", "author_id": author["id"], "price": 8})
+    ).json()
+
+    # Requests share the test session, so they are sent one after another
+    responses = [
+        await authenticated_client.post("/api/v1/orders/checkout", json={"items": [{"book_id": book["id"], "quantity": 2}]})
+        for _ in range(5)
+    ]
+
+    assert [response.status_code for response in responses] == [201] * 5
+    listed = await authenticated_client.get("/api/v1/orders")
+    assert len(listed.json()) == 5
+    detail = await authenticated_client.get(f"/api/v1/orders/{responses[0].json()['id']}")
+    assert detail.json()["items"] == [{"book_id": book["id"], "quantity": 2, "unit_price": 8.0}]
@@ -0,0 +1,117 @@
+"""Tests for Idempotency-Key support on POST endpoints."""
+
+import asyncio
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.models import DBOrder
+from src.main import app
+from src.utils.redis import redis_client
+
+
+@pytest.fixture
+async def idempotency_keys():
+    keys = []
+
+    def new_key() -> str:
+        keys.append(str(uuid.uuid4()))
+        return keys[-1]
+
+    yield new_key
+    async for redis_key in redis_client.scan_iter(match="idempotency:*"):
+        if any(redis_key.endswith(key) for key in keys):
+            await redis_client.delete(redis_key)
+
+
+async def create_book(authenticated_client: AsyncClient) -> dict:
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Idempotent Author"})).json()
+    response = await authenticated_client.post(
+        "/api/v1/books", json={"title": "Retry Me", "author_id": author["id"], "price": 15}
+    )
+    return response.json()
+
+
+async def order_count(db_session: AsyncSession) -> int:
+    return (await db_session.exec(select(func.count(DBOrder.id)))).one()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_retry_replays_the_first_response(
+    authenticated_client: AsyncClient, db_session: AsyncSession, idempotency_keys
+):
+    book = await create_book(authenticated_client)
+    headers = {"Idempotency-Key": idempotency_keys()}
+    cart = {"items": [{"book_id": book["id"], "quantity": 2}]}
+
+    first = await authenticated_client.post("/api/v1/orders/checkout", json=cart, headers=headers)
+    retry = await authenticated_client.post("/api/v1/orders/checkout", json=cart, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert "idempotent-replayed" not in first.headers
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert await order_count(db_session) == 1
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_concurrent_duplicate_waits_for_the_first_request(
+    authenticated_client: AsyncClient, db_session: AsyncSession, idempotency_keys
+):
+    book = await create_book(authenticated_client)
+    headers = {"Idempotency-Key": idempotency_keys()}
+    order = {"book_id": book["id"], "quantity": 1, "total_amount": 15}
+
+    responses = await asyncio.gather(
+        *(authenticated_client.post("/api/v1/orders", json=order, headers=headers) for _ in range(3))
+    )
+
+    assert [response.status_code for response in responses] == [201, 201, 201]
+    assert len({response.json()["id"] for response in responses}) == 1
+    assert await order_count(db_session) == 1
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_key_reused_for_a_different_request_is_rejected(authenticated_client: AsyncClient, idempotency_keys):
+    headers = {"Idempotency-Key": idempotency_keys()}
+
+    first = await authenticated_client.post("/api/v1/authors", json={"name": "First"}, headers=headers)
+    reused = await authenticated_client.post("/api/v1/authors", json={"name": "Second"}, headers=headers)
+
+    assert first.status_code == 201
+    assert reused.status_code == 422
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_failed_request_releases_the_key(authenticated_client: AsyncClient, idempotency_keys):
+    headers = {"Idempotency-Key": idempotency_keys()}
+    cart = {"items": [{"book_id": str(uuid.uuid4())}]}
+
+    first = await authenticated_client.post("/api/v1/orders/checkout", json=cart, headers=headers)
+    retry = await authenticated_client.post("/api/v1/orders/checkout", json=cart, headers=headers)
+
+    assert first.status_code == retry.status_code == 404
+    assert "idempotent-replayed" not in retry.headers
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_requests_without_a_key_are_not_deduplicated(
+    authenticated_client: AsyncClient, db_session: AsyncSession
+):
+    book = await create_book(authenticated_client)
+    order = {"book_id": book["id"], "quantity": 1, "total_amount": 15}
+
+    await authenticated_client.post("/api/v1/orders", json=order)
+    await authenticated_client.post("/api/v1/orders", json=order)
+
+    assert await order_count(db_session) == 2
+
+
+def test_openapi_documents_the_header():
+    parameters = app.openapi()["paths"]["/api/v1/orders/checkout"]["post"]["parameters"]
+
+    header = next(parameter for parameter in parameters if parameter["name"] == "Idempotency-Key")
+    assert header["in"] == "header"
+    assert header["required"] is False
@@ -0,0 +1,131 @@
+"""Tests for the cross-worker invalidation bus."""
+
+import asyncio
+import json
+import uuid
+
+import pytest
+from pydantic import BaseModel
+import src.utils.invalidation_bus as invalidation_bus_module
+from src.utils.invalidation_bus import SEQUENCE_KEY, Invalidation, InvalidationBus
+from src.utils.read_through_cache import ReadThroughCache
+from src.utils.redis import redis_client
+
+
+class RecordingCache:
+    def __init__(self) -> None:
+        self.evicted: list[str] = []
+        self.cleared = 0
+
+    def evict_local(self, *keys: str) -> None:
+        self.evicted.extend(keys)
+
+    def clear_local(self) -> None:
+        self.cleared += 1
+
+
+def message(sequence: int, namespace: str = "things", *keys: str) -> dict:
+    return {"type": "message", "data": json.dumps({"sequence": sequence, "namespace": namespace, "keys": keys})}
+
+
+async def wait_until(condition) -> None:
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Condition not met in time")
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_publish_evicts_on_other_workers():
+    publisher, subscriber = InvalidationBus(), InvalidationBus()
+    local, remote = RecordingCache(), RecordingCache()
+    publisher.register("things", local)
+    subscriber.register("things", remote)
+    subscriber.start()
+    await wait_until(lambda: subscriber.last_sequence is not None)
+
+    await publisher.publish(Invalidation("things", ("1", "2")))
+    await wait_until(lambda: remote.evicted)
+    await subscriber.close()
+
+    assert local.evicted == ["1", "2"]
+    assert remote.evicted == ["1", "2"]
+    assert remote.cleared == 0
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_reordered_messages_do_not_flush():
+    bus = InvalidationBus()
+    cache = RecordingCache()
+    bus.register("things", cache)
+    bus.last_sequence = 10
+
+    bus._on_message(message(11, "things", "a"))
+    bus._on_message(message(13, "things", "c"))
+    bus._on_message(message(12, "things", "b"))
+    await asyncio.sleep(0)
+
+    assert cache.evicted == ["a", "c", "b"]
+    assert cache.cleared == 0
+    assert bus.last_sequence == 13
+    await bus.close()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_sequence_gap_flushes_once_the_window_passes(monkeypatch):
+    monkeypatch.setattr(invalidation_bus_module, "REORDER_WINDOW_SECONDS", 0.02)
+    bus = InvalidationBus()
+    cache = RecordingCache()
+    bus.register("things", cache)
+    bus.last_sequence = 10
+
+    bus._on_message(message(12, "things", "b"))
+    bus._on_message(message(14, "things", "d"))
+    assert (cache.evicted, cache.cleared) == (["b", "d"], 0)
+    await wait_until(lambda: cache.cleared)
+
+    assert cache.cleared == 1
+    assert bus.last_sequence == 14
+    bus._on_message(message(13, "things", "c"))  # Too late, but still evicted
+    bus._on_message(message(15, "things", "e"))
+    await asyncio.sleep(0.05)
+    assert cache.evicted == ["b", "d", "c", "e"]
+    assert (cache.cleared, bus.last_sequence) == (1, 15)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_missed_invalidations_while_reconnecting_flush():
+    bus = InvalidationBus()
+    cache = RecordingCache()
+    bus.register("things", cache)
+    current = await redis_client.incr(SEQUENCE_KEY)
+    bus.last_sequence = current - 1  # As if the last message was missed while disconnected
+
+    bus.start()
+    await wait_until(lambda: bus.last_sequence == current)
+    await bus.close()
+
+    assert cache.cleared == 1
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_read_through_cache_evicts_local_tier_on_message():
+    class Item(BaseModel):
+        name: str
+
+    cache = ReadThroughCache(f"test-{uuid.uuid4()}", model=Item)
+    bus = InvalidationBus()
+    bus.register(cache.namespace, cache)
+    bus.last_sequence = 0
+    calls = []
+
+    async def load() -> dict:
+        calls.append(1)
+        return {"name": f"item {len(calls)}"}
+
+    await cache.get("key", load)
+    await redis_client.delete(cache.redis_key("key"))  # As the publishing worker would
+    bus._on_message(message(1, cache.namespace, "key"))
+
+    assert (await cache.get("key", load))["name"] == "item 2"
@@ -0,0 +1,313 @@
+"""Tests for stock levels and stock holds."""
+
+import asyncio
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.models import DBBook, DBOrderItem
+from src.db.operations import async_engine
+from src.routes.v1.inventory.reservations import CounterMissing, SoldOut, stock_reservations
+from src.routes.v1.inventory.service import InventoryService, reconcile_stock
+from src.settings import settings
+from src.utils.redis import redis_client
+
+
+@pytest.fixture(autouse=True)
+async def inventory_keys():
+    yield
+    async for redis_key in redis_client.scan_iter(match="inventory:*"):
+        await redis_client.delete(redis_key)
+
+
+async def create_book(authenticated_client: AsyncClient, stock: int | None) -> dict:
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Stocked Author"})).json()
+    response = await authenticated_client.post(
+        "/api/v1/books", json={"title": "Limited Edition", "author_id": author["id"], "price": 20, "stock": stock}
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+async def checkout(authenticated_client: AsyncClient, book_id: str, quantity: int, hold_id: str | None = None):
+    payload = {"items": [{"book_id": book_id, "quantity": quantity}]}
+    if hold_id is not None:
+        payload["hold_id"] = hold_id
+    return await authenticated_client.post("/api/v1/orders/checkout", json=payload)
+
+
+async def available(authenticated_client: AsyncClient, book_id: str) -> int | None:
+    return (await authenticated_client.get(f"/api/v1/inventory/books/{book_id}")).json()["available"]
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_checkout_sells_out(authenticated_client: AsyncClient):
+    book = await create_book(authenticated_client, stock=3)
+
+    assert (await checkout(authenticated_client, book["id"], 2)).status_code == 201
+    assert await available(authenticated_client, book["id"]) == 1
+
+    response = await checkout(authenticated_client, book["id"], 2)
+    assert response.status_code == 409
+    assert book["id"] in response.json()["detail"]
+    # The failed checkout took nothing
+    assert await available(authenticated_client, book["id"]) == 1
+    assert (await checkout(authenticated_client, book["id"], 1)).status_code == 201
+    assert await available(authenticated_client, book["id"]) == 0
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_unlimited_books_are_not_tracked(authenticated_client: AsyncClient):
+    book = await create_book(authenticated_client, stock=None)
+
+    assert (await checkout(authenticated_client, book["id"], 1000)).status_code == 201
+    stock = (await authenticated_client.get(f"/api/v1/inventory/books/{book['id']}")).json()
+    assert stock == {"book_id": book["id"], "stock": None, "available": None}
+
+    hold = await authenticated_client.post("/api/v1/inventory/holds", json={"items": [{"book_id": book["id"]}]})
+    assert hold.status_code == 201
+    assert hold.json()["items"] == []
+    # Checkout accepts the empty hold
+    assert (await checkout(authenticated_client, book["id"], 1, hold.json()["id"])).status_code == 201
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_hold_sets_stock_aside_until_released(authenticated_client: AsyncClient):
+    book = await create_book(authenticated_client, stock=2)
+
+    hold = await authenticated_client.post(
+        "/api/v1/inventory/holds", json={"items": [{"book_id": book["id"], "quantity": 2}]}
+    )
+    assert hold.status_code == 201
+    assert hold.json()["items"] == [{"book_id": book["id"], "quantity": 2}]
+    assert hold.json()["expires_at"] is not None
+    assert (await checkout(authenticated_client, book["id"], 1)).status_code == 409
+
+    assert (await authenticated_client.delete(f"/api/v1/inventory/holds/{hold.json()['id']}")).status_code == 204
+    assert (await authenticated_client.delete(f"/api/v1/inventory/holds/{hold.json()['id']}")).status_code == 404
+    assert await available(authenticated_client, book["id"]) == 2
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_checkout_claims_hold_once(authenticated_client: AsyncClient):
+    book = await create_book(authenticated_client, stock=2)
+    hold = (
+        await authenticated_client.post(
+            "/api/v1/inventory/holds", json={"items": [{"book_id": book["id"], "quantity": 2}]}
+        )
+    ).json()
+
+    # The hold must match the cart
+    assert (await checkout(authenticated_client, book["id"], 1, hold["id"])).status_code == 409
+    assert (await checkout(authenticated_client, book["id"], 2, hold["id"])).status_code == 201
+    assert (await checkout(authenticated_client, book["id"], 2, hold["id"])).status_code == 409
+    assert await available(authenticated_client, book["id"]) == 0
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_expired_holds_are_swept(authenticated_client: AsyncClient, monkeypatch):
+    book = await create_book(authenticated_client, stock=5)
+    monkeypatch.setattr(settings, "INVENTORY_HOLD_SECONDS", -1)
+    hold = (
+        await authenticated_client.post(
+            "/api/v1/inventory/holds", json={"items": [{"book_id": book["id"], "quantity": 4}]}
+        )
+    ).json()
+    assert await available(authenticated_client, book["id"]) == 1
+
+    assert await stock_reservations.sweep() == 1
+    assert await available(authenticated_client, book["id"]) == 5
+    assert (await checkout(authenticated_client, book["id"], 4, hold["id"])).status_code == 409
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_concurrent_sales_never_oversell(authenticated_client: AsyncClient):
+    book_id = uuid.uuid4()
+    await stock_reservations.load({book_id: 50})
+    # Each in-flight sale holds its own Redis connection; keep the pool modest
+    in_flight = asyncio.Semaphore(10)
+
+    async def buy() -> bool:
+        async with in_flight:
+            try:
+                await stock_reservations.take({book_id: 1})
+            except SoldOut:
+                return False
+            return True
+
+    results = await asyncio.gather(*(buy() for _ in range(500)))
+
+    assert sum(results) == 50
+    assert await stock_reservations.available(book_id) == 0
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_reconcile_applies_sales_to_stock(authenticated_client: AsyncClient, db_session: AsyncSession):
+    book = await create_book(authenticated_client, stock=10)
+    assert (await checkout(authenticated_client, book["id"], 3)).status_code == 201
+    assert (await checkout(authenticated_client, book["id"], 2)).status_code == 201
+
+    try:
+        assert await reconcile_stock() == 5
+        assert await reconcile_stock() == 0
+    finally:
+        await async_engine.dispose()
+
+    db_session.expire_all()
+    assert (await db_session.exec(select(DBBook.stock).where(DBBook.id == uuid.UUID(book["id"])))).one() == 5
+    assert all((await db_session.exec(select(DBOrderItem.stock_applied))).all())
+    assert await available(authenticated_client, book["id"]) == 5
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_counters_are_rebuilt_from_unapplied_sales(authenticated_client: AsyncClient):
+    book = await create_book(authenticated_client, stock=10)
+    assert (await checkout(authenticated_client, book["id"], 4)).status_code == 201
+
+    await stock_reservations.forget(uuid.UUID(book["id"]))
+
+    assert await available(authenticated_client, book["id"]) == 6
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_admin_sets_stock(authenticated_client: AsyncClient):
+    book = await create_book(authenticated_client, stock=5)
+    assert (await checkout(authenticated_client, book["id"], 2)).status_code == 201
+
+    response = await authenticated_client.put(f"/api/v1/inventory/books/{book['id']}", json={"stock": 20})
+    assert response.status_code == 200
+    # The pending sale is applied before the new stock replaces it
+    assert response.json() == {"book_id": book["id"], "stock": 20, "available": 20}
+
+    response = await authenticated_client.put(f"/api/v1/inventory/books/{book['id']}", json={"stock": None})
+    assert response.json() == {"book_id": book["id"], "stock": None, "available": None}
+    missing = await authenticated_client.put(f"/api/v1/inventory/books/{uuid.uuid4()}", json={"stock": 1})
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_single_book_orders_reject_stocked_books(authenticated_client: AsyncClient):
+    book = await create_book(authenticated_client, stock=5)
+
+    response = await authenticated_client.post(
+        "/api/v1/orders", json={"book_id": book["id"], "quantity": 1, "total_amount": 20}
+    )
+
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_sales_on_a_forgotten_counter_reload_it(authenticated_client: AsyncClient, monkeypatch):
+    book = await create_book(authenticated_client, stock=5)
+    book_id = uuid.UUID(book["id"])
+    load_counters = InventoryService._load_counters
+    forgotten = []
+
+    async def load_then_forget(self, book_ids):
+        await load_counters(self, book_ids)
+        if not forgotten:
+            # Stock set or the counter dropped between loading and taking
+            forgotten.append(book_id)
+            await stock_reservations.forget(book_id)
+
+    monkeypatch.setattr(InventoryService, "_load_counters", load_then_forget)
+
+    assert (await checkout(authenticated_client, book["id"], 2)).status_code == 201
+    assert forgotten == [book_id]
+    assert await available(authenticated_client, book["id"]) == 3
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_writes_to_a_missing_counter_do_not_stick():
+    book_id = uuid.uuid4()
+    await stock_reservations.load({book_id: 4})
+    hold_id, _ = await stock_reservations.hold(uuid.uuid4(), {book_id: 1})
+    await stock_reservations.forget(book_id)
+
+    with pytest.raises(CounterMissing):
+        await stock_reservations.take({book_id: 2})
+    # Releasing the hold recreates the key, but not as a loaded counter
+    assert await stock_reservations.release(hold_id)
+    assert await stock_reservations.missing_counters([book_id]) == [book_id]
+    assert await stock_reservations.available(book_id) is None
+
+    await stock_reservations.load({book_id: 4})
+    assert await stock_reservations.available(book_id) == 4
+    await stock_reservations.load({book_id: 0})  # Loaded counters are left alone
+    assert await stock_reservations.available(book_id) == 4
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_rebuilt_counters_leave_held_units_aside(authenticated_client: AsyncClient):
+    book = await create_book(authenticated_client, stock=5)
+    hold = (
+        await authenticated_client.post(
+            "/api/v1/inventory/holds", json={"items": [{"book_id": book["id"], "quantity": 3}]}
+        )
+    ).json()
+    await stock_reservations.forget(uuid.UUID(book["id"]))  # Evicted while the hold is live
+
+    assert await available(authenticated_client, book["id"]) == 2
+    assert (await checkout(authenticated_client, book["id"], 3)).status_code == 409
+    assert (await checkout(authenticated_client, book["id"], 3, hold_id=hold["id"])).status_code == 201
+    assert await available(authenticated_client, book["id"]) == 2
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_restocks_during_sales_keep_the_counter():
+    book_id = uuid.uuid4()
+    await stock_reservations.load({book_id: 10})
+
+    async def sell():
+        try:
+            await stock_reservations.take({book_id: 1})
+        except SoldOut:
+            pass
+
+    await asyncio.gather(*(sell() for _ in range(6)), *(stock_reservations.adjust(book_id, 1) for _ in range(4)))
+
+    assert await stock_reservations.missing_counters([book_id]) == []
+    assert await stock_reservations.available(book_id) == 8
+    # Restocking a counter that is not loaded does not make it look loaded
+    await stock_reservations.forget(book_id)
+    await stock_reservations.adjust(book_id, 5)
+    assert await stock_reservations.missing_counters([book_id]) == [book_id]
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_failed_sales_are_not_given_back_to_rebuilt_counters(monkeypatch):
+    book_id = uuid.uuid4()
+    give_back = stock_reservations.give_back
+
+    async def reload_then_give_back(quantities, taken):
+        await stock_reservations.load({book_id: 5})  # Rebuilt from Postgres meanwhile
+        await give_back(quantities, taken)
+
+    monkeypatch.setattr(stock_reservations, "give_back", reload_then_give_back)
+    with pytest.raises(CounterMissing):
+        await stock_reservations.take({book_id: 2})
+    assert await stock_reservations.available(book_id) == 5
+
+    # The order was not written, and the counter was forgotten and rebuilt before giving back
+    taken = await stock_reservations.take({book_id: 2})
+    await stock_reservations.forget(book_id)
+    await stock_reservations.load({book_id: 5})
+    await give_back({book_id: 2}, taken)
+    assert await stock_reservations.available(book_id) == 5
+
+    taken = await stock_reservations.take({book_id: 2})
+    assert await stock_reservations.available(book_id) == 3
+    await give_back({book_id: 2}, taken)
+    assert await stock_reservations.available(book_id) == 5
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_deleting_an_author_drops_their_counters(authenticated_client: AsyncClient):
+    book = await create_book(authenticated_client, stock=5)
+    assert await available(authenticated_client, book["id"]) == 5
+
+    assert (await authenticated_client.delete(f"/api/v1/authors/{book['author_id']}")).status_code == 204
+
+    assert await redis_client.exists(f"inventory:available:{book['id']}") == 0
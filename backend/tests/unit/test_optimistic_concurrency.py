@@ -0,0 +1,123 @@
+"""Tests for If-Match and version-checked updates of books and orders."""
+
+import asyncio
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.models import DBOrder
+from src.routes.v1.orders.schema import OrderUpdateInput
+from src.routes.v1.orders.service import OrderService
+from src.utils.conditional import UpdateConflict
+
+
+async def create_book(authenticated_client: AsyncClient) -> dict:
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Versioned Author"})).json()
+    response = await authenticated_client.post(
+        "/api/v1/books", json={"title": "Versioned", "author_id": author["id"], "price": 10}
+    )
+    return response.json()
+
+
+async def create_order(authenticated_client: AsyncClient) -> dict:
+    # Single-book orders, unlike checkout orders, can have their quantity edited
+    book = await create_book(authenticated_client)
+    response = await authenticated_client.post(
+        "/api/v1/orders", json={"book_id": book["id"], "quantity": 2, "total_amount": 20}
+    )
+    return response.json()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_book_update_with_stale_etag_fails(authenticated_client: AsyncClient):
+    book = await create_book(authenticated_client)
+    etag = (await authenticated_client.get(f"/api/v1/books/{book['id']}")).headers["etag"]
+
+    first = await authenticated_client.patch(
+        f"/api/v1/books/{book['id']}", json={"price": 12}, headers={"If-Match": etag}
+    )
+    assert first.status_code == 200
+    assert first.headers["etag"] != etag
+    assert first.headers["etag"] == (await authenticated_client.get(f"/api/v1/books/{book['id']}")).headers["etag"]
+
+    # A second admin editing from the same snapshot does not overwrite the first
+    second = await authenticated_client.patch(
+        f"/api/v1/books/{book['id']}", json={"price": 15}, headers={"If-Match": etag}
+    )
+    assert second.status_code == 412
+    assert (await authenticated_client.get(f"/api/v1/books/{book['id']}")).json()["price"] == 12
+
+    chained = await authenticated_client.patch(
+        f"/api/v1/books/{book['id']}", json={"price": 15}, headers={"If-Match": first.headers["etag"]}
+    )
+    assert chained.status_code == 200
+    assert chained.json()["price"] == 15
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_order_update_honours_if_match(authenticated_client: AsyncClient):
+    order = await create_order(authenticated_client)
+    etag = (await authenticated_client.get(f"/api/v1/orders/{order['id']}")).headers["etag"]
+
+    weak = await authenticated_client.patch(
+        f"/api/v1/orders/{order['id']}", json={"quantity": 3}, headers={"If-Match": f"W/{etag}"}
+    )
+    assert weak.status_code == 412
+    updated = await authenticated_client.patch(
+        f"/api/v1/orders/{order['id']}", json={"quantity": 3}, headers={"If-Match": etag}
+    )
+    assert updated.status_code == 200
+    stale = await authenticated_client.patch(
+        f"/api/v1/orders/{order['id']}", json={"status": "cancelled"}, headers={"If-Match": etag}
+    )
+    assert stale.status_code == 412
+    # Without If-Match the update is unconditional for the client
+    unconditional = await authenticated_client.patch(f"/api/v1/orders/{order['id']}", json={"quantity": 4})
+    assert unconditional.status_code == 200
+    assert unconditional.json()["status"] == "pending"
+    star = await authenticated_client.patch(
+        f"/api/v1/orders/{order['id']}", json={"status": "cancelled"}, headers={"If-Match": "*"}
+    )
+    assert star.status_code == 200
+    assert (star.json()["status"], star.json()["quantity"]) == ("cancelled", 4)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_racing_order_updates_conflict(
+    authenticated_client: AsyncClient, db_session: AsyncSession, test_user, monkeypatch
+):
+    order = await create_order(authenticated_client)
+    both_read = asyncio.Barrier(2)
+    retrieve_by_user = OrderService.retrieve_by_user
+
+    async def retrieve_then_wait(self, **kwargs):
+        current = await retrieve_by_user(self, **kwargs)
+        await both_read.wait()
+        return current
+
+    monkeypatch.setattr(OrderService, "retrieve_by_user", retrieve_then_wait)
+    sessions = async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+
+    async def update(data: OrderUpdateInput):
+        async with sessions() as session:
+            try:
+                return await OrderService(db_session=session).update(
+                    order_id=order["id"], user_id=test_user.id, data=data, is_admin=True
+                )
+            except UpdateConflict as exc:
+                return exc
+
+    # A user cancelling while an admin corrects the order: exactly one of them wins
+    results = await asyncio.gather(
+        update(OrderUpdateInput(status="cancelled")), update(OrderUpdateInput(quantity=3, total_amount=30))
+    )
+
+    conflicts = [result for result in results if isinstance(result, UpdateConflict)]
+    winners = [result for result in results if not isinstance(result, UpdateConflict)]
+    assert len(conflicts) == 1 and conflicts[0].status_code == 409
+    assert len(winners) == 1 and winners[0].version == 2
+    async with sessions() as session:
+        stored = await session.get(DBOrder, uuid.UUID(order["id"]))
+    assert (stored.status, stored.version) == (winners[0].status, 2)
@@ -299,18 +299,18 @@ async def test_update_order_status(authenticated_client: AsyncClient, order_serv
     created_order = create_response.json()
 
     update_data = {
-        "status": "completed",
+        "status": "cancelled",
     }
 
     response = await authenticated_client.patch(f"/api/v1/orders/{created_order['id']}", json=update_data)
 
     assert response.status_code == 200
     data = response.json()
-    assert data["status"] == "completed"
+    assert data["status"] == "cancelled"
 
     # Verify status was updated in database
     updated_order = await order_service.retrieve(order_id=UUID(created_order["id"]))
-    assert updated_order.status == "completed"
+    assert updated_order.status == "cancelled"
 
 
 @pytest.mark.asyncio(loop_scope="function")
@@ -0,0 +1,119 @@
+"""Tests for the enriched, keyset-paginated order history."""
+
+import uuid
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlmodel import update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.models import DBOrder, DBUser
+from src.utils.auth import hash_password
+
+
+async def create_book(authenticated_client: AsyncClient, title: str, author_name: str, price: float) -> dict:
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": author_name})).json()
+    response = await authenticated_client.post(
+        "/api/v1/books", json={"title": title, "author_id": author["id"], "price": price}
+    )
+    return response.json()
+
+
+async def checkout(authenticated_client: AsyncClient, *items: dict) -> dict:
+    response = await authenticated_client.post("/api/v1/orders/checkout", json={"items": list(items)})
+    assert response.status_code == 201
+    return response.json()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_history_carries_titles_authors_and_prices_paid(
+    authenticated_client: AsyncClient, db_session: AsyncSession
+):
+    dune = await create_book(authenticated_client, "Dune", "Frank Herbert", 9.99)
+    emma = await create_book(authenticated_client, "Emma", "Jane Austen", 5.5)
+    cart = await checkout(
+        authenticated_client, {"book_id": dune["id"], "quantity": 2}, {"book_id": emma["id"], "quantity": 1}
+    )
+    single = (
+        await authenticated_client.post(
+            "/api/v1/orders", json={"book_id": emma["id"], "quantity": 3, "total_amount": 15}
+        )
+    ).json()
+    # Later price changes do not rewrite history
+    await authenticated_client.patch(f"/api/v1/books/{dune['id']}", json={"price": 20})
+    # Someone else's order is not listed
+    other = DBUser(email=f"other_{uuid.uuid4()}@example.com", full_name="Other", hashed_password=hash_password("x"))
+    db_session.add(other)
+    await db_session.commit()
+    db_session.add(DBOrder(user_id=other.id, book_id=emma["id"], total_amount=5.5))
+    await db_session.commit()
+
+    response = await authenticated_client.get("/api/v1/orders/history")
+
+    assert response.status_code == 200
+    page = response.json()
+    assert page["next_cursor"] is None
+    assert [order["id"] for order in page["orders"]] == [single["id"], cart["id"]]
+    assert page["orders"][0]["lines"] == [
+        {"book_id": emma["id"], "title": "Emma", "author_name": "Jane Austen", "quantity": 3, "unit_price": 5.0}
+    ]
+    assert page["orders"][1]["total_amount"] == 25.48
+    assert page["orders"][1]["status"] == "pending"
+    assert page["orders"][1]["lines"] == [
+        {"book_id": dune["id"], "title": "Dune", "author_name": "Frank Herbert", "quantity": 2, "unit_price": 9.99},
+        {"book_id": emma["id"], "title": "Emma", "author_name": "Jane Austen", "quantity": 1, "unit_price": 5.5},
+    ]
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_history_pages_newest_first_without_gaps(authenticated_client: AsyncClient, db_session: AsyncSession):
+    book = await create_book(authenticated_client, "Paged", "Page Author", 10)
+    orders = [await checkout(authenticated_client, {"book_id": book["id"]}) for _ in range(5)]
+    # Two orders placed in the same microsecond are told apart by id
+    tied = [uuid.UUID(orders[1]["id"]), uuid.UUID(orders[2]["id"])]
+    await db_session.exec(update(DBOrder).where(DBOrder.id.in_(tied)).values(created_at=datetime(2024, 1, 1)))
+    await db_session.commit()
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        page = (await authenticated_client.get("/api/v1/orders/history", params=params)).json()
+        seen += [order["id"] for order in page["orders"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert len(seen) == len(set(seen)) == 5
+    assert seen[:3] == [orders[4]["id"], orders[3]["id"], orders[0]["id"]]
+    assert set(seen[3:]) == {str(order_id) for order_id in tied}
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_history_page_is_one_query(authenticated_client: AsyncClient, db_session: AsyncSession):
+    books = [await create_book(authenticated_client, f"Book {n}", f"Author {n}", 10 + n) for n in range(3)]
+    for book in books:
+        await checkout(authenticated_client, *({"book_id": other["id"]} for other in books if other != book))
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        page = (await authenticated_client.get("/api/v1/orders/history")).json()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert len(page["orders"]) == 3
+    assert all(len(order["lines"]) == 2 for order in page["orders"])
+    assert len(statements) == 1
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_history_rejects_bad_cursors(authenticated_client: AsyncClient):
+    assert (await authenticated_client.get("/api/v1/orders/history", params={"cursor": "nope"})).status_code == 422
+    assert (await authenticated_client.get("/api/v1/orders/history", params={"limit": 0})).status_code == 422
@@ -0,0 +1,215 @@
+"""Tests for the order status state machine and expiry of stale pending orders."""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import col, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.models import DBBook, DBOrder, OrderStatus
+from src.db.operations import async_engine
+from src.routes.v1.orders.repository import OrderRepository
+from src.routes.v1.inventory.service import reconcile_stock
+from src.routes.v1.orders.service import expire_stale_orders
+from src.settings import settings
+from src.utils.redis import redis_client
+
+
+@pytest.fixture(autouse=True)
+async def inventory_keys():
+    yield
+    async for redis_key in redis_client.scan_iter(match="inventory:*"):
+        await redis_client.delete(redis_key)
+
+
+@pytest.fixture
+async def global_engine():
+    # expire_stale_orders and reconcile_stock use the application's engine
+    yield
+    await async_engine.dispose()
+
+
+async def create_book(authenticated_client: AsyncClient, stock: int | None = None) -> dict:
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Status Author"})).json()
+    response = await authenticated_client.post(
+        "/api/v1/books", json={"title": "Status", "author_id": author["id"], "price": 10, "stock": stock}
+    )
+    return response.json()
+
+
+async def place_order(authenticated_client: AsyncClient, book_id: str, quantity: int = 1) -> dict:
+    response = await authenticated_client.post(
+        "/api/v1/orders/checkout", json={"items": [{"book_id": book_id, "quantity": quantity}]}
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+async def set_status(authenticated_client: AsyncClient, order_id: str, status: str):
+    return await authenticated_client.patch(f"/api/v1/orders/{order_id}", json={"status": status})
+
+
+async def complete(authenticated_client: AsyncClient, order_id: str) -> None:
+    response = await authenticated_client.post(
+        "/api/v1/admin/orders/status", json={"order_ids": [order_id], "status": "completed"}
+    )
+    assert response.json()["updated"] == [order_id]
+
+
+async def available(authenticated_client: AsyncClient, book_id: str) -> int:
+    return (await authenticated_client.get(f"/api/v1/inventory/books/{book_id}")).json()["available"]
+
+
+async def backdate(db_session: AsyncSession, order_ids: list[str], hours: int) -> None:
+    created_at = datetime.utcnow() - timedelta(hours=hours)
+    stmt = update(DBOrder).where(col(DBOrder.id).in_([uuid.UUID(order_id) for order_id in order_ids]))
+    await db_session.exec(stmt.values(created_at=created_at))
+    await db_session.commit()
+
+
+async def statuses(db_session: AsyncSession, order_ids: list[str]) -> list[str]:
+    sessions = async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    async with sessions() as session:
+        stmt = select(DBOrder.id, DBOrder.status).where(col(DBOrder.id).in_([uuid.UUID(id) for id in order_ids]))
+        found = dict((await session.exec(stmt)).all())
+    return [found[uuid.UUID(order_id)] for order_id in order_ids]
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_status_follows_the_state_machine(authenticated_client: AsyncClient):
+    book = await create_book(authenticated_client)
+    completed = await place_order(authenticated_client, book["id"])
+    cancelled = await place_order(authenticated_client, book["id"])
+
+    assert (await set_status(authenticated_client, completed["id"], "shipped")).status_code == 422
+    assert (await set_status(authenticated_client, completed["id"], "pending")).status_code == 200
+    # Owners can cancel, but completing is fulfilment's
+    response = await set_status(authenticated_client, completed["id"], "completed")
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Orders become completed through the admin order console"
+    await complete(authenticated_client, completed["id"])
+    assert (await set_status(authenticated_client, cancelled["id"], "cancelled")).status_code == 200
+
+    # Completed and cancelled orders are final
+    response = await set_status(authenticated_client, completed["id"], "cancelled")
+    assert response.status_code == 409
+    assert response.json()["detail"] == "A completed order cannot become cancelled"
+    assert (await set_status(authenticated_client, cancelled["id"], "pending")).status_code == 409
+    edit = await authenticated_client.patch(f"/api/v1/orders/{completed['id']}", json={"quantity": 5})
+    assert edit.status_code == 409
+    # Repeating the current status is not a change
+    assert (await set_status(authenticated_client, completed["id"], "completed")).status_code == 200
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_database_rejects_unknown_statuses(db_session: AsyncSession, test_user):
+    db_session.add(DBOrder(user_id=test_user.id, total_amount=10, status="lost"))
+    with pytest.raises(Exception, match="ck_orders_status"):
+        await db_session.commit()
+    await db_session.rollback()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_cancelling_returns_stock(
+    authenticated_client: AsyncClient, db_session: AsyncSession, global_engine
+):
+    book = await create_book(authenticated_client, stock=5)
+    unapplied = await place_order(authenticated_client, book["id"], quantity=2)
+    assert await available(authenticated_client, book["id"]) == 3
+    assert (await set_status(authenticated_client, unapplied["id"], "cancelled")).status_code == 200
+    assert await available(authenticated_client, book["id"]) == 5
+
+    applied = await place_order(authenticated_client, book["id"], quantity=3)
+    assert await reconcile_stock() == 3
+    assert (await set_status(authenticated_client, applied["id"], "cancelled")).status_code == 200
+    assert await available(authenticated_client, book["id"]) == 5
+    # Nothing left for reconciliation to deduct, and the applied sale was added back
+    assert await reconcile_stock() == 0
+    stock = (await db_session.exec(select(DBBook.stock).where(DBBook.id == uuid.UUID(book["id"])))).one()
+    assert stock == 5
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_deleting_while_cancelling_returns_stock_once(
+    authenticated_client: AsyncClient, db_session: AsyncSession, global_engine, test_user
+):
+    book = await create_book(authenticated_client, stock=5)
+    order = await place_order(authenticated_client, book["id"], quantity=2)
+    order_id = uuid.UUID(order["id"])
+    assert await reconcile_stock() == 2
+    sessions = async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+
+    async with sessions() as admin, sessions() as owner:
+        await admin.exec(select(DBOrder).where(DBOrder.id == order_id).with_for_update())
+        deleting = asyncio.create_task(OrderRepository(owner).delete(user_id=test_user.id, order_id=order_id))
+        await asyncio.sleep(0.2)  # The delete waits on the admin's lock
+        _, cancelled = await OrderRepository(admin).transition([order_id], OrderStatus.CANCELLED, [OrderStatus.PENDING])
+        deleted = await asyncio.wait_for(deleting, timeout=10)
+
+    assert cancelled == {uuid.UUID(book["id"]): 2}
+    assert deleted == {}
+    async with sessions() as session:
+        assert (await session.exec(select(DBBook.stock).where(DBBook.id == uuid.UUID(book["id"])))).one() == 5
+        assert (await session.exec(select(DBOrder).where(DBOrder.id == order_id))).first() is None
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_expiry_cancels_stale_pending_orders_in_batches(
+    authenticated_client: AsyncClient, db_session: AsyncSession, global_engine, monkeypatch
+):
+    monkeypatch.setattr(settings, "ORDER_EXPIRY_BATCH_SIZE", 2)
+    book = await create_book(authenticated_client, stock=10)
+    stale = [(await place_order(authenticated_client, book["id"]))["id"] for _ in range(3)]
+    fresh = (await place_order(authenticated_client, book["id"]))["id"]
+    completed = (await place_order(authenticated_client, book["id"]))["id"]
+    await complete(authenticated_client, completed)
+    await backdate(db_session, [*stale, completed], hours=settings.ORDER_PENDING_EXPIRY_MINUTES // 60 + 1)
+
+    assert await expire_stale_orders() == 3
+
+    assert await statuses(db_session, [*stale, fresh, completed]) == [
+        "cancelled", "cancelled", "cancelled", "pending", "completed"
+    ]
+    assert await available(authenticated_client, book["id"]) == 8
+    assert await expire_stale_orders() == 0
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_expiry_skips_orders_locked_by_live_requests(
+    authenticated_client: AsyncClient, db_session: AsyncSession, global_engine
+):
+    book = await create_book(authenticated_client)
+    orders = [(await place_order(authenticated_client, book["id"]))["id"] for _ in range(2)]
+    await backdate(db_session, orders, hours=settings.ORDER_PENDING_EXPIRY_MINUTES // 60 + 1)
+    sessions = async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+
+    async with sessions() as live:
+        await live.exec(select(DBOrder).where(DBOrder.id == uuid.UUID(orders[0])).with_for_update())
+        # Does not wait for the locked row
+        assert await asyncio.wait_for(expire_stale_orders(), timeout=10) == 1
+        await live.rollback()
+
+    assert await statuses(db_session, orders) == ["pending", "cancelled"]
+    assert await expire_stale_orders() == 1
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_expiry_runs_in_one_replica_at_a_time(
+    authenticated_client: AsyncClient, db_session: AsyncSession, global_engine
+):
+    book = await create_book(authenticated_client)
+    order = (await place_order(authenticated_client, book["id"]))["id"]
+    await backdate(db_session, [order], hours=settings.ORDER_PENDING_EXPIRY_MINUTES // 60 + 1)
+    sessions = async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+
+    async with sessions() as other_replica:
+        await other_replica.exec(text("SELECT pg_advisory_xact_lock(hashtext('orders:expiry'))"))
+        assert await expire_stale_orders() == 0
+        await other_replica.rollback()
+
+    assert await statuses(db_session, [order]) == ["pending"]
+    assert await expire_stale_orders() == 1
@@ -0,0 +1,205 @@
+"""Tests for the transactional outbox and the order side effects it delivers."""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.models import DBOutboxMessage
+from src.db.operations import async_engine
+from src.db.outbox import OutboxRelay, outbox_message
+from src.routes.v1.orders.analytics import ORDER_PLACED, record_sale
+from src.settings import settings
+from src.utils.redis import redis_client
+
+
+@pytest.fixture(autouse=True)
+async def analytics_keys():
+    yield
+    async for redis_key in redis_client.scan_iter(match="analytics:*"):
+        await redis_client.delete(redis_key)
+
+
+@pytest.fixture
+async def relay(db_session: AsyncSession):
+    # A relay of its own, reading through the test database's engine
+    return OutboxRelay(async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False))
+
+
+async def create_book(authenticated_client: AsyncClient, price: float) -> dict:
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Outbox Author"})).json()
+    response = await authenticated_client.post(
+        "/api/v1/books", json={"title": "Outbox", "author_id": author["id"], "price": price}
+    )
+    return response.json()
+
+
+async def messages(db_session: AsyncSession) -> list[DBOutboxMessage]:
+    sessions = async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    async with sessions() as session:
+        return (await session.exec(select(DBOutboxMessage).order_by(DBOutboxMessage.created_at))).all()
+
+
+async def add_messages(db_session: AsyncSession, topic: str, count: int) -> None:
+    db_session.add_all([outbox_message(topic, {"n": n}) for n in range(count)])
+    await db_session.commit()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_orders_are_written_with_their_outbox_message(
+    authenticated_client: AsyncClient, db_session: AsyncSession, test_user
+):
+    book = await create_book(authenticated_client, price=12.5)
+    response = await authenticated_client.post(
+        "/api/v1/orders/checkout", json={"items": [{"book_id": book["id"], "quantity": 2}]}
+    )
+    order = response.json()
+    single = (
+        await authenticated_client.post("/api/v1/orders", json={"book_id": book["id"], "total_amount": 12.5})
+    ).json()
+    # A rejected cart writes neither
+    missing = await authenticated_client.post(
+        "/api/v1/orders/checkout", json={"items": [{"book_id": str(uuid.uuid4())}]}
+    )
+    assert missing.status_code == 404
+
+    written = await messages(db_session)
+    assert [message.topic for message in written] == [ORDER_PLACED, ORDER_PLACED]
+    assert written[0].payload["order_id"] == order["id"]
+    assert written[0].payload["user_id"] == str(test_user.id)
+    assert written[0].payload["items"] == [{"book_id": book["id"], "quantity": 2, "unit_price": 12.5}]
+    assert written[1].payload["order_id"] == single["id"]
+    assert written[1].payload["items"] == []
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_group_committed_orders_carry_their_message(
+    authenticated_client: AsyncClient, db_session: AsyncSession, monkeypatch
+):
+    monkeypatch.setattr(settings, "ORDER_GROUP_COMMIT_ENABLED", True)
+    book = await create_book(authenticated_client, price=10)
+    # The batcher writes through the application's engine
+    try:
+        responses = await asyncio.gather(
+            *(
+                authenticated_client.post("/api/v1/orders/checkout", json={"items": [{"book_id": book["id"]}]})
+                for _ in range(3)
+            )
+        )
+    finally:
+        await async_engine.dispose()
+
+    order_ids = {response.json()["id"] for response in responses}
+    assert {message.payload["order_id"] for message in await messages(db_session)} == order_ids
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_relay_delivers_sales_to_the_daily_counters(
+    authenticated_client: AsyncClient, db_session: AsyncSession, relay
+):
+    relay.handler(ORDER_PLACED)(record_sale)
+    cheap = await create_book(authenticated_client, price=10)
+    dear = await create_book(authenticated_client, price=25)
+    for items in ([{"book_id": cheap["id"], "quantity": 3}], [{"book_id": dear["id"]}, {"book_id": cheap["id"]}]):
+        assert (await authenticated_client.post("/api/v1/orders/checkout", json={"items": items})).status_code == 201
+
+    assert await relay.drain() == 2
+    assert await messages(db_session) == []
+    assert await relay.drain() == 0
+
+    response = await authenticated_client.get(f"/api/v1/admin/sales/{datetime.utcnow().date()}")
+    assert response.status_code == 200
+    assert response.json() == {
+        "day": datetime.utcnow().date().isoformat(),
+        "orders": 2,
+        "units": 5,
+        "revenue": 65.0,
+        "top_books": [{"book_id": cheap["id"], "units": 4}, {"book_id": dear["id"], "units": 1}],
+    }
+    empty = (await authenticated_client.get("/api/v1/admin/sales/2020-01-01")).json()
+    assert (empty["orders"], empty["top_books"]) == (0, [])
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_redelivered_sales_are_counted_once(authenticated_client: AsyncClient):
+    message_id = uuid.uuid4()
+    payload = {
+        "quantity": 2,
+        "total_amount": 20.0,
+        "created_at": "2024-05-01T10:00:00",
+        "items": [{"book_id": str(uuid.uuid4()), "quantity": 2, "unit_price": 10.0}],
+    }
+
+    await record_sale(message_id, payload)
+    await record_sale(message_id, payload)
+    await record_sale(uuid.uuid4(), payload)
+
+    sales = (await authenticated_client.get("/api/v1/admin/sales/2024-05-01")).json()
+    assert (sales["orders"], sales["units"], sales["revenue"]) == (2, 4, 40.0)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_failed_deliveries_back_off_then_die(db_session: AsyncSession, relay, monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 2)
+    calls = []
+
+    @relay.handler("test.flaky")
+    async def fail(message_id, payload):
+        calls.append(message_id)
+        raise RuntimeError("mail server down")
+
+    await add_messages(db_session, "test.flaky", 1)
+    await add_messages(db_session, "test.unhandled", 1)
+
+    assert await relay.drain() == 2
+    flaky, unhandled = await messages(db_session)
+    assert (flaky.attempts, flaky.dead_at) == (1, None)
+    assert "mail server down" in flaky.last_error
+    assert "No outbox handler for test.unhandled" in unhandled.last_error
+    # Not retried before its backoff is up
+    assert flaky.available_at > datetime.utcnow() + timedelta(seconds=settings.OUTBOX_RETRY_BASE_SECONDS / 4)
+    assert await relay.drain() == 0
+
+    sessions = async_sessionmaker(db_session.bind, class_=AsyncSession, expire_on_commit=False)
+    async with sessions() as session:
+        for message in await session.exec(select(DBOutboxMessage)):
+            message.available_at = datetime.utcnow()
+        await session.commit()
+    assert await relay.drain() == 2
+    assert all(message.dead_at is not None for message in await messages(db_session))
+    assert await relay.drain() == 0
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_concurrent_relays_deliver_each_message_once(db_session: AsyncSession, relay, monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOX_BATCH_SIZE", 5)
+    delivered = []
+    other = OutboxRelay(relay.session_factory)
+
+    async def slow_record(message_id, payload):
+        await asyncio.sleep(0.05)  # Keeps the batch locked while the other relay drains
+        delivered.append(message_id)
+
+    relay.handler("test.counted")(slow_record)
+    other.handler("test.counted")(slow_record)
+    await add_messages(db_session, "test.counted", 12)
+
+    while sum(await asyncio.gather(relay.drain(), other.drain())):
+        pass
+
+    assert len(delivered) == 12
+    assert len(set(delivered)) == 12
+    assert await messages(db_session) == []
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_worker_registers_the_order_handlers():
+    import src.worker  # noqa: F401
+    from src.db.outbox import outbox_relay
+
+    assert ORDER_PLACED in outbox_relay.topics
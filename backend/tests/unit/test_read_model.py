@@ -0,0 +1,96 @@
+"""Tests for the trigger-maintained catalog read model."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.db.read_model import BACKFILL, TRIGGERS
+
+
+async def create_book(client: AsyncClient, author_id: str, title: str, price: float) -> dict:
+    response = await client.post("/api/v1/books", json={"title": title, "author_id": author_id, "price": price})
+    return response.json()
+
+
+async def get_author(client: AsyncClient, author_id: str) -> dict:
+    return (await client.get(f"/api/v1/authors/{author_id}")).json()
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_author_aggregates_follow_book_writes(authenticated_client: AsyncClient):
+    ann = (await authenticated_client.post("/api/v1/authors", json={"name": "Ann"})).json()
+    bob = (await authenticated_client.post("/api/v1/authors", json={"name": "Bob"})).json()
+    cheap = await create_book(authenticated_client, ann["id"], "Cheap", 5)
+    await create_book(authenticated_client, ann["id"], "Dear", 20)
+
+    created = await get_author(authenticated_client, ann["id"])
+    await authenticated_client.patch(f"/api/v1/books/{cheap['id']}", json={"price": 8})
+    repriced = await get_author(authenticated_client, ann["id"])
+    await authenticated_client.patch(f"/api/v1/books/{cheap['id']}", json={"author_id": bob["id"]})
+    moved_from, moved_to = await get_author(authenticated_client, ann["id"]), await get_author(authenticated_client, bob["id"])
+    await authenticated_client.delete(f"/api/v1/books/{cheap['id']}")
+    deleted = await get_author(authenticated_client, bob["id"])
+
+    assert (created["book_count"], created["min_price"], created["max_price"]) == (2, 5, 20)
+    assert (repriced["min_price"], repriced["max_price"]) == (8, 20)
+    assert (moved_from["book_count"], moved_from["min_price"]) == (1, 20)
+    assert (moved_to["book_count"], moved_to["min_price"]) == (1, 8)
+    assert (deleted["book_count"], deleted["min_price"], deleted["max_price"]) == (0, None, None)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_author_rename_updates_book_rows(authenticated_client: AsyncClient):
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Old"})).json()
+    book = await create_book(authenticated_client, author["id"], "Book", 10)
+
+    await authenticated_client.patch(f"/api/v1/authors/{author['id']}", json={"name": "New"})
+
+    assert (await authenticated_client.get(f"/api/v1/books/{book['id']}")).json()["author_name"] == "New"
+    assert [b["author_name"] for b in (await authenticated_client.get("/api/v1/books")).json()] == ["New"]
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_author_delete_removes_read_model_rows(authenticated_client: AsyncClient, db_session: AsyncSession):
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Author"})).json()
+    await create_book(authenticated_client, author["id"], "Book", 10)
+
+    await authenticated_client.delete(f"/api/v1/authors/{author['id']}")
+
+    counts = (
+        await db_session.exec(text("SELECT (SELECT count(*) FROM catalog_books), (SELECT count(*) FROM catalog_authors)"))
+    ).one()
+    assert tuple(counts) == (0, 0)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_backfill_rebuilds_read_model(authenticated_client: AsyncClient, db_session: AsyncSession):
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Author"})).json()
+    await create_book(authenticated_client, author["id"], "First", 10)
+    await create_book(authenticated_client, author["id"], "Second", 30)
+    await db_session.exec(text("DELETE FROM catalog_books"))
+    await db_session.exec(text("DELETE FROM catalog_authors"))
+
+    for statement in BACKFILL:
+        await db_session.exec(text(statement))
+    await db_session.commit()
+
+    rebuilt = await get_author(authenticated_client, author["id"])
+    assert (rebuilt["book_count"], rebuilt["min_price"], rebuilt["max_price"]) == (2, 10, 30)
+    assert sorted(book["title"] for book in rebuilt["books"]) == ["First", "Second"]
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_triggers_reinstall_on_postgres_13(authenticated_client: AsyncClient, db_session: AsyncSession):
+    # CREATE OR REPLACE TRIGGER is PostgreSQL 14+; docker-compose runs 13
+    assert not any("OR REPLACE TRIGGER" in statement.upper() for statement in TRIGGERS)
+    async with db_session.bind.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    triggers = await db_session.exec(
+        text("SELECT tgname FROM pg_trigger WHERE tgname IN ('catalog_books_sync', 'catalog_authors_sync')")
+    )
+    assert sorted(triggers.all()) == [("catalog_authors_sync",), ("catalog_books_sync",)]
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Reinstalled"})).json()
+    await create_book(authenticated_client, author["id"], "Once", 5)
+    assert (await get_author(authenticated_client, author["id"]))["book_count"] == 1
@@ -0,0 +1,141 @@
+"""Tests for the two-tier read-through cache."""
+
+import asyncio
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from pydantic import BaseModel
+from src.settings import settings
+from src.utils.read_through_cache import ReadThroughCache
+
+
+class Item(BaseModel):
+    id: uuid.UUID
+    name: str
+
+
+def counting_loader(name: str = "item", delay: float = 0.05):
+    calls = []
+
+    async def load() -> dict:
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return {"id": item_id, "name": f"{name} {len(calls)}"}
+
+    item_id = uuid.uuid4()
+    return load, calls, str(item_id)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_concurrent_misses_load_once():
+    cache = ReadThroughCache(f"test-{uuid.uuid4()}", model=Item)
+    load, calls, key = counting_loader()
+
+    values = await asyncio.gather(*(cache.get(key, load) for _ in range(50)))
+
+    assert len(calls) == 1
+    assert all(value == values[0] for value in values)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_concurrent_misses_load_once_across_workers():
+    namespace = f"test-{uuid.uuid4()}"
+    # Separate instances stand in for separate worker processes sharing Redis
+    workers = [ReadThroughCache(namespace, model=Item) for _ in range(4)]
+    load, calls, key = counting_loader(delay=0.1)
+
+    values = await asyncio.gather(*(worker.get(key, load) for worker in workers for _ in range(10)))
+
+    assert len(calls) == 1
+    assert {value["name"] for value in values} == {"item 1"}
+    assert isinstance(values[-1]["id"], uuid.UUID)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_shared_fill_outlives_a_cancelled_request():
+    cache = ReadThroughCache(f"test-{uuid.uuid4()}", model=Item)
+    refresh, calls, key = counting_loader(delay=0.1)
+
+    async def request_load() -> dict:
+        raise AssertionError("The request's own loader is only for the uncached path")
+
+    first = asyncio.create_task(cache.get(key, request_load, refresh))
+    await asyncio.sleep(0.02)
+    waiter = asyncio.create_task(cache.get(key, request_load, refresh))
+    await asyncio.sleep(0.02)
+    first.cancel()  # Its client disconnected mid-load
+
+    assert (await waiter)["name"] == "item 1"
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_local_tier_serves_without_reloading():
+    cache = ReadThroughCache(f"test-{uuid.uuid4()}", model=Item)
+    load, calls, key = counting_loader(delay=0)
+
+    first = await cache.get(key, load)
+    second = await cache.get(key, load)
+
+    assert first is second
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_stale_value_served_while_revalidating(monkeypatch):
+    monkeypatch.setattr(settings, "READ_CACHE_TTL_SECONDS", 0)
+    cache = ReadThroughCache(f"test-{uuid.uuid4()}", model=Item)
+    load, calls, key = counting_loader(delay=0)
+
+    first = await cache.get(key, load)
+    stale = await cache.get(key, load)
+    await asyncio.sleep(0.05)  # Let the background refresh finish
+    refreshed = await cache.get(key, load)
+    # Still stale, so that get started another refresh; it must not outlive the test
+    await asyncio.gather(*cache._refreshing.values())
+
+    assert stale["name"] == first["name"] == "item 1"
+    assert refreshed["name"] == "item 2"
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_invalidate_evicts_both_tiers():
+    cache = ReadThroughCache(f"test-{uuid.uuid4()}", model=Item)
+    load, calls, key = counting_loader(delay=0)
+    await cache.get(key, load)
+
+    await cache.invalidate(key)
+    value = await cache.get(key, load)
+
+    assert value["name"] == "item 2"
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_values_loaded_across_an_invalidation_are_not_cached():
+    cache = ReadThroughCache(f"test-{uuid.uuid4()}", model=Item)
+    load, calls, key = counting_loader(delay=0)
+
+    async def load_then_write() -> dict:
+        value = await load()
+        await cache.invalidate(key)  # A write committed after the read
+        return value
+
+    assert (await cache.get(key, load_then_write))["name"] == "item 1"
+    assert (await cache.get(key, load))["name"] == "item 2"
+    assert (await cache.get(key, load))["name"] == "item 2"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_book_update_refreshes_cached_lookup(authenticated_client: AsyncClient):
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Author"})).json()
+    book = (
+        await authenticated_client.post("/api/v1/books", json={"title": "Book", "author_id": author["id"], "price": 10})
+    ).json()
+    assert (await authenticated_client.get(f"/api/v1/authors/{author['id']}")).json()["books"][0]["price"] == 10
+
+    await authenticated_client.patch(f"/api/v1/books/{book['id']}", json={"price": 12})
+
+    assert (await authenticated_client.get(f"/api/v1/books/{book['id']}")).json()["price"] == 12
+    assert (await authenticated_client.get(f"/api/v1/authors/{author['id']}")).json()["books"][0]["price"] == 12
@@ -0,0 +1,119 @@
+"""Tests for the catalog response cache."""
+
+import pytest
+from httpx import AsyncClient
+from src.routes.v1.books.service import BookService
+from src.utils.response_cache import invalidate_tags
+
+
+async def create_author_with_books(client: AsyncClient, count: int = 1) -> tuple[dict, list[dict]]:
+    author_response = await client.post("/api/v1/authors", json={"name": "Cached Author"})
+    assert author_response.status_code == 201
+    author = author_response.json()
+    books = []
+    for index in range(count):
+        book_data = {"title": f"Cached Book {index}", "author_id": author["id"], "price": 10 + index}
+        book_response = await client.post("/api/v1/books", json=book_data)
+        assert book_response.status_code == 201
+        books.append(book_response.json())
+    return author, books
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_list_books_served_from_cache(authenticated_client: AsyncClient):
+    await create_author_with_books(authenticated_client, count=2)
+
+    first = await authenticated_client.get("/api/v1/books")
+    second = await authenticated_client.get("/api/v1/books")
+
+    assert first.headers["x-cache"] == "MISS"
+    assert second.headers["x-cache"] == "HIT"
+    assert second.json() == first.json()
+    assert len(second.json()) == 2
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_book_create_invalidates_cached_lists(authenticated_client: AsyncClient):
+    author, _ = await create_author_with_books(authenticated_client)
+    await authenticated_client.get("/api/v1/books")
+    await authenticated_client.get(f"/api/v1/authors/{author['id']}/books")
+
+    await authenticated_client.post(
+        "/api/v1/books", json={"title": "New Release", "author_id": author["id"], "price": 12.5}
+    )
+
+    books = await authenticated_client.get("/api/v1/books")
+    by_author = await authenticated_client.get(f"/api/v1/authors/{author['id']}/books")
+    assert books.headers["x-cache"] == "MISS"
+    assert by_author.headers["x-cache"] == "MISS"
+    assert "New Release" in {book["title"] for book in books.json()}
+    assert len(by_author.json()) == 2
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_author_update_invalidates_cached_book_detail(authenticated_client: AsyncClient):
+    author, books = await create_author_with_books(authenticated_client)
+    book_url = f"/api/v1/books/{books[0]['id']}"
+    await authenticated_client.get(book_url)
+    assert (await authenticated_client.get(book_url)).headers["x-cache"] == "HIT"
+
+    await authenticated_client.patch(f"/api/v1/authors/{author['id']}", json={"name": "Renamed Author"})
+
+    response = await authenticated_client.get(book_url)
+    assert response.headers["x-cache"] == "MISS"
+    assert response.json()["author_name"] == "Renamed Author"
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_book_delete_invalidates_cached_detail(authenticated_client: AsyncClient):
+    _, books = await create_author_with_books(authenticated_client)
+    book_url = f"/api/v1/books/{books[0]['id']}"
+    await authenticated_client.get(book_url)
+
+    await authenticated_client.delete(book_url)
+
+    assert (await authenticated_client.get(book_url)).status_code == 404
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_large_cached_response_is_precompressed(authenticated_client: AsyncClient):
+    await create_author_with_books(authenticated_client, count=20)
+    await authenticated_client.get("/api/v1/books")
+
+    response = await authenticated_client.get("/api/v1/books", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["x-cache"] == "HIT"
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 20
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_cache_stats_report_hit_ratio(authenticated_client: AsyncClient):
+    await create_author_with_books(authenticated_client)
+    for _ in range(4):
+        await authenticated_client.get("/api/v1/books")
+
+    response = await authenticated_client.get("/api/v1/admin/cache/stats")
+
+    assert response.status_code == 200
+    assert response.json()["books:list"] == {"lookups": 4, "misses": 1, "hits": 3, "hit_ratio": 0.75}
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_responses_built_across_an_invalidation_are_not_stored(authenticated_client: AsyncClient, monkeypatch):
+    await create_author_with_books(authenticated_client)
+    list_books = BookService.list
+
+    async def list_then_write(self):
+        books = await list_books(self)
+        await invalidate_tags("books")  # A write committed after the read
+        return books
+
+    monkeypatch.setattr(BookService, "list", list_then_write)
+    assert (await authenticated_client.get("/api/v1/books")).headers["x-cache"] == "MISS"
+    monkeypatch.setattr(BookService, "list", list_books)
+
+    assert (await authenticated_client.get("/api/v1/books")).headers["x-cache"] == "MISS"
+    assert (await authenticated_client.get("/api/v1/books")).headers["x-cache"] == "HIT"
+    stats = (await authenticated_client.get("/api/v1/admin/cache/stats")).json()["books:list"]
+    assert (stats["lookups"], stats["misses"]) == (3, 2)
@@ -0,0 +1,48 @@
+"""Tests for the trusted JSON response path."""
+
+from typing import List
+
+import pytest
+from httpx import AsyncClient
+from pydantic import TypeAdapter
+from src.main import app
+from src.routes.v1.authors.schema import AuthorOutput
+from src.routes.v1.books.schema import BookOutput
+
+
+def test_openapi_still_documents_response_models():
+    schema = app.openapi()
+    components = schema["components"]["schemas"]
+
+    list_books = schema["paths"]["/api/v1/books"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert list_books["items"] == {"$ref": "#/components/schemas/BookOutput"}
+    author_books = components["AuthorOutput"]["properties"]["books"]
+    assert author_books["items"] == {"$ref": "#/components/schemas/AuthorBookOutput"}
+    assert set(components["AuthorBookOutput"]["required"]) == {
+        "id",
+        "title",
+        "author_id",
+        "description",
+        "price",
+        "published_date",
+    }
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_trusted_responses_match_response_models(authenticated_client: AsyncClient):
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Octavia E. Butler"})).json()
+    await authenticated_client.post(
+        "/api/v1/books",
+        json={"title": "Kindred", "author_id": author["id"], "price": 11.5, "published_date": "1979-06-01T00:00:00"},
+    )
+
+    books = await authenticated_client.get("/api/v1/books")
+    author_detail = await authenticated_client.get(f"/api/v1/authors/{author['id']}")
+
+    assert books.headers["content-type"] == "application/json"
+    # Validating and re-serializing through the response models changes nothing
+    books_adapter = TypeAdapter(List[BookOutput])
+    assert books_adapter.dump_python(books_adapter.validate_json(books.content), mode="json") == books.json()
+    validated_author = AuthorOutput.model_validate_json(author_detail.content)
+    assert validated_author.model_dump(mode="json") == author_detail.json()
+    assert author_detail.json()["books"][0]["published_date"] == "1979-06-01T00:00:00"
@@ -0,0 +1,46 @@
+"""Tests for the production server entrypoint."""
+
+import pickle
+
+import uvicorn
+from src.server import RecyclingServer, get_server_options
+from src.settings import settings
+
+
+def test_server_options_use_tuned_runtime(monkeypatch):
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 8)
+    monkeypatch.setattr(settings, "SERVER_MAX_REQUESTS", 1000)
+
+    options = get_server_options()
+
+    assert options["workers"] == 8
+    assert options["loop"] == "uvloop"
+    assert options["http"] == "httptools"
+    assert options["limit_max_requests"] == 1000
+    assert options["timeout_graceful_shutdown"] == settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS
+    assert options["timeout_keep_alive"] == settings.SERVER_KEEP_ALIVE_SECONDS
+    assert "reload" not in options
+
+
+def test_single_worker_is_not_recycled(monkeypatch):
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "SERVER_MAX_REQUESTS", 1000)
+
+    assert "limit_max_requests" not in get_server_options()
+
+
+def test_each_worker_draws_its_own_request_limit(monkeypatch):
+    monkeypatch.setattr(uvicorn.Server, "run", lambda self, sockets=None: None)
+    config = uvicorn.Config("src.main:app", workers=2, limit_max_requests=1000)
+    server = RecyclingServer(config, max_requests_jitter=100)
+
+    limits = set()
+    for _ in range(20):
+        # Every worker process starts from its own copy of the supervisor's server
+        worker = pickle.loads(pickle.dumps(server))
+        worker.run()
+        limits.add(worker.config.limit_max_requests)
+
+    assert all(1000 <= limit <= 1100 for limit in limits)
+    assert len(limits) > 1
+    assert config.limit_max_requests == 1000
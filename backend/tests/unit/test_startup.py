@@ -0,0 +1,35 @@
+"""Startup-time regression tests.
+
+Budgets are deliberately generous multiples of measured values so that they catch an
+accidental heavy import or blocking warm-up step rather than machine-to-machine noise.
+"""
+
+import subprocess
+import sys
+import time
+
+import pytest
+from src.main import app
+from src.utils.app_lifespan import lifespan
+
+IMPORT_BUDGET_SECONDS = 3.0
+LIFESPAN_STARTUP_BUDGET_SECONDS = 2.0
+
+
+def test_application_import_within_budget():
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import src.main"], check=True, capture_output=True)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < IMPORT_BUDGET_SECONDS, f"Importing src.main took {elapsed:.2f}s"
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_lifespan_warms_up_within_budget():
+    start = time.perf_counter()
+    async with lifespan(app):
+        elapsed = time.perf_counter() - start
+        assert app.state.ready is True
+    assert app.state.ready is False
+
+    assert elapsed < LIFESPAN_STARTUP_BUDGET_SECONDS, f"Startup took {elapsed:.2f}s"
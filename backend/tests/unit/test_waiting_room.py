@@ -0,0 +1,192 @@
+"""Tests for the checkout waiting room."""
+
+import asyncio
+import uuid
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.settings import settings
+from src.utils.redis import redis_client
+from src.utils.waiting_room import checkout_waiting_room
+
+
+async def clear_slots() -> None:
+    # Each admission interval admits once; let the next admit() run straight away
+    async for key in redis_client.scan_iter(match="waiting_room:checkout:admitted:*"):
+        await redis_client.delete(key)
+
+
+@pytest.fixture
+async def waiting_room(monkeypatch):
+    monkeypatch.setattr(settings, "WAITING_ROOM_ENABLED", True)
+    monkeypatch.setattr(settings, "WAITING_ROOM_ADMIT_PER_SECOND", 2)
+    monkeypatch.setattr(settings, "WAITING_ROOM_ADMIT_INTERVAL_SECONDS", 1)
+    async for key in redis_client.scan_iter(match="waiting_room:*"):
+        await redis_client.delete(key)
+    yield checkout_waiting_room
+    async for key in redis_client.scan_iter(match="waiting_room:*"):
+        await redis_client.delete(key)
+
+
+async def create_book(authenticated_client: AsyncClient) -> dict:
+    author = (await authenticated_client.post("/api/v1/authors", json={"name": "Queued Author"})).json()
+    response = await authenticated_client.post(
+        "/api/v1/books", json={"title": "Flash Sale", "author_id": author["id"], "price": 10}
+    )
+    return response.json()
+
+
+async def checkout(authenticated_client: AsyncClient, book_id: str, ticket_id: str | None = None):
+    headers = {"Waiting-Room-Ticket": ticket_id} if ticket_id is not None else {}
+    return await authenticated_client.post(
+        "/api/v1/orders/checkout", json={"items": [{"book_id": book_id}]}, headers=headers
+    )
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_disabled_room_admits_everyone(authenticated_client: AsyncClient):
+    book = await create_book(authenticated_client)
+
+    assert (await checkout(authenticated_client, book["id"])).status_code == 201
+    ticket = (await authenticated_client.post("/api/v1/waiting-room/tickets")).json()
+    assert ticket["admitted"] is True
+    assert (await checkout(authenticated_client, book["id"], ticket["id"])).status_code == 201
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_checkout_waits_its_turn(authenticated_client: AsyncClient, waiting_room):
+    book = await create_book(authenticated_client)
+    for _ in range(3):
+        await waiting_room.join(uuid.uuid4())
+
+    assert (await checkout(authenticated_client, book["id"])).status_code == 428
+    response = await authenticated_client.post("/api/v1/waiting-room/tickets")
+    ticket = response.json()
+    assert ticket["admitted"] is False
+    assert ticket["position"] == 4
+    assert ticket["estimated_wait_seconds"] == 2
+    assert response.headers["Retry-After"] == "1"
+
+    rejected = await checkout(authenticated_client, book["id"], ticket["id"])
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "2"
+
+    assert await waiting_room.admit() == 2
+    assert await waiting_room.admit() is None  # This interval was already admitted
+    polled = (await authenticated_client.get(f"/api/v1/waiting-room/tickets/{ticket['id']}")).json()
+    assert polled["position"] == 2
+
+    await clear_slots()
+    assert await waiting_room.admit() == 4
+    # Joining again returns the same ticket
+    rejoined = (await authenticated_client.post("/api/v1/waiting-room/tickets")).json()
+    assert rejoined == {"id": ticket["id"], "admitted": True, "position": 0, "estimated_wait_seconds": 0}
+    assert (await checkout(authenticated_client, book["id"], ticket["id"])).status_code == 201
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_quiet_room_admits_immediately_without_banking(authenticated_client: AsyncClient, waiting_room):
+    for _ in range(3):
+        await clear_slots()
+        await waiting_room.admit()
+    # Idle intervals do not add up: only one interval's quota is ahead of the queue
+    assert int(await redis_client.get(waiting_room.head_key)) == 2
+
+    first = await waiting_room.join(uuid.uuid4())
+    second = await waiting_room.join(uuid.uuid4())
+    third = await waiting_room.join(uuid.uuid4())
+    assert (first.admitted, second.admitted, third.admitted) == (True, True, False)
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_tickets_belong_to_their_holder(authenticated_client: AsyncClient, waiting_room):
+    await waiting_room.admit()
+    book = await create_book(authenticated_client)
+    ticket = await waiting_room.join(uuid.uuid4())
+    assert ticket.admitted
+
+    assert (await checkout(authenticated_client, book["id"], str(ticket.id))).status_code == 428
+    assert (await authenticated_client.get(f"/api/v1/waiting-room/tickets/{ticket.id}")).status_code == 404
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_turned_away_checkouts_do_not_touch_the_database(
+    authenticated_client: AsyncClient, db_session: AsyncSession, waiting_room
+):
+    book = await create_book(authenticated_client)
+    await waiting_room.join(uuid.uuid4())
+    ticket = (await authenticated_client.post("/api/v1/waiting-room/tickets")).json()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert (await checkout(authenticated_client, book["id"])).status_code == 428
+        assert (await checkout(authenticated_client, book["id"], ticket["id"])).status_code == 429
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert statements == []
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_ticket_stream_ends_once_admitted(authenticated_client: AsyncClient, waiting_room):
+    await waiting_room.admit()
+    ticket = (await authenticated_client.post("/api/v1/waiting-room/tickets")).json()
+
+    response = await authenticated_client.get(f"/api/v1/events/waiting-room/{ticket['id']}")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "event: ticket" in response.text
+    assert '"admitted": true' in response.text
+    missing = await authenticated_client.get(f"/api/v1/events/waiting-room/{uuid.uuid4()}")
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_a_ticket_admits_one_successful_checkout(authenticated_client: AsyncClient, waiting_room):
+    await waiting_room.admit()
+    book = await create_book(authenticated_client)
+    ticket = (await authenticated_client.post("/api/v1/waiting-room/tickets")).json()
+    assert ticket["admitted"] is True
+
+    # A failed checkout hands the ticket back
+    assert (await checkout(authenticated_client, str(uuid.uuid4()), ticket["id"])).status_code == 404
+    assert (await checkout(authenticated_client, book["id"], ticket["id"])).status_code == 201
+    assert (await checkout(authenticated_client, book["id"], ticket["id"])).status_code == 428
+
+    rejoined = (await authenticated_client.post("/api/v1/waiting-room/tickets")).json()
+    assert rejoined["id"] != ticket["id"]
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_a_ticket_carries_one_checkout_at_a_time(authenticated_client: AsyncClient, waiting_room):
+    await waiting_room.admit()
+    book = await create_book(authenticated_client)
+    ticket = (await authenticated_client.post("/api/v1/waiting-room/tickets")).json()
+    assert await waiting_room.claim(uuid.UUID(ticket["id"]))
+
+    assert (await checkout(authenticated_client, book["id"], ticket["id"])).status_code == 409
+
+
+@pytest.mark.asyncio(loop_scope="function")
+async def test_concurrent_joins_share_a_ticket(waiting_room, monkeypatch):
+    user_id = uuid.uuid4()
+    incr = redis_client.incr
+
+    async def slow_incr(*args, **kwargs):
+        # Let every join look up the user's ticket before any of them takes a number
+        await asyncio.sleep(0.01)
+        return await incr(*args, **kwargs)
+
+    monkeypatch.setattr(redis_client, "incr", slow_incr)
+
+    tickets = await asyncio.gather(*(waiting_room.join(user_id) for _ in range(5)))
+
+    assert len({ticket.id for ticket in tickets}) == 1
@@ -193,6 +193,26 @@ function EditBookDialog({ book, onBookUpdated }: { book: any; onBookUpdated: ()
     const [publishedDate, setPublishedDate] = useState(book.published_date || "");
     const [authors, setAuthors] = useState<{ id: string; name: string }[]>([]);
     const [authorsError, setAuthorsError] = useState<string | null>(null);
+    // ETag of the version being edited; the update is refused if someone else changed it
+    const [etag, setEtag] = useState<string | null>(null);
+    const [conflict, setConflict] = useState(false);
+
+    useEffect(() => {
+        if (!open) return;
+        const loadBook = async () => {
+            const res = await apiFetch(`/books/${book.id}`);
+            if (!res.ok) return;
+            const current = await res.json();
+            setTitle(current.title);
+            setDescription(current.description || "");
+            setPrice(current.price.toString());
+            setAuthorId(current.author_id);
+            setPublishedDate(current.published_date || "");
+            setEtag(res.headers.get("ETag"));
+            setConflict(false);
+        };
+        loadBook();
+    }, [open, book.id]);
 
     useEffect(() => {
         const loadAuthors = async () => {
@@ -213,8 +233,9 @@ function EditBookDialog({ book, onBookUpdated }: { book: any; onBookUpdated: ()
                 setAuthorsError("Author is required.");
                 return;
             }
-            await apiFetch(`/books/${book.id}`, {
+            const res = await apiFetch(`/books/${book.id}`, {
                 method: "PATCH",
+                headers: etag ? { "If-Match": etag } : undefined,
                 body: JSON.stringify({
                     title,
                     description: description || null,
@@ -223,6 +244,10 @@ function EditBookDialog({ book, onBookUpdated }: { book: any; onBookUpdated: ()
                     published_date: publishedDate || null,
                 }),
             });
+            if (res.status === 412 || res.status === 409) {
+                setConflict(true);
+                return;
+            }
             setOpen(false);
             onBookUpdated();
         } catch (err) {
@@ -260,6 +285,11 @@ function EditBookDialog({ book, onBookUpdated }: { book: any; onBookUpdated: ()
                         ))}
                     </select>
                     {authorsError ? <p className="text-sm text-destructive">{authorsError}</p> : null}
+                    {conflict ? (
+                        <p className="text-sm text-destructive">
+                            This book was changed by someone else. Reopen it to see the latest version.
+                        </p>
+                    ) : null}
                     <Label>Published Date</Label>
                     <Input type="date" value={publishedDate} onChange={(e) => setPublishedDate(e.target.value)} />
                     <Button onClick={handleSubmit}>Update</Button>
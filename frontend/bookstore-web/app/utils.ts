@@ -145,10 +145,15 @@ export class ApiError extends Error {
   }
 }
 
-export async function postJSON<TResponse, TBody>(url: string, body: TBody): Promise<TResponse> {
+export async function postJSON<TResponse, TBody>(
+  url: string,
+  body: TBody,
+  headers?: HeadersInit
+): Promise<TResponse> {
   const res = await apiFetch(url, {
     method: "POST",
     body: JSON.stringify(body),
+    headers,
   });
 
   const text = await res.text();
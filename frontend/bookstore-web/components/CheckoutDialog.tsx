@@ -1,6 +1,6 @@
 "use client";
 
-import { useEffect, useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import {
   Dialog,
   DialogContent,
@@ -10,24 +10,41 @@ import {
   DialogTitle,
 } from "@/components/ui/dialog";
 import { Button } from "@/components/ui/button";
-import { postJSON } from "@/app/utils";
+import { getJSON, postJSON } from "@/app/utils";
 import { useCart } from "@/app/CartContext";
 
-type OrderCreateInput = {
+type CheckoutInput = {
+  items: {
+    book_id: string;
+    quantity: number;
+  }[];
+};
+
+type OrderItemOutput = {
   book_id: string;
   quantity: number;
-  total_amount: number;
+  unit_price: number;
 };
 
-type OrderOutput = {
+type OrderDetailOutput = {
   id: string;
   user_id: string;
-  book_id: string;
+  book_id: string | null;
   quantity: number;
   total_amount: number;
   status: string;
+  items: OrderItemOutput[];
+};
+
+type TicketOutput = {
+  id: string;
+  admitted: boolean;
+  position: number;
+  estimated_wait_seconds: number;
 };
 
+const POLL_INTERVAL_MS = 1000;
+
 interface CheckoutDialogProps {
   open: boolean;
   onOpenChange: (open: boolean) => void;
@@ -39,30 +56,49 @@ export function CheckoutDialog({ open, onOpenChange, total }: CheckoutDialogProp
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [success, setSuccess] = useState(false);
+  const [queuePosition, setQueuePosition] = useState<number | null>(null);
+  // Reused by retries of this checkout, so a retry never places the order twice
+  const idempotencyKey = useRef(crypto.randomUUID());
 
   useEffect(() => {
     if (open) {
       setError(null);
       setSuccess(false);
+      setQueuePosition(null);
+      idempotencyKey.current = crypto.randomUUID();
     }
   }, [open]);
 
+  // Queue for checkout; during a flash sale this waits until the server admits us
+  const waitForAdmission = async (): Promise<TicketOutput> => {
+    let ticket = await postJSON<TicketOutput, Record<string, never>>("/waiting-room/tickets", {});
+    while (!ticket.admitted) {
+      setQueuePosition(ticket.position);
+      await new Promise((resolve) => setTimeout(resolve, POLL_INTERVAL_MS));
+      ticket = await getJSON<TicketOutput>(`/waiting-room/tickets/${ticket.id}`);
+    }
+    setQueuePosition(null);
+    return ticket;
+  };
+
   const handleCheckout = async () => {
     setIsLoading(true);
     setError(null);
 
     try {
-      // Create orders for each cart item
-      const orderPromises = items.map((item) =>
-        postJSON<OrderOutput, OrderCreateInput>("/orders", {
-          book_id: item.id,
-          quantity: item.quantity,
-          total_amount: item.price * item.quantity,
-        })
+      const ticket = await waitForAdmission();
+      // Place the whole cart as one order; prices are set by the server
+      await postJSON<OrderDetailOutput, CheckoutInput>(
+        "/orders/checkout",
+        {
+          items: items.map((item) => ({
+            book_id: item.id,
+            quantity: item.quantity,
+          })),
+        },
+        { "Idempotency-Key": idempotencyKey.current, "Waiting-Room-Ticket": ticket.id }
       );
 
-      await Promise.all(orderPromises);
-
       // Clear cart on success
       clearCart();
       setSuccess(true);
@@ -71,6 +107,7 @@ export function CheckoutDialog({ open, onOpenChange, total }: CheckoutDialogProp
       setError("Checkout failed. Please try again.");
     } finally {
       setIsLoading(false);
+      setQueuePosition(null);
     }
   };
 
@@ -128,7 +165,11 @@ export function CheckoutDialog({ open, onOpenChange, total }: CheckoutDialogProp
                 Cancel
               </Button>
               <Button onClick={handleCheckout} disabled={isLoading}>
-                {isLoading ? "Processing..." : "Confirm Purchase"}
+                {queuePosition !== null
+                  ? `In queue (position ${queuePosition})...`
+                  : isLoading
+                    ? "Processing..."
+                    : "Confirm Purchase"}
               </Button>
             </>
           )}